@@ -4,18 +4,24 @@
 
 from math import *
 
-def brents_wiki(f, interval):
+from metrics_registry import bracket_outcome, instrumented
+
+@instrumented(outcome=bracket_outcome)
+def brents_wiki(f, interval, verbose=True):
     """Brent's Method
        Adapted from wikipedia pseudocode
        fun: function to find root of
-       interval: iterable of two x values which bracket the root"""
-    print("Brent's Method for root finding")
+       interval: iterable of two x values which bracket the root
+       verbose: print the method used in every iteration"""
+    if verbose:
+        print("Brent's Method for root finding")
     epsilon = 2**-52
     tol = 2*epsilon
     a, b = interval
     fa=f(a); fb=f(b)
     if fa * fb >= 0:
-        print("Root is not bracketed")
+        if verbose:
+            print("Root is not bracketed")
         return
     if abs(fa) < abs(fb):
         a,b = b,a
@@ -60,7 +66,8 @@ def brents_wiki(f, interval):
             a,b = b,a
             fa,fb = fb,fa
         tol = 2 * epsilon * max(abs(s) ,1)
-        print(f"{counter}:{msg:<30}\ts = {s}")
+        if verbose:
+            print(f"{counter}:{msg:<30}\ts = {s}")
         counter += 1
     return s
 
@@ -84,19 +91,17 @@ Re = rho*V*D/mu # Reynolds number
 interval = (0.008, 0.08)
 
 
-
-print("Case Study 8.4 Pipe Friction")
-print("----------------------------")
-print("Finding friction factor f using Colebrook equation:")
-print("-1/sqrt(f) = 2 * log10( eps/(3.7*D) + 2.51/(Re*sqrt(f)) )")
-print("By appying Brent's method for root finding on:")
-print("1/sqrt(f) + 2 * log10( eps/(3.7*D) + 2.51/(Re*sqrt(f)) ) = 0")
-print(f"Reynolds number: Re={Re}")
-print(f"Roughness: epsilon={eps}m")
-print(f"Diameter: D={D}m\n")
-friction_factor = brents_wiki(Colebrook_eq, interval)
-print("\nResult for friction factor f:")
-print(f"f = {friction_factor}")
-print(f"Residual: Colebrook equation(f) = {Colebrook_eq(friction_factor)}")
-        
-
+if __name__ == "__main__":
+    print("Case Study 8.4 Pipe Friction")
+    print("----------------------------")
+    print("Finding friction factor f using Colebrook equation:")
+    print("-1/sqrt(f) = 2 * log10( eps/(3.7*D) + 2.51/(Re*sqrt(f)) )")
+    print("By appying Brent's method for root finding on:")
+    print("1/sqrt(f) + 2 * log10( eps/(3.7*D) + 2.51/(Re*sqrt(f)) ) = 0")
+    print(f"Reynolds number: Re={Re}")
+    print(f"Roughness: epsilon={eps}m")
+    print(f"Diameter: D={D}m\n")
+    friction_factor = brents_wiki(Colebrook_eq, interval)
+    print("\nResult for friction factor f:")
+    print(f"f = {friction_factor}")
+    print(f"Residual: Colebrook equation(f) = {Colebrook_eq(friction_factor)}")
@@ -0,0 +1,223 @@
+# Streaming interpolation of query points stored in memory-mapped files
+# The query points are read chunk by chunk from a raw binary file or a .npy file,
+# interpolated and written to a memory-mapped output file.
+# Only one chunk of query points is in memory at any time.
+#
+# Interpolators:
+#   linear: linear interpolation between succesive data points
+#   lagrange: Lagrange polynomial in second barycentric form
+#   spline: natural cubic spline
+#
+# Lagrange polynomial in second barycentric form
+#
+# xj, yj: data points, wj: barymetric weight
+#
+# wj =  ∏  (xj - xm)⁻¹
+#      m≠j
+#
+#           k  ⎛    wj      ⎞
+#           ∑  ⎜ ⎯⎯⎯⎯⎯⎯⎯ yj ⎟
+#          j=0 ⎝  x - xj    ⎠
+# p(x) = ⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯
+#           k  ⎛    wj   ⎞
+#           ∑  ⎜ ⎯⎯⎯⎯⎯⎯⎯ ⎟
+#          j=0 ⎝  x - xj ⎠
+#
+# Natural cubic spline, hi = xi+1 - xi, Mi: second derivative at node i, M0 = Mn = 0
+#
+# hi-1.Mi-1 + 2.(hi-1 + hi).Mi + hi.Mi+1 = 6.( (yi+1 - yi)/hi - (yi - yi-1)/hi-1 )
+#
+# This code uses the numpy library
+
+import numpy as np
+
+from metrics_registry import instrumented
+
+
+def barycentric_weights(x_data):
+    """Barycentric weights for Lagrange polynomial in second barycentric form
+    x_data: x values of data to be used"""
+    x = np.asarray(x_data, dtype=float)
+    diff = x[:, None] - x[None, :]
+    np.fill_diagonal(diff, 1.0) # leave out xj - xj from the product
+    return 1.0 / np.prod(diff, axis=1)
+
+
+def spline_factor(x_data):
+    """Forward elimination factors of the tridiagonal system of a natural cubic spline
+    These only depend on the x values of the data, not on the y values
+    x_data: x values of data to be used, in increasing order"""
+    x = np.asarray(x_data, dtype=float)
+    h = np.diff(x)
+    n = len(x)
+    c_prime = np.zeros(n) # modified super diagonal, Thomas algorithm
+    denom = np.ones(n) # pivot for each row
+    for i in range(1, n - 1):
+        denom[i] = 2 * (h[i-1] + h[i]) - h[i-1] * c_prime[i-1]
+        c_prime[i] = h[i] / denom[i]
+    return h, c_prime, denom
+
+
+def spline_second_derivatives(factor, y_data):
+    """Second derivatives at the nodes of a natural cubic spline
+    factor: result of spline_factor() for the x values of the data
+    y_data: y values of data to be used"""
+    h, c_prime, denom = factor
+    y = np.asarray(y_data, dtype=float)
+    n = len(y)
+    rhs = np.zeros(n)
+    rhs[1:-1] = 6 * (np.diff(y[1:]) / h[1:] - np.diff(y[:-1]) / h[:-1])
+    d_prime = np.zeros(n)
+    for i in range(1, n - 1): # forward sweep
+        d_prime[i] = (rhs[i] - h[i-1] * d_prime[i-1]) / denom[i]
+    M = np.zeros(n) # natural spline: M0 = Mn = 0
+    for i in range(n - 2, 0, -1): # back substitution
+        M[i] = d_prime[i] - c_prime[i] * M[i+1]
+    return M
+
+
+def linear_chunk(xx, x_data, y_data):
+    """Linear interpolation of a chunk of x values
+    x values outside the data range give nan
+    xx: numpy array of x values to interpolate y at
+    x_data, y_data: numpy arrays of data points, x in increasing order"""
+    return np.interp(xx, x_data, y_data, left=np.nan, right=np.nan)
+
+
+def lagrange_chunk(xx, x_data, y_data, barycentric_w):
+    """Interpolation of a chunk of x values using Lagrange Polynomial
+    in second barycentric form
+    Uses a temporary array of len(xx) * len(x_data) values
+    xx: numpy array of x values to interpolate y at
+    x_data, y_data: numpy arrays of data points
+    barycentric_w: result of barycentric_weights() for x_data"""
+    dx = xx[:, None] - x_data[None, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = barycentric_w / dx
+        p = (t @ y_data) / t.sum(axis=1)
+    rows, cols = np.nonzero(dx == 0) # x values at the nodes use y_data directly
+    p[rows] = y_data[cols]
+    return p
+
+
+def spline_chunk(xx, x_data, y_data, M):
+    """Interpolation of a chunk of x values using a natural cubic spline
+    x values outside the data range give nan
+    xx: numpy array of x values to interpolate y at
+    x_data, y_data: numpy arrays of data points, x in increasing order
+    M: result of spline_second_derivatives() for the data"""
+    i = np.clip(np.searchsorted(x_data, xx, side="right") - 1, 0, len(x_data) - 2)
+    h = x_data[i+1] - x_data[i]
+    a = x_data[i+1] - xx
+    b = xx - x_data[i]
+    p = (M[i] * a**3 + M[i+1] * b**3) / (6 * h) \
+        + (y_data[i] / h - M[i] * h / 6) * a \
+        + (y_data[i+1] / h - M[i+1] * h / 6) * b
+    p[(xx < x_data[0]) | (xx > x_data[-1])] = np.nan
+    return p
+
+
+def prepare_interpolator(method, x_data, y_data):
+    """Compute the setup of an interpolator once and
+    return a function which interpolates one chunk of x values
+    method: "linear", "lagrange" or "spline"
+    x_data: x values of data to be used
+    y_data: y values of data to be used"""
+    x = np.asarray(x_data, dtype=float)
+    y = np.asarray(y_data, dtype=float)
+    if method == "linear":
+        return lambda xx: linear_chunk(xx, x, y)
+    elif method == "lagrange":
+        w = barycentric_weights(x)
+        return lambda xx: lagrange_chunk(xx, x, y, w)
+    elif method == "spline":
+        M = spline_second_derivatives(spline_factor(x), y)
+        return lambda xx: spline_chunk(xx, x, y, M)
+    raise ValueError(f"unknown interpolation method {method}, use one of {methods}")
+
+
+def open_query_file(path, dtype="float64"):
+    """Memory map a file of query x values, read only
+    path: .npy file or raw binary file
+    dtype: data type of the values in a raw binary file"""
+    if str(path).endswith(".npy"):
+        xx = np.load(path, mmap_mode="r")
+    else:
+        xx = np.memmap(path, dtype=dtype, mode="r")
+    if xx.ndim != 1:
+        raise ValueError(f"{path} does not contain a one dimensional array")
+    return xx
+
+
+def create_output_file(path, n, dtype="float64"):
+    """Create a memory-mapped file for n interpolated y values
+    path: .npy file or raw binary file
+    n: number of values
+    dtype: data type of the values"""
+    if str(path).endswith(".npy"):
+        return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(n,))
+    return np.memmap(path, dtype=dtype, mode="w+", shape=(n,))
+
+
+@instrumented
+def interpolate_file(in_path, out_path, x_data, y_data, method="lagrange", chunk_size=65536, dtype="float64"):
+    """Interpolate all x values in a file and write the y values to another file
+    Both files are memory mapped and processed chunk by chunk
+    in_path: file with x values to interpolate y at, .npy or raw binary
+    out_path: file to write interpolated y values to, .npy or raw binary
+    x_data: x values of data to be used
+    y_data: y values of data to be used
+    method: "linear", "lagrange" or "spline"
+    chunk_size: number of x values processed at once
+    dtype: data type of raw binary files
+    returns the number of interpolated values"""
+    interpolator = prepare_interpolator(method, x_data, y_data)
+    xx = open_query_file(in_path, dtype)
+    n = len(xx)
+    yy = create_output_file(out_path, n, dtype)
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        yy[start:stop] = interpolator(np.asarray(xx[start:stop], dtype=float))
+    yy.flush()
+    del yy # close memory map of output file
+    return n
+
+
+methods = ("linear", "lagrange", "spline")
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+
+    # data points
+    x_data = [-5.2 ,-3.5 ,-1.2 ,0.2 ,1.5 ,3.6 ,4.7, 5.7]
+    y_data = [-10.3,-6.2, 0.3, 1.7, 3.4, 11.4, 6.1, 8.3]
+    print("data points: ", end="")
+    print( *zip(x_data,y_data))
+
+    # parameters
+    n = 2_000_000 # number of interpolated values
+    chunk_size = 65536
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # generate x values to interpolate at, written to a memory-mapped .npy file
+        in_path = os.path.join(tmp_dir, "xx.npy")
+        xx = create_output_file(in_path, n)
+        xl = min(x_data); xu = max(x_data)
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            xx[start:stop] = xl + np.arange(start, stop) * (xu - xl) / (n - 1)
+        xx.flush(); del xx
+        print(f"Generated {n} x values from {xl} to {xu} in {in_path}")
+
+        for method in methods:
+            out_path = os.path.join(tmp_dir, f"yy_{method}.npy")
+            t_start = time.perf_counter()
+            count = interpolate_file(in_path, out_path, x_data, y_data, method, chunk_size)
+            t_stop = time.perf_counter()
+            yy = open_query_file(out_path)
+            print(f"{method:>9}: {count} points interpolated in {t_stop - t_start:.3f}s,", end="")
+            print(f" y({xl}) = {yy[0]:.4f}, y({xu}) = {yy[-1]:.4f}, y at middle = {yy[n // 2]:.4f}")
+            del yy
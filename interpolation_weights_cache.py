@@ -0,0 +1,116 @@
+# Least recently used cache of interpolator setup keyed by the nodes of the data
+# Interpolating repeatedly over the same set of x values of the data
+# skips the computation of the barycentric weights of the Lagrange polynomial
+# or the factorization of the natural cubic spline system.
+# The cache is bounded, the least recently used set of nodes is evicted first.
+# Hits, misses and evictions are counted to choose the size of the cache.
+#
+# This code uses the numpy library
+
+from collections import OrderedDict
+import hashlib
+import threading
+
+import numpy as np
+
+from interpolation_streaming_memmap import barycentric_weights, spline_factor
+from interpolation_streaming_memmap import lagrange_chunk, spline_chunk, spline_second_derivatives
+from metrics_registry import instrumented
+
+
+class InterpolatorCache:
+    """Bounded least recently used cache of interpolator setup
+    maxsize: maximum number of node sets kept in the cache"""
+
+    # setup which only depends on the x values of the data
+    setup_functions = {"lagrange": barycentric_weights, "spline": spline_factor}
+
+    def __init__(self, maxsize=32):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(kind, x_data):
+        """Key for a set of nodes: kind of interpolator and hash of the x values
+        kind: "lagrange" or "spline"
+        x_data: x values of data"""
+        x = np.ascontiguousarray(x_data, dtype=np.float64)
+        return kind, hashlib.sha1(x.tobytes()).hexdigest()
+
+    def get(self, kind, x_data):
+        """Return setup of interpolator for x_data, computed once
+        kind: "lagrange" or "spline"
+        x_data: x values of data"""
+        key = self.key(kind, x_data)
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+        setup = self.setup_functions[kind](np.asarray(x_data, dtype=float))
+        with self._lock:
+            self._entries[key] = setup
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return setup
+
+    def stats(self):
+        """Counters of the cache as a dictionary"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"maxsize": self.maxsize, "size": len(self._entries),
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def clear(self):
+        """Remove all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0; self.misses = 0; self.evictions = 0
+
+
+@instrumented("spline_arr_cached")
+def spline_arr(xx, x_data, y_data, cache=None):
+    """Interpolation using a natural cubic spline,
+    factorization of the spline system is taken from the cache
+    xx: x values to interpolate y at
+    x_data: x values of data to be used, in increasing order
+    y_data: y values of data to be used
+    cache: InterpolatorCache, default is the module cache weights_cache"""
+    cache = weights_cache if cache is None else cache
+    factor = cache.get("spline", x_data)
+    x = np.asarray(x_data, dtype=float)
+    y = np.asarray(y_data, dtype=float)
+    return spline_chunk(np.asarray(xx, dtype=float), x, y, spline_second_derivatives(factor, y))
+
+
+weights_cache = InterpolatorCache()
+
+
+if __name__ == "__main__":
+    import time
+
+    # a small rotating set of node arrays, Chebyshev nodes on [-5, 5]
+    node_sets = [5 * np.cos(np.pi * (2 * np.arange(k) + 1) / (2 * k)) for k in (40, 50, 60, 70)]
+    xx = np.linspace(-4.99, 4.99, 1000)
+    n_calls = 200
+
+    print("Lagrange polynomial in second barycentric form, rotating over", len(node_sets), "node sets")
+    for maxsize in (2, 4):
+        cache = InterpolatorCache(maxsize)
+        t_start = time.perf_counter()
+        for k in range(n_calls):
+            x_data = node_sets[k % len(node_sets)]
+            yy = lagrange_chunk(xx, x_data, np.sin(x_data), cache.get("lagrange", x_data))
+        t_stop = time.perf_counter()
+        print(f"maxsize = {maxsize}: {n_calls} calls in {t_stop - t_start:.3f}s, {cache.stats()}")
+    print(f"max. error of last interpolation of sin(x): {np.max(np.abs(yy - np.sin(xx))):.2e}")
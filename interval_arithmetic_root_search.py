@@ -0,0 +1,640 @@
+# Interval arithmetic root exclusion, branch-and-prune search for all roots in an interval
+# For the expressions of the incremental search of numerical_methods_incremental_search_false_pos_3.py,
+# functions of x with the names of math_fun_dict (sin, exp, log, sqrt, ...).
+#
+# The expression is evaluated once with an interval X = [xl, xu] instead of a number x.
+# Every operation returns an interval which contains all possible results, for example:
+#
+#   [a, b] + [c, d] = [a + c, b + d]
+#   [a, b] * [c, d] = [min(ac, ad, bc, bd), max(ac, ad, bc, bd)]
+#   exp([a, b])     = [exp(a), exp(b)]
+#
+# The lower bound is rounded down and the upper bound up with math.nextafter (outward rounding),
+# so the result F(X) always contains f(x) for every x in X, also with round-off.
+# When 0 is not in F(X), f has no root in X and X is discarded without evaluating f on a grid.
+#
+# Branch and prune:
+#
+#   X = [xl, xu]  -->  0 in F(X)?  no:  discard X
+#                                  yes: width of X > width: split X in two halves, repeat for both
+#                                       else: X may contain a root, keep it
+#
+# Adjacent kept intervals are merged. The derivative F'(X) is evaluated the same way with
+# automatic differentiation. When 0 is not in F'(X), f is strictly monotone on X and a merged interval
+# with a sign change has exactly one root, which is refined with the modified false position method.
+# The other merged intervals are searched again with a smaller width, what remains is reported
+# as a possible root (for example a double root where f touches zero), so no root is missed.
+# Merged intervals at the boundary of the domain of f are first reduced to the part where f is defined.
+# A merged interval where F(X) is unbounded can hold a pole (tan(x) at pi/2, 1/x at 0)
+# where f changes sign without a root, it is reported as a possible pole.
+
+from math import *
+
+from metrics_registry import instrumented
+from numerical_methods_incremental_search_false_pos_3 import math_fun_dict
+from numerical_methods_mod_false_pos import modfalsepos
+
+
+class OutOfDomain(Exception):
+    """f is not defined anywhere in the interval, for example log of an interval <= 0"""
+
+
+def _down(x):
+    return nextafter(x, -inf)
+
+
+def _up(x):
+    return nextafter(x, inf)
+
+
+def _product(a, b):
+    return 0.0 if a == 0 or b == 0 else a * b # 0 * inf is 0 for bounds
+
+
+class Interval:
+    """
+    Closed interval [lo, hi] of real numbers with outward rounded arithmetic
+    lo, hi: bounds, hi = lo for a single number
+    """
+    __slots__ = ("lo", "hi")
+
+    def __init__(self, lo, hi=None):
+        self.lo = float(lo)
+        self.hi = float(lo if hi is None else hi)
+
+    def __repr__(self):
+        return f"Interval({self.lo!r}, {self.hi!r})"
+
+    def __contains__(self, x):
+        return self.lo <= x <= self.hi
+
+    def width(self):
+        return self.hi - self.lo
+
+    def __add__(self, other):
+        other = _interval(other)
+        return Interval(_down(self.lo + other.lo), _up(self.hi + other.hi))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = _interval(other)
+        return Interval(_down(self.lo - other.hi), _up(self.hi - other.lo))
+
+    def __rsub__(self, other):
+        return _interval(other) - self
+
+    def __neg__(self):
+        return Interval(-self.hi, -self.lo)
+
+    def __pos__(self):
+        return self
+
+    def __mul__(self, other):
+        other = _interval(other)
+        products = [_product(a, b) for a in (self.lo, self.hi) for b in (other.lo, other.hi)]
+        return Interval(_down(min(products)), _up(max(products)))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = _interval(other)
+        if other.lo == other.hi == 0:
+            raise OutOfDomain("division by zero")
+        if other.lo <= 0 <= other.hi:
+            return Interval(-inf, inf)
+        return self * Interval(_down(1 / other.hi), _up(1 / other.lo))
+
+    def __rtruediv__(self, other):
+        return _interval(other) / self
+
+    def __abs__(self):
+        if self.lo >= 0:
+            return self
+        if self.hi <= 0:
+            return -self
+        return Interval(0.0, max(-self.lo, self.hi))
+
+    def __pow__(self, exponent):
+        if isinstance(exponent, Interval): # x**y = exp(y * log(x))
+            if exponent.lo == exponent.hi:
+                return self ** exponent.lo
+            return i_exp(exponent * i_log(self))
+        if float(exponent).is_integer():
+            n = int(exponent)
+            if n == 0:
+                return Interval(1.0)
+            if n < 0:
+                return 1 / self ** -n
+            lo, hi = _power(self.lo, n), _power(self.hi, n)
+            if n % 2 == 1 or self.lo >= 0: # increasing
+                return Interval(_widen_down(lo), _widen_up(hi))
+            if self.hi <= 0:
+                return Interval(_widen_down(hi), _widen_up(lo))
+            return Interval(0.0, _widen_up(max(lo, hi)))
+        # real exponent, only defined for x >= 0
+        if self.hi < 0:
+            raise OutOfDomain(f"negative number to the power {exponent}")
+        lo = max(self.lo, 0.0)
+        if exponent > 0:
+            return Interval(_widen_down(_power(lo, exponent)), _widen_up(_power(self.hi, exponent)))
+        return Interval(_widen_down(_power(self.hi, exponent)), inf if lo == 0 else _widen_up(_power(lo, exponent)))
+
+    def __rpow__(self, base): # base**x = exp(x * log(base))
+        if isinstance(base, Interval):
+            return base ** self
+        if base <= 0:
+            if self.lo == self.hi:
+                return Interval(base) ** self.lo
+            raise OutOfDomain("power of a number <= 0 with a real exponent")
+        if base == 1:
+            return Interval(1.0)
+        lo, hi = _power(base, self.lo), _power(base, self.hi)
+        if base < 1:
+            lo, hi = hi, lo
+        return Interval(_widen_down(lo), _widen_up(hi))
+
+
+def _interval(x):
+    return x if isinstance(x, Interval) else Interval(x)
+
+
+def _power(x, y):
+    try:
+        return x ** y
+    except OverflowError:
+        return inf if x > 0 or float(y) % 2 == 0 else -inf
+    except ZeroDivisionError:
+        return inf
+
+
+# math functions are accurate to about 1 ulp, so their results are widened by 2 ulp
+def _widen_down(x):
+    return _down(_down(x))
+
+
+def _widen_up(x):
+    return _up(_up(x))
+
+
+def _monotone(function, X, lo_domain=-inf, hi_domain=inf, increasing=True):
+    """Interval of an increasing or decreasing function defined on [lo_domain, hi_domain]"""
+    X = _interval(X)
+    if X.hi < lo_domain or X.lo > hi_domain:
+        raise OutOfDomain(f"{function.__name__} of {X}")
+    lo, hi = max(X.lo, lo_domain), min(X.hi, hi_domain)
+    try:
+        a = function(lo)
+    except OverflowError:
+        a = inf
+    try:
+        b = function(hi)
+    except OverflowError:
+        b = inf
+    if not increasing:
+        a, b = b, a
+    return Interval(_widen_down(a), _widen_up(b))
+
+
+def i_exp(X):
+    return _monotone(exp, X)
+
+
+def i_log(X):
+    X = _interval(X)
+    if X.hi <= 0:
+        raise OutOfDomain(f"log of {X}")
+    result = _monotone(log, Interval(max(X.lo, 5e-324), X.hi))
+    return Interval(-inf, result.hi) if X.lo <= 0 else result
+
+
+def i_log10(X):
+    X = _interval(X)
+    if X.hi <= 0:
+        raise OutOfDomain(f"log10 of {X}")
+    result = _monotone(log10, Interval(max(X.lo, 5e-324), X.hi))
+    return Interval(-inf, result.hi) if X.lo <= 0 else result
+
+
+def i_sqrt(X):
+    return _monotone(sqrt, X, lo_domain=0.0)
+
+
+def i_atan(X):
+    return _clip(_monotone(atan, X), -pi / 2, pi / 2)
+
+
+def i_asin(X):
+    return _clip(_monotone(asin, X, -1.0, 1.0), -pi / 2, pi / 2)
+
+
+def i_acos(X):
+    return _clip(_monotone(acos, X, -1.0, 1.0, increasing=False), 0.0, pi)
+
+
+def _clip(X, lo, hi):
+    """X limited to the range [lo, hi] of a function, lo and hi rounded outward"""
+    return Interval(max(X.lo, _down(lo)), min(X.hi, _up(hi)))
+
+
+def _contains_point(X, offset, period):
+    """True when X contains offset + k * period for an integer k, with a margin for round-off"""
+    k = ceil((X.lo - offset) / period - 1e-9)
+    return offset + k * period <= X.hi + 1e-9 * max(1.0, abs(X.hi))
+
+
+def i_sin(X):
+    X = _interval(X)
+    if X.width() >= 2 * pi or not isfinite(X.width()):
+        return Interval(-1.0, 1.0)
+    a, b = sin(X.lo), sin(X.hi)
+    hi = 1.0 if _contains_point(X, pi / 2, 2 * pi) else _widen_up(max(a, b))
+    lo = -1.0 if _contains_point(X, -pi / 2, 2 * pi) else _widen_down(min(a, b))
+    return Interval(max(lo, -1.0), min(hi, 1.0))
+
+
+def i_cos(X):
+    X = _interval(X)
+    if X.width() >= 2 * pi or not isfinite(X.width()):
+        return Interval(-1.0, 1.0)
+    a, b = cos(X.lo), cos(X.hi)
+    hi = 1.0 if _contains_point(X, 0.0, 2 * pi) else _widen_up(max(a, b))
+    lo = -1.0 if _contains_point(X, pi, 2 * pi) else _widen_down(min(a, b))
+    return Interval(max(lo, -1.0), min(hi, 1.0))
+
+
+def i_tan(X):
+    X = _interval(X)
+    if X.width() >= pi or not isfinite(X.width()) or _contains_point(X, pi / 2, pi):
+        return Interval(-inf, inf)
+    return Interval(_widen_down(tan(X.lo)), _widen_up(tan(X.hi)))
+
+
+def i_atan2(Y, X):
+    Y = _interval(Y); X = _interval(X)
+    if X.lo > 0: # right half plane, atan2(y, x) = atan(y / x)
+        return i_atan(Y / X)
+    half_pi = Interval(_down(pi / 2), _up(pi / 2))
+    if Y.lo > 0: # upper half plane, atan2(y, x) = pi/2 - atan(x / y)
+        return _clip(half_pi - i_atan(X / Y), 0.0, pi)
+    if Y.hi < 0: # lower half plane, atan2(y, x) = -pi/2 - atan(x / y)
+        return _clip(-half_pi - i_atan(X / Y), -pi, 0.0)
+    return Interval(_down(-pi), _up(pi))
+
+
+class Derivative:
+    """
+    Intervals of f and of its derivative f' for all x in an interval X, forward automatic differentiation
+    f: Interval of the values
+    df: Interval of the derivatives
+    """
+    __slots__ = ("f", "df")
+
+    def __init__(self, f, df=0.0):
+        self.f = _interval(f)
+        self.df = _interval(df)
+
+    def __repr__(self):
+        return f"Derivative({self.f!r}, {self.df!r})"
+
+    def __add__(self, other):
+        other = _derivative(other)
+        return Derivative(self.f + other.f, self.df + other.df)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = _derivative(other)
+        return Derivative(self.f - other.f, self.df - other.df)
+
+    def __rsub__(self, other):
+        return _derivative(other) - self
+
+    def __neg__(self):
+        return Derivative(-self.f, -self.df)
+
+    def __pos__(self):
+        return self
+
+    def __mul__(self, other):
+        other = _derivative(other)
+        return Derivative(self.f * other.f, self.df * other.f + self.f * other.df)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = _derivative(other)
+        quotient = self.f / other.f
+        return Derivative(quotient, (self.df - quotient * other.df) / other.f)
+
+    def __rtruediv__(self, other):
+        return _derivative(other) / self
+
+    def __abs__(self):
+        if self.f.lo >= 0:
+            return self
+        if self.f.hi <= 0:
+            return -self
+        return Derivative(abs(self.f), Interval(-1.0, 1.0) * self.df)
+
+    def __pow__(self, exponent):
+        if isinstance(exponent, Derivative): # x**y = exp(y * log(x))
+            if exponent.df.lo == exponent.df.hi == 0 and exponent.f.lo == exponent.f.hi:
+                return self ** exponent.f.lo
+            return d_exp(exponent * d_log(self))
+        if exponent == 0:
+            return Derivative(1.0)
+        return Derivative(self.f ** exponent, exponent * self.f ** (exponent - 1) * self.df)
+
+    def __rpow__(self, base): # d(base**x) = log(base) * base**x * dx
+        value = base ** self.f
+        return Derivative(value, Interval(_down(log(base)), _up(log(base))) * value * self.df)
+
+
+def _derivative(x):
+    return x if isinstance(x, Derivative) else Derivative(x)
+
+
+def d_exp(X):
+    X = _derivative(X)
+    value = i_exp(X.f)
+    return Derivative(value, value * X.df)
+
+
+def d_log(X):
+    X = _derivative(X)
+    return Derivative(i_log(X.f), X.df / X.f)
+
+
+def d_log10(X):
+    X = _derivative(X)
+    return Derivative(i_log10(X.f), X.df / (X.f * Interval(_down(log(10)), _up(log(10)))))
+
+
+def d_sqrt(X):
+    X = _derivative(X)
+    value = i_sqrt(X.f)
+    return Derivative(value, X.df / (2 * value))
+
+
+def d_sin(X):
+    X = _derivative(X)
+    return Derivative(i_sin(X.f), i_cos(X.f) * X.df)
+
+
+def d_cos(X):
+    X = _derivative(X)
+    return Derivative(i_cos(X.f), -i_sin(X.f) * X.df)
+
+
+def d_tan(X):
+    X = _derivative(X)
+    value = i_tan(X.f)
+    return Derivative(value, (1 + value**2) * X.df)
+
+
+def d_asin(X):
+    X = _derivative(X)
+    return Derivative(i_asin(X.f), X.df / i_sqrt(1 - X.f**2))
+
+
+def d_acos(X):
+    X = _derivative(X)
+    return Derivative(i_acos(X.f), -X.df / i_sqrt(1 - X.f**2))
+
+
+def d_atan(X):
+    X = _derivative(X)
+    return Derivative(i_atan(X.f), X.df / (1 + X.f**2))
+
+
+def d_atan2(Y, X):
+    Y = _derivative(Y); X = _derivative(X)
+    if X.f.lo <= 0 and 0 in Y.f: # atan2 jumps from pi to -pi on the negative x axis
+        return Derivative(i_atan2(Y.f, X.f), Interval(-inf, inf))
+    return Derivative(i_atan2(Y.f, X.f), (X.f * Y.df - Y.f * X.df) / (X.f**2 + Y.f**2))
+
+
+def interval_eval(code, X):
+    """
+    Interval of the expression for all x in X
+    code: expression string of x or code compiled from it
+    X: Interval, or a number for an ordinary evaluation with the interval functions
+    """
+    return _interval(eval(code, dict(interval_fun_dict, x=X, __builtins__={})))
+
+
+def point_eval(code, x):
+    """Value of the expression at x, ValueError outside the domain of f"""
+    try:
+        y = eval(code, dict(math_fun_dict, x=x, __builtins__={}))
+    except ZeroDivisionError as error:
+        raise ValueError(str(error)) from None
+    if isinstance(y, complex): # negative number to a real power
+        raise ValueError(f"complex value at x = {x}")
+    return y
+
+
+def derivative_eval(code, X):
+    """
+    Interval of the derivative of the expression for all x in X
+    code: expression string of x or code compiled from it
+    X: Interval
+    """
+    return _derivative(eval(code, dict(derivative_fun_dict, x=Derivative(X, 1.0), __builtins__={}))).df
+
+
+def is_monotone(code, X):
+    """True when f is strictly monotone on X, 0 is not in the interval of the derivative F'(X)"""
+    try:
+        dF = derivative_eval(code, X)
+    except (OutOfDomain, ValueError, ZeroDivisionError, OverflowError):
+        return False
+    return 0 not in dF
+
+
+@instrumented(function=None) # fun is an expression
+def branch_and_prune(fun, interval, width, max_boxes=100000):
+    """
+    Intervals which may contain a root of the expression fun, all other parts of interval are discarded
+    fun: expression string of x with the names of math_fun_dict, for example "sin(x) - x / 5", or code compiled from it
+    interval: iterable of lower and upper bound (xl, xu)
+    width: intervals are split until they are narrower than width
+    max_boxes: max. number of interval evaluations, raises RuntimeError when reached
+    returns list of merged intervals (xl, xu) which may contain a root, number of interval evaluations
+    """
+    code = compile(fun, "<expression>", "eval") if isinstance(fun, str) else fun
+    xl, xu = interval
+    stack = [(xl, xu)]
+    kept = []
+    n_evals = 0
+    while stack:
+        a, b = stack.pop()
+        n_evals += 1
+        if n_evals > max_boxes:
+            raise RuntimeError(f"more than {max_boxes} interval evaluations, use a larger width")
+        try:
+            F = interval_eval(code, Interval(a, b))
+        except OutOfDomain:
+            continue # f not defined in [a, b], no root
+        if 0 not in F:
+            continue # no root in [a, b]
+        if b - a <= width:
+            kept.append((a, b))
+        else:
+            m = a + (b - a) / 2
+            stack.append((m, b)); stack.append((a, m)) # left half first, kept stays sorted
+    merged = []
+    for a, b in kept:
+        if merged and merged[-1][1] == a:
+            merged[-1] = (merged[-1][0], b)
+        else:
+            merged.append((a, b))
+    return merged, n_evals
+
+
+def _defined_part(f, a, b):
+    """
+    Part [a, b] of a box where f is defined at both bounds, an undefined bound is bisected toward a defined point
+    returns a, b, f(a), f(b), ValueError when f is not defined at a, b and the midpoint
+    """
+    values = {}
+    def value(x):
+        if x not in values:
+            try:
+                values[x] = f(x)
+            except ValueError as error:
+                values[x] = error
+        return values[x]
+    inside = next((x for x in (a, b, a + (b - a) / 2) if not isinstance(value(x), ValueError)), None)
+    if inside is None:
+        raise value(a)
+    bounds = []
+    for outside in (a, b):
+        defined = inside
+        while isinstance(value(outside), ValueError): # the boundary of the domain is between outside and defined
+            m = outside + (defined - outside) / 2
+            if abs(defined - outside) <= 1e-15 * (b - a) or m == outside or m == defined:
+                outside = defined
+            elif isinstance(value(m), ValueError):
+                outside = m
+            else:
+                defined = m
+        bounds.append(outside)
+    a, b = bounds
+    return a, b, values[a], values[b]
+
+
+@instrumented(function=None)
+def interval_root_search(fun, interval, width=None, imax=100, es=1e-10, min_width=None):
+    """
+    All roots of the expression fun in interval, branch and prune followed by modified false position
+    A box with a sign change has exactly one root when F(X) is bounded (no pole)
+    and f is strictly monotone on it, 0 not in F'(X).
+    Other boxes are searched again with a 1000 times smaller width,
+    to separate roots which are close together, until min_width is reached.
+    Boxes at the boundary of the domain of f are first reduced to the part where f is defined.
+    fun: expression string of x with the names of math_fun_dict
+    interval: iterable of lower and upper bound (xl, xu)
+    width: width of the intervals of branch and prune, default 1e-6 times the width of interval
+    imax: max. number of iterations of modified false position
+    es: maximum relative error allowed in %
+    min_width: smallest width of the searches again, default 1e-12 times the width of interval
+    returns list of tuples (xl, xu, root, ea, message) sorted on xl, root None when [xl, xu] has no sign change,
+    dictionary of the number of interval and point evaluations
+    """
+    xl, xu = interval
+    width = 1e-6 * (xu - xl) if width is None else width
+    min_width = 1e-12 * (xu - xl) if min_width is None else min_width
+    code = compile(fun, "<expression>", "eval")
+    n_interval = 0; n_points = 0
+    def f(x):
+        nonlocal n_points
+        n_points += 1
+        return point_eval(code, x)
+    def refine(a, b, message):
+        """Result of the modified false position method on [a, b]"""
+        try:
+            root, iter_, ea = modfalsepos(f, (a, b), imax, es)
+        except (ValueError, OverflowError) as error:
+            return a, b, None, None, f"not refined: {error}"
+        return a, b, root, ea, message if ea <= es else "MaxIterReached"
+    results = []
+    searches = [(xl, xu, width)]
+    while searches:
+        a, b, search_width = searches.pop()
+        boxes, n_evals = branch_and_prune(code, (a, b), search_width)
+        n_interval += n_evals
+        for a, b in boxes:
+            try:
+                a, b, fa, fb = _defined_part(f, a, b)
+            except ValueError as error:
+                results.append((a, b, None, None, f"not defined in the box: {error}"))
+                continue
+            at_bound = fa == 0 or fb == 0
+            sign_change = not at_bound and copysign(1, fa) != copysign(1, fb)
+            n_interval += 2
+            try:
+                F = interval_eval(code, Interval(a, b))
+                bounded = isfinite(F.lo) and isfinite(F.hi) # no pole in the box
+            except OutOfDomain:
+                bounded = False
+            if bounded and is_monotone(code, Interval(a, b)): # continuous and monotone, at most one root
+                if at_bound:
+                    results.append((a, b, a if fa == 0 else b, 0.0, "root at a bound"))
+                elif sign_change:
+                    results.append(refine(a, b, "sign change"))
+                # no sign change of a monotone function, no root
+            elif search_width / 1000 >= min_width and b - a > search_width / 1000:
+                searches.append((a, b, search_width / 1000)) # search again for roots close together
+            elif not bounded:
+                results.append((a, b, None, None, "possible pole, f unbounded"))
+            elif at_bound:
+                results.append((a, b, a if fa == 0 else b, 0.0, "root at a bound, not proven unique"))
+            elif sign_change:
+                results.append(refine(a, b, "sign change, not proven unique"))
+            else:
+                results.append((a, b, None, None, "possible root, no sign change"))
+    return sorted(results, key=lambda result: result[0]), {"interval_evaluations": n_interval, "point_evaluations": n_points}
+
+
+# interval versions of the functions of math_fun_dict
+interval_fun_dict = {
+  "pi": Interval(_down(pi), _up(pi)), "e": Interval(_down(e), _up(e)), "sqrt": i_sqrt,
+  "log": i_log, "exp": i_exp, "log10": i_log10,
+  "sin": i_sin, "cos": i_cos, "tan": i_tan,
+  "asin": i_asin, "acos": i_acos, "atan": i_atan,
+  "atan2": i_atan2, "abs": abs}
+
+
+# interval versions of the functions of math_fun_dict with derivative
+derivative_fun_dict = {
+  "pi": Derivative(interval_fun_dict["pi"]), "e": Derivative(interval_fun_dict["e"]), "sqrt": d_sqrt,
+  "log": d_log, "exp": d_exp, "log10": d_log10,
+  "sin": d_sin, "cos": d_cos, "tan": d_tan,
+  "asin": d_asin, "acos": d_acos, "atan": d_atan,
+  "atan2": d_atan2, "abs": abs}
+
+if __name__ == "__main__":
+    from numerical_methods_incremental_search_false_pos_3 import incremental
+
+    examples = [("exp(-x) * sin(x) - 0.01", (0.0, 1000.0), 20000),
+                ("x**3 - 2*x - 5", (-1000.0, 1000.0), 20000),
+                ("1/sqrt(x) + 2*log10(1.5e-6/(3.7*0.005) + 2.51/(13743*sqrt(x)))", (1e-4, 1.0), 20000),
+                ("(x - 1) * (x - 1.0001) * log(x + 1)", (-0.5, 100.0), 20000),
+                ("sin(x) - x/50", (-100.0, 100.0), 20000)]
+    print("Interval arithmetic root exclusion, branch and prune")
+    print("----------------------------------------------------")
+    for fun, interval, n_steps in examples:
+        results, counts = interval_root_search(fun, interval)
+        roots = [root for *box, root, ea, msg in results if root is not None]
+        print(f"\nf(x) = {fun} in {interval}")
+        print(f"branch and prune: {len(roots)} roots, {counts['interval_evaluations']} interval and "
+              f"{counts['point_evaluations']} point evaluations")
+        for a, b, root, ea, msg in results[:6]:
+            text = f"x = {root:.12g}" if root is not None else ""
+            print(f"    [{a:.10g}, {b:.10g}] {msg:<30} {text}")
+        if len(results) > 6:
+            print(f"    ... {len(results) - 6} more")
+        brackets = incremental(fun, interval, n_steps)
+        print(f"incremental search: {len(brackets)} sign changes, {n_steps} point evaluations")
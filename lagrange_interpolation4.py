@@ -38,7 +38,12 @@
 #          j=0 ⎝  x - xj ⎠
 #
 
+import functools
 
+from metrics_registry import instrumented
+
+
+@instrumented
 def linear_arr(xx, x_data, y_data):
     """Linear interpolation
     Accepts a list of x values to interpolate y values at
@@ -55,6 +60,7 @@ def linear_arr(xx, x_data, y_data):
     return y_arr
             
 
+@instrumented
 def lagrange(x, x_data, y_data):
     """Interpolation using Lagrange Polynomial
     Accepts one x value to interpolate y value at
@@ -71,8 +77,25 @@ def lagrange(x, x_data, y_data):
     return p
 
 
+# Barycentric weights of the last used sets of nodes are kept,
+# interpolating again over the same nodes skips the computation
+@functools.lru_cache(maxsize=32)
+def barycentric_weights(x_data):
+    """Barycentric weights for Lagrange polynomial in second barycentric form
+    x_data: tuple of x values of data to be used"""
+    barycentric_w = []
+    for xj in x_data: # compute list of barycentric weights for each node
+        w = 1.0
+        for xk in x_data:
+            if xj != xk:
+                w *= 1 / (xj - xk)
+        barycentric_w.append(w)
+    return tuple(barycentric_w)
+
+
 # Interpolate y values for list of x values using using Lagrange Polynomial
-# in second barycentric form. barycentric weights are computed once beforehand for each node 
+# in second barycentric form. barycentric weights are computed once for each set of nodes
+@instrumented
 def lagrange_arr(xx, x_data, y_data):
     """Interpolation using Lagrange Polynomial
     in second barycentric form
@@ -80,13 +103,7 @@ def lagrange_arr(xx, x_data, y_data):
     xx: list of x values to interpolate y at
     x_data: x values of data to be used
     y_data: y values of data to be used"""
-    barycentric_w = []
-    for xj in x_data: # compute list of barycentric weights for each node
-        w = 1.0
-        for xk in x_data:
-            if xj != xk:
-                w *= 1 / (xj - xk)
-        barycentric_w.append(w)
+    barycentric_w = barycentric_weights(tuple(x_data)) # computed once for each set of nodes
     p = []
     for x in xx:
         if x in x_data: # to avoid division by 0 use y_data at nodes
@@ -102,42 +119,44 @@ def lagrange_arr(xx, x_data, y_data):
     return p
                 
 
-# data points
-x_data = [-5.2 ,-3.5 ,-1.2 ,0.2 ,1.5 ,3.6 ,4.7, 5.7]
-y_data = [-10.3,-6.2, 0.3, 1.7, 3.4, 11.4, 6.1, 8.3]
-print("data points: ", end="")
-print( *zip(x_data,y_data))
-
-# parameters
-n = 200 # number of interpolated values 
-
-# generate x values to interpolate at
-xl = min(x_data); xu = max(x_data)
-dx = (xu-xl)/(n-1)
-xx = [xl + k * dx for k in range(n)]
-print(f"Generated x values from {xl} to {xu}")
-
-# apply linear interpolation on data for range of x values
-print("linear interpolation of y values using Python code")
-yy_linear = linear_arr(xx, x_data, y_data)
-print(f"{len(yy_linear)} points interpolated")
-
-# apply lagrange interpolation on data for range of x values
-print("Polynomial interpolation of y values using Python code")
-#yy_lagrange = [lagrange(x, x_data, y_data) for x in xx]
-yy_lagrange = lagrange_arr(xx, x_data, y_data)
-print(f"{len(yy_lagrange)} points interpolated")
-
-# plot
-print("Importing matplotlib.pyplot")
-import matplotlib.pyplot as plt
-plt.figure(figsize=(12, 8))
-plt.rcParams['font.size']="17"
-plt.scatter(x_data,y_data,color="red",label="Data points")
-plt.plot(xx,yy_linear,color="green",label="Linear interpolation, python code")
-plt.plot(xx,yy_lagrange,color="blue",label="Polynomial interpolation, python code")
-plt.grid()
-plt.title("Linear and polynomial interpolation using Lagrange polynomial\nCoded in Python")
-plt.xlabel("x"); plt.ylabel("y")
-plt.legend()
-plt.show()
+
+if __name__ == "__main__":
+    # data points
+    x_data = [-5.2 ,-3.5 ,-1.2 ,0.2 ,1.5 ,3.6 ,4.7, 5.7]
+    y_data = [-10.3,-6.2, 0.3, 1.7, 3.4, 11.4, 6.1, 8.3]
+    print("data points: ", end="")
+    print( *zip(x_data,y_data))
+
+    # parameters
+    n = 200 # number of interpolated values 
+
+    # generate x values to interpolate at
+    xl = min(x_data); xu = max(x_data)
+    dx = (xu-xl)/(n-1)
+    xx = [xl + k * dx for k in range(n)]
+    print(f"Generated x values from {xl} to {xu}")
+
+    # apply linear interpolation on data for range of x values
+    print("linear interpolation of y values using Python code")
+    yy_linear = linear_arr(xx, x_data, y_data)
+    print(f"{len(yy_linear)} points interpolated")
+
+    # apply lagrange interpolation on data for range of x values
+    print("Polynomial interpolation of y values using Python code")
+    #yy_lagrange = [lagrange(x, x_data, y_data) for x in xx]
+    yy_lagrange = lagrange_arr(xx, x_data, y_data)
+    print(f"{len(yy_lagrange)} points interpolated")
+
+    # plot
+    print("Importing matplotlib.pyplot")
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(12, 8))
+    plt.rcParams['font.size']="17"
+    plt.scatter(x_data,y_data,color="red",label="Data points")
+    plt.plot(xx,yy_linear,color="green",label="Linear interpolation, python code")
+    plt.plot(xx,yy_lagrange,color="blue",label="Polynomial interpolation, python code")
+    plt.grid()
+    plt.title("Linear and polynomial interpolation using Lagrange polynomial\nCoded in Python")
+    plt.xlabel("x"); plt.ylabel("y")
+    plt.legend()
+    plt.show()
@@ -0,0 +1,406 @@
+# Metrics of the solvers, integrators and interpolators of this repository
+# Counters, timers and histograms per method name, collected in one registry:
+#
+#   calls_total                  number of calls
+#   errors_total                 calls ending with an exception, label exception
+#   outcomes_total               result of the call, label outcome:
+#                                converged, max_iterations, zero_derivative, zero_difference, not_bracketed
+#   function_evaluations_total   calls of the function f given to the method
+#   duration_seconds             histogram of the wall time of a call
+#   iterations                   histogram of the number of iterations or levels
+#
+# The registry is off by default. The functions decorated with @instrumented then only test
+# one attribute before calling the original function, so the decorators stay on the hot paths.
+# Turn it on with metrics.enable() or by setting the environment variable NUMERICAL_METHODS_METRICS=1.
+#
+# Export: snapshot() as a dictionary, to_json() and to_prometheus() in the text format
+# of Prometheus, histogram buckets are cumulative:
+#
+#   numerical_methods_duration_seconds_bucket{method="modfalsepos",le="1e-05"} 12
+#   numerical_methods_duration_seconds_sum{method="modfalsepos"} 0.000153
+#   numerical_methods_duration_seconds_count{method="modfalsepos"} 14
+#
+# Only calls in the process of the registry are counted, not calls in worker processes.
+
+import functools
+import json
+import os
+import threading
+import time
+
+
+class _NoTimer:
+    """Timer of a disabled registry, does nothing"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class _Timer:
+    """Observe the wall time of a with block in a histogram"""
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.t_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.registry.observe(self.name, time.perf_counter() - self.t_start, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms per metric name and labels
+    enabled: collect metrics, a disabled registry ignores all updates
+    prefix: prefix of the metric names in the Prometheus export
+    """
+    def __init__(self, enabled=False, prefix="numerical_methods"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self.buckets = dict(default_buckets)
+        self._counters = {} # (name, labels): value
+        self._histograms = {} # (name, labels): [counts per bucket, sum, count]
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def histogram(self, name, buckets):
+        """Set the upper bounds of the buckets of histogram name, before its first observation"""
+        self.buckets[name] = sorted(buckets)
+
+    def inc(self, name, value=1, **labels):
+        """Add value to counter name"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """Add value to histogram name"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            bounds = self.buckets.get(name, self.buckets["duration_seconds"])
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(bounds), 0.0, 0]
+            for k, bound in enumerate(bounds):
+                if value <= bound:
+                    histogram[0][k] += 1
+                    break
+            histogram[1] += value
+            histogram[2] += 1
+
+    def time(self, name="duration_seconds", **labels):
+        """Context manager observing the wall time of a with block in histogram name"""
+        if not self.enabled:
+            return no_timer
+        return _Timer(self, name, labels)
+
+    def snapshot(self):
+        """
+        Copy of all metrics
+        returns dictionary with lists "counters" of {name, labels, value} and
+        "histograms" of {name, labels, buckets, counts, sum, count}, counts not cumulative
+        """
+        with self._lock:
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            histograms = [{"name": name, "labels": dict(labels),
+                           "buckets": list(self.buckets.get(name, self.buckets["duration_seconds"])),
+                           "counts": list(counts), "sum": total, "count": count}
+                          for (name, labels), (counts, total, count) in sorted(self._histograms.items())]
+        return {"counters": counters, "histograms": histograms}
+
+    def reset(self):
+        """Remove all collected metrics"""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def summary(self):
+        """
+        Metrics per method name
+        returns dictionary method: {calls, errors, seconds, evaluations, iterations, outcomes, failure_rate},
+        seconds total wall time, iterations mean number of iterations or None,
+        failure_rate fraction of the calls with an error or an outcome other than converged
+        """
+        snapshot = self.snapshot()
+        methods = {}
+        def entry(method):
+            return methods.setdefault(method, {"calls": 0, "errors": 0, "seconds": 0.0, "evaluations": 0,
+                                               "iterations": None, "outcomes": {}, "failure_rate": 0.0})
+        for counter in snapshot["counters"]:
+            if "method" not in counter["labels"]:
+                continue
+            item = entry(counter["labels"]["method"])
+            name = counter["name"]
+            if name == "calls_total":
+                item["calls"] += counter["value"]
+            elif name == "errors_total":
+                item["errors"] += counter["value"]
+            elif name == "function_evaluations_total":
+                item["evaluations"] += counter["value"]
+            elif name == "outcomes_total":
+                outcome = counter["labels"]["outcome"]
+                item["outcomes"][outcome] = item["outcomes"].get(outcome, 0) + counter["value"]
+        for histogram in snapshot["histograms"]:
+            if "method" not in histogram["labels"]:
+                continue
+            item = entry(histogram["labels"]["method"])
+            if histogram["name"] == "duration_seconds":
+                item["seconds"] += histogram["sum"]
+            elif histogram["name"] == "iterations" and histogram["count"]:
+                item["iterations"] = histogram["sum"] / histogram["count"]
+        for item in methods.values():
+            if item["calls"]:
+                failures = item["errors"] + sum(n for outcome, n in item["outcomes"].items() if outcome != "converged")
+                item["failure_rate"] = failures / item["calls"]
+        return methods
+
+    def to_json(self, indent=None):
+        """Snapshot as JSON text"""
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self):
+        """Snapshot in the text exposition format of Prometheus"""
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+        def header(name, type_):
+            if name not in typed:
+                typed.add(name)
+                if name[len(self.prefix) + 1:] in descriptions:
+                    lines.append(f"# HELP {name} {descriptions[name[len(self.prefix) + 1:]]}")
+                lines.append(f"# TYPE {name} {type_}")
+        for counter in snapshot["counters"]:
+            name = f"{self.prefix}_{counter['name']}"
+            header(name, "counter")
+            lines.append(f"{name}{_labels(counter['labels'])} {_number(counter['value'])}")
+        for histogram in snapshot["histograms"]:
+            name = f"{self.prefix}_{histogram['name']}"
+            header(name, "histogram")
+            cumulative = 0
+            for bound, count in zip(histogram["buckets"], histogram["counts"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(histogram['labels'], le=_number(bound))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(histogram['labels'], le='+Inf')} {histogram['count']}")
+            lines.append(f"{name}_sum{_labels(histogram['labels'])} {_number(histogram['sum'])}")
+            lines.append(f"{name}_count{_labels(histogram['labels'])} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(labels, **extra):
+    """Labels in Prometheus format {name="value",...}"""
+    labels = dict(labels, **extra)
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in labels.values())
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+
+def _arguments(function, args, kwargs):
+    """Arguments of a call of function by parameter name, including the defaults"""
+    code = function.__code__
+    names = code.co_varnames[:code.co_argcount]
+    defaults = function.__defaults__ or ()
+    arguments = dict(zip(names[len(names) - len(defaults):], defaults))
+    arguments.update(zip(names, args))
+    arguments.update(kwargs)
+    return arguments
+
+
+def instrumented(method=None, function="f", iterations=None, outcome=None, registry=None):
+    """
+    Decorator reporting the calls of a solver, integrator or interpolator to the registry
+    method: method name of the metrics, default name of the decorated function
+    function: name of the parameter with the function to count the evaluations of, or None
+    iterations: index in the returned tuple of the number of iterations, or None
+    outcome: function outcome(result, arguments) returning the outcome of a call, or None
+    registry: MetricsRegistry, default metrics
+    """
+    def decorator(func):
+        name = method or func.__name__
+        code = func.__code__
+        parameters = code.co_varnames[:code.co_argcount]
+        position = parameters.index(function) if function in parameters else None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            reg = metrics if registry is None else registry
+            if not reg.enabled:
+                return func(*args, **kwargs)
+            n_evals = 0
+            if position is not None:
+                f = args[position] if position < len(args) else kwargs.get(function)
+                if callable(f):
+                    def counted(*f_args, **f_kwargs):
+                        nonlocal n_evals
+                        n_evals += 1
+                        return f(*f_args, **f_kwargs)
+                    if position < len(args):
+                        args = args[:position] + (counted,) + args[position + 1:]
+                    else:
+                        kwargs[function] = counted
+            t_start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as error:
+                reg.inc("errors_total", method=name, exception=type(error).__name__)
+                raise
+            finally:
+                reg.observe("duration_seconds", time.perf_counter() - t_start, method=name)
+                reg.inc("calls_total", method=name)
+                if n_evals:
+                    reg.inc("function_evaluations_total", n_evals, method=name)
+            if iterations is not None and result is not None:
+                reg.observe("iterations", result[iterations], method=name)
+            if outcome is not None:
+                reg.inc("outcomes_total", method=name, outcome=outcome(result, _arguments(func, args, kwargs)))
+            return result
+        return wrapper
+
+    if callable(method): # used as @instrumented without arguments
+        func, method = method, None
+        return decorator(func)
+    return decorator
+
+
+def tolerance_outcome(error, failure=None):
+    """
+    Outcome of a method stopping when its relative error estimate in % is below es
+    error: index in the returned tuple of the relative error estimate in %
+    failure: outcome when the method returns None as result, for example "zero_derivative"
+    """
+    def outcome(result, arguments):
+        if result is None or result[0] is None:
+            return failure or "failed"
+        ea = result[error]
+        ea = ea.max() if hasattr(ea, "max") else ea # arrays of roots
+        return "converged" if ea is not None and ea <= arguments["es"] else "max_iterations"
+    return outcome
+
+
+def error_outcome(error, value=0):
+    """
+    Outcome of an adaptive method with an absolute error estimate,
+    converged when the estimate is below max(abs_tol, es / 100 * |result|)
+    error: index in the returned tuple of the absolute error estimate
+    value: index in the returned tuple of the result
+    """
+    def outcome(result, arguments):
+        tol = max(arguments.get("abs_tol", 0.0), arguments["es"] / 100 * abs(result[value]))
+        return "converged" if result[error] <= tol else "max_iterations"
+    return outcome
+
+
+def bracket_outcome(result, arguments):
+    """Outcome of a bracketing method returning None when the interval does not bracket a root"""
+    return "not_bracketed" if result is None else "converged"
+
+
+# upper bounds of the buckets of the histograms
+default_buckets = {
+    "duration_seconds": [1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 0.1, 1.0, 10.0, 100.0],
+    "iterations": [1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000],
+}
+descriptions = {
+    "calls_total": "Number of calls",
+    "errors_total": "Number of calls ending with an exception",
+    "outcomes_total": "Number of calls per outcome",
+    "function_evaluations_total": "Number of evaluations of the function given to the method",
+    "duration_seconds": "Wall time of a call in seconds",
+    "iterations": "Number of iterations or levels of a call",
+}
+no_timer = _NoTimer()
+
+# registry the decorated functions of this repository report to
+metrics = MetricsRegistry(enabled=os.environ.get("NUMERICAL_METHODS_METRICS", "") not in ("", "0"))
+
+
+if __name__ == "__main__":
+    from math import *
+
+    from metrics_registry import metrics # the registry the scripts report to, not the one of __main__
+    from numerical_methods_mod_false_pos import bisect, modfalsepos
+    from numerical_methods_newton_raphson import newton_raphson
+    from numerical_methods_secant import secant
+    from brents_method_wikipedia import brents_wiki
+    from numerical_integration_romberg import romberg
+    from numerical_integration_adaptive import gauss_kronrod
+    from numerical_integration_tanh_sinh import tanh_sinh
+    from lagrange_interpolation4 import lagrange_arr
+
+    def colebrook(f, Re=1e5, eps_D=1e-4):
+        """Colebrook equation of the friction factor f of a pipe"""
+        return 1 / sqrt(f) + 2 * log10(eps_D / 3.7 + 2.51 / (Re * sqrt(f)))
+
+    print("Metrics registry of the solvers, integrators and interpolators")
+    print("--------------------------------------------------------------")
+    runs = 20000
+    metrics.disable()
+    t_start = time.perf_counter()
+    for run in range(runs):
+        modfalsepos.__wrapped__(colebrook, (0.008, 0.08), 100, 1e-6)
+    t_plain = (time.perf_counter() - t_start) / runs
+    t_start = time.perf_counter()
+    for run in range(runs):
+        modfalsepos(colebrook, (0.008, 0.08), 100, 1e-6)
+    t_disabled = (time.perf_counter() - t_start) / runs
+    metrics.enable()
+    t_start = time.perf_counter()
+    for run in range(runs):
+        modfalsepos(colebrook, (0.008, 0.08), 100, 1e-6)
+    t_enabled = (time.perf_counter() - t_start) / runs
+    print(f"modfalsepos on the Colebrook equation, mean of {runs} calls")
+    print(f"    without decorator {1e6 * t_plain:.2f}us, metrics disabled {1e6 * t_disabled:.2f}us, "
+          f"enabled {1e6 * t_enabled:.2f}us\n")
+
+    metrics.reset()
+    for Re in (4e3, 1e4, 1e5, 1e6, 1e7):
+        modfalsepos(lambda f: colebrook(f, Re), (0.008, 0.08), 100, 1e-6)
+        bisect(lambda f: colebrook(f, Re), (0.008, 0.08), 20, 1e-6) # too few iterations
+        brents_wiki(lambda f: colebrook(f, Re), (0.008, 0.08), verbose=False)
+    brents_wiki(lambda f: colebrook(f, 1e5), (0.05, 0.08), verbose=False) # root not in the interval
+    newton_raphson(lambda x: exp(-x) - x, lambda x: -exp(-x) - 1, 0.0, 1e-8, 50, verbose=False)
+    newton_raphson(lambda x: x**2 - 2, lambda x: 2 * x, 0.0, 1e-8, 50, verbose=False) # zero derivative at x0
+    secant(lambda x: exp(-x) - x, 0.0, 1.0, 1e-8, 50, verbose=False)
+    velocity = lambda t: 9.81 * 68.1 / 12.5 * (1 - exp(-12.5 / 68.1 * t))
+    romberg(0, 10, 10, 1e-8, velocity)
+    gauss_kronrod(0, 10, velocity, es=1e-10)
+    tanh_sinh(0, 1, lambda x: log(x) / sqrt(x))
+    lagrange_arr([0.5 * k for k in range(-10, 11)], [-5.2, -3.5, -1.2, 0.2, 1.5, 3.6, 4.7, 5.7],
+                 [-10.3, -6.2, 0.3, 1.7, 3.4, 11.4, 6.1, 8.3])
+    try:
+        modfalsepos(log, (-1, 2), 100, 1e-6) # log of a negative number
+    except ValueError as error:
+        print(f"modfalsepos raised ValueError: {error}, counted as error\n")
+
+    print("Method                |calls|errors|time (us)|evaluations|iterations|failure rate|outcomes")
+    for method, item in metrics.summary().items():
+        iterations = "" if item["iterations"] is None else f"{item['iterations']:.1f}"
+        outcomes = ", ".join(f"{outcome} {n}" for outcome, n in item["outcomes"].items())
+        print(f"{method:<22}|{item['calls']:>5}|{item['errors']:>6}|{1e6 * item['seconds']:>9.1f}|"
+              f"{item['evaluations']:>11}|{iterations:>10}|{item['failure_rate']:>12.0%}|{outcomes}")
+
+    print("\nPrometheus export, counters and histogram of modfalsepos:")
+    for line in metrics.to_prometheus().splitlines():
+        if "modfalsepos" in line and "_bucket" not in line or 'method="modfalsepos",le="1e-05"' in line:
+            print("    " + line)
+    print(f"\nJSON export: {len(metrics.to_json())} characters")
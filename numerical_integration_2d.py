@@ -0,0 +1,193 @@
+# Two-dimensional integration (cubature) over a rectangle
+# tensor products of the Trapezoidal rule, Simpson's rules of
+# NUMERICAL METHODS FOR ENGINEERS 8th Edition and the Gauss-Legendre rule
+#
+#   by bx                  nx  ny
+#   ∫  ∫ f(x, y).dx.dy  ≈  ∑   ∑  wxi . wyj . f(xi, yj)
+#   ay ax                  i=0 j=0
+#
+# wxi and wyj are the weights of the 1-D rule in x and in y.
+# The integrand is evaluated once on the full meshgrid of nodes,
+# the weights are applied with two matrix-vector products: wx . F . wy
+#
+# Adaptive version for integrands with localized features:
+# tensor product of the Gauss-Kronrod 7-15 rule on each rectangle
+#
+#   error ≈ |K - G|,  K: 15 x 15 Kronrod nodes, G: 7 x 7 Gauss nodes
+#
+# Rectangles with an error above their share of the tolerance (in proportion to their area)
+# are split in 4. All rectangles of a level are evaluated with one call of f,
+# so the runtime scales with the number of evaluations and not with the number of calls.
+#
+# This code uses the numpy library
+
+from math import *
+
+import numpy as np
+
+from numerical_integration_adaptive import xgk, wgk, wg
+from numerical_integration_gauss_legendre import gauss_legendre_nodes
+from metrics_registry import error_outcome, instrumented
+
+
+def rule_1d(a, b, n, rule):
+    """Nodes and weights of a 1-D rule on [a, b] as numpy arrays
+    a: start of interval
+    b: stop of interval
+    n: number of segments, number of nodes for "gauss"
+    rule: "trapezoidal", "simpson13", "simpson38" or "gauss"
+    For "simpson38" n is modified to the next multiple of 3 if needed"""
+    if rule == "gauss":
+        x, w = (np.asarray(v) for v in gauss_legendre_nodes(n))
+        return (a + b) / 2 + (b - a) / 2 * x, (b - a) / 2 * w
+    if rule == "simpson13" and n % 2:
+        raise ValueError("Simpson's 1/3 rule needs an even number of segments")
+    if rule == "simpson38":
+        n = (n // 3 + 1) * 3 # modify n so it is multiple of 3, as simpsons38m() does
+    h = (b - a) / n
+    i = np.arange(n + 1)
+    x = a + h * i
+    x[-1] = b
+    if rule == "trapezoidal":
+        w = np.full(n + 1, h)
+        w[0] = w[-1] = h / 2
+    elif rule == "simpson13":
+        w = np.where(i % 2 == 1, 4 * h / 3, 2 * h / 3)
+        w[0] = w[-1] = h / 3
+    elif rule == "simpson38":
+        w = np.where(i % 3 == 0, 6 * h / 8, 9 * h / 8)
+        w[0] = w[-1] = 3 * h / 8
+    else:
+        raise ValueError(f"unknown rule {rule}, use trapezoidal, simpson13, simpson38 or gauss")
+    return x, w
+
+
+@instrumented
+def cubature(ax, bx, ay, by, nx, ny, f, rule="simpson13"):
+    """
+    Tensor-product rule over the rectangle [ax, bx] x [ay, by]
+    ax, bx: integration interval in x
+    ay, by: integration interval in y
+    nx, ny: number of segments in x and y, number of nodes for "gauss"
+    f: function f(x, y) to integrate, called once with 2-D numpy arrays
+    rule: "trapezoidal", "simpson13", "simpson38" or "gauss"
+    returns integral and number of evaluations of f
+    """
+    x, wx = rule_1d(ax, bx, nx, rule)
+    y, wy = rule_1d(ay, by, ny, rule)
+    X, Y = np.meshgrid(x, y, indexing="ij")
+    F = np.asarray(f(X, Y), dtype=float)
+    return float(wx @ F @ wy), F.size
+
+
+def _gk15_2d(rects, f):
+    """Tensor-product Gauss-Kronrod 7-15 rule on an array of rectangles, one call of f
+    rects: array of rows ax, bx, ay, by
+    returns arrays of Kronrod integrals and error estimates |K - G|"""
+    cx = (rects[:, 0] + rects[:, 1]) / 2; hx = (rects[:, 1] - rects[:, 0]) / 2
+    cy = (rects[:, 2] + rects[:, 3]) / 2; hy = (rects[:, 3] - rects[:, 2]) / 2
+    X = cx[:, None, None] + hx[:, None, None] * x15[None, :, None]
+    Y = cy[:, None, None] + hy[:, None, None] * x15[None, None, :]
+    F = np.asarray(f(X, Y), dtype=float)
+    kronrod = hx * hy * np.einsum("i,mij,j->m", wk15, F, wk15)
+    gauss = hx * hy * np.einsum("i,mij,j->m", wg15, F, wg15)
+    return kronrod, np.abs(kronrod - gauss)
+
+
+@instrumented(outcome=error_outcome(1))
+def adaptive_cubature(ax, bx, ay, by, f, es=1e-6, abs_tol=0.0, limit=10000, batch_size=4096):
+    """
+    Adaptive tensor-product Gauss-Kronrod 7-15 rule over the rectangle [ax, bx] x [ay, by]
+    Rectangles with an error estimate above their share of the tolerance are split in 4
+    ax, bx: integration interval in x
+    ay, by: integration interval in y
+    f: function f(x, y) to integrate, called with 3-D numpy arrays
+    es: maximum relative error allowed in %
+    abs_tol: maximum absolute error allowed
+    limit: max. number of rectangles evaluated
+    batch_size: max. number of rectangles evaluated with one call of f
+    returns integral, absolute error estimate, number of evaluations of f
+    """
+    area = (bx - ax) * (by - ay)
+    active = np.array([[ax, bx, ay, by]], dtype=float)
+    done_integral = []; done_error = []
+    n_rects = 0
+    while len(active):
+        kronrod = np.empty(len(active)); error = np.empty(len(active))
+        for start in range(0, len(active), batch_size):
+            stop = min(start + batch_size, len(active))
+            kronrod[start:stop], error[start:stop] = _gk15_2d(active[start:stop], f)
+        n_rects += len(active)
+        integral = fsum(done_integral) + fsum(kronrod)
+        tol = max(abs_tol, es / 100 * abs(integral))
+        total_error = fsum(done_error) + fsum(error)
+        rect_area = (active[:, 1] - active[:, 0]) * (active[:, 3] - active[:, 2])
+        split = error > tol * rect_area / area
+        if total_error <= tol or not split.any() or n_rects + 4 * split.sum() > limit:
+            split[:] = False
+        done_integral.extend(kronrod[~split]); done_error.extend(error[~split])
+        # split the remaining rectangles in 4 at their centre
+        xl, xu, yl, yu = active[split].T
+        xm = (xl + xu) / 2; ym = (yl + yu) / 2
+        active = np.concatenate([np.stack(r, axis=1) for r in
+                                 ((xl, xm, yl, ym), (xm, xu, yl, ym), (xl, xm, ym, yu), (xm, xu, ym, yu))])
+    return fsum(done_integral), fsum(done_error), 225 * n_rects
+
+
+# Gauss-Kronrod 7-15 nodes and weights on [-1, 1] as numpy arrays of 15 values,
+# Gauss weights are zero at the Kronrod nodes which are not Gauss nodes
+x15 = np.array([-x for x in xgk[:7]] + [0.0] + xgk[6::-1])
+wk15 = np.array(wgk[:7] + [wgk[7]] + wgk[6::-1])
+wg15 = np.zeros(15)
+wg15[[1, 3, 5]] = wg[:3]
+wg15[[13, 11, 9]] = wg[:3]
+wg15[7] = wg[3]
+
+
+# Heat flux on a square plate of 1m x 1m with a hot spot of width sigma at x0, y0
+def heat_flux(x, y):
+    """heat flux in W/m² at x, y, x and y can be numpy arrays"""
+    return q_background + q_spot * np.exp(-((x - x0)**2 + (y - y0)**2) / (2 * sigma**2))
+
+
+def heat_exact():
+    """total heat flow in W obtained using calculus"""
+    s = sigma * sqrt(pi / 2)
+    gx = s * (erf((1 - x0) / (sigma * sqrt(2))) + erf(x0 / (sigma * sqrt(2))))
+    gy = s * (erf((1 - y0) / (sigma * sqrt(2))) + erf(y0 / (sigma * sqrt(2))))
+    return q_background + q_spot * gx * gy
+
+
+q_background = 100.0 # W/m²
+q_spot = 5000.0 # W/m²
+x0 = 0.3; y0 = 0.6 # m
+sigma = 0.01 # m
+
+
+if __name__ == "__main__":
+    import time
+
+    from numerical_integration_simpsons_rule import simpsons13m
+
+    exact = heat_exact()
+    print("Two-dimensional integration over a rectangle")
+    print("--------------------------------------------")
+    print(f"Total heat flow through a 1m x 1m plate with a hot spot of width {sigma}m at ({x0}, {y0})")
+    print(f"Exact value obtained using calculus {exact}W\n")
+    print("Rule                         |evaluations|result (W)          |relative error|time (s)")
+    rows = []
+    for rule, n in [("trapezoidal", 100), ("simpson13", 100), ("simpson38", 99), ("gauss", 50),
+                    ("trapezoidal", 1000), ("simpson13", 1000), ("gauss", 400)]:
+        t_start = time.perf_counter()
+        integral, n_evals = cubature(0, 1, 0, 1, n, n, heat_flux, rule)
+        rows.append((f"{rule} {n} x {n}", n_evals, integral, time.perf_counter() - t_start))
+    t_start = time.perf_counter()
+    integral, error, n_evals = adaptive_cubature(0, 1, 0, 1, heat_flux, es=1e-8)
+    rows.append(("adaptive Gauss-Kronrod", n_evals, integral, time.perf_counter() - t_start))
+    n = 100
+    t_start = time.perf_counter() # nested calls of the 1-D rule, one call of f per node
+    integral = simpsons13m(0, 1, n, lambda y: simpsons13m(0, 1, n, lambda x: heat_flux(x, y))[0])[0]
+    rows.append((f"nested simpsons13m {n} x {n}", (n + 1)**2, integral, time.perf_counter() - t_start))
+    for name, n_evals, integral, run_time in rows:
+        print(f"{name:<29}|{n_evals:>11}|{integral:>20.12f}|{abs(integral - exact) / exact:>14.1e}|{run_time:>8.4f}")
+    print(f"\nAdaptive Gauss-Kronrod error estimate {error:.1e}W")
@@ -0,0 +1,185 @@
+# Adaptive numerical integration with error control
+# Adaptive Simpson's rule adapted from the pseudocode of adaptive quadrature
+# in NUMERICAL METHODS FOR ENGINEERS 8th Edition
+# and adaptive Gauss-Kronrod 7-15 rule
+#
+# The integration interval is subdivided only where the local error estimate
+# is too large, evaluations of the function are spent where the integrand is difficult.
+# Both methods return the integral, an estimate of the absolute error
+# and the number of evaluations of the function.
+#
+# Adaptive Simpson's rule, S1 on [a, b], S2 = S1 on [a, m] + S1 on [m, b]
+#
+#   error ≈ (S2 - S1) / 15,  integral ≈ S2 + (S2 - S1) / 15
+#
+# Gauss-Kronrod 7-15 rule, G: 7 point Gauss rule, K: 15 point Kronrod rule
+# the 15 Kronrod nodes include the 7 Gauss nodes
+#
+#   error ≈ |K - G|,  integral ≈ K
+#
+# The Gauss-Kronrod version keeps all subintervals in a priority queue and always
+# splits the subinterval with the largest error estimate.
+
+from math import *
+import heapq
+
+from metrics_registry import error_outcome, instrumented
+
+
+def _simpson(a, fa, b, fb, f):
+    """Simpson's 1/3 rule on [a, b] with 1 new evaluation of f at the midpoint
+    returns midpoint, f(midpoint), integral"""
+    m = (a + b) / 2
+    fm = f(m)
+    return m, fm, (b - a) / 6 * (fa + 4 * fm + fb)
+
+
+@instrumented(outcome=error_outcome(1))
+def adaptive_simpson(a, b, f, es=1e-6, abs_tol=0.0, max_depth=50, max_evals=100000):
+    """
+    Adaptive Simpson's rule for given function
+    a: start of integration interval
+    b: stop of integration interval
+    f: function to integrate
+    es: maximum relative error allowed in %
+    abs_tol: maximum absolute error allowed
+    max_depth: max. number of times an interval is halved
+    max_evals: max. number of evaluations of f, intervals are not halved any more when reached
+    returns integral, absolute error estimate, number of evaluations of f
+    """
+    n_evals = 0
+
+    def halves(a, fa, m, fm, b, fb):
+        """Simpson's rule on both halves of [a, b], 2 new evaluations of f"""
+        nonlocal n_evals
+        n_evals += 2
+        return _simpson(a, fa, m, fm, f) + _simpson(m, fm, b, fb, f)
+
+    def qstep(a, fa, m, fm, b, fb, whole, tol, depth, refined):
+        """Refine Simpson's rule on [a, b] until error estimate is below tol"""
+        lm, flm, left, rm, frm, right = refined
+        delta = left + right - whole
+        if depth >= max_depth or n_evals >= max_evals or abs(delta) <= 15 * tol:
+            return left + right + delta / 15, abs(delta) / 15
+        left_i, left_e = qstep(a, fa, lm, flm, m, fm, left, tol / 2, depth + 1, halves(a, fa, lm, flm, m, fm))
+        right_i, right_e = qstep(m, fm, rm, frm, b, fb, right, tol / 2, depth + 1, halves(m, fm, rm, frm, b, fb))
+        return left_i + right_i, left_e + right_e
+
+    fa = f(a); fb = f(b)
+    m, fm, whole = _simpson(a, fa, b, fb, f)
+    n_evals += 3
+    refined = halves(a, fa, m, fm, b, fb)
+    lm, flm, left, rm, frm, right = refined
+    # relative error is measured against the integral of |f| on the 5 first points, not zero when the
+    # integral is zero (odd f on a symmetric interval), round-off of f is the smallest possible error
+    values = [abs(fa), abs(flm), abs(fm), abs(frm), abs(fb)]
+    abs_whole = abs(b - a) / 12 * (values[0] + 4 * values[1] + 2 * values[2] + 4 * values[3] + values[4])
+    tol = max(abs_tol, es / 100 * abs_whole, 1e-15 * abs(b - a) * max(values))
+    integral, error = qstep(a, fa, m, fm, b, fb, whole, tol, 0, refined)
+    return integral, error, n_evals
+
+
+# Gauss-Kronrod 7-15 nodes and weights on [-1, 1], from 1 to 0
+# Kronrod nodes with odd index are the Gauss nodes
+xgk = [0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+       0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+       0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+       0.207784955007898467600689403773245, 0.000000000000000000000000000000000]
+wgk = [0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+       0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+       0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+       0.204432940075298892414161999234649, 0.209482141084727828012999174891714]
+wg = [0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+      0.381830050505118944950369775488975, 0.417959183673469387755102040816327]
+
+
+def gk15(a, b, f):
+    """Gauss-Kronrod 7-15 rule on [a, b], 15 evaluations of f
+    returns Kronrod integral and error estimate |K - G|"""
+    center = (a + b) / 2
+    half = (b - a) / 2
+    fc = f(center)
+    kronrod = wgk[7] * fc
+    gauss = wg[3] * fc
+    for k in range(7):
+        dx = half * xgk[k]
+        f_pair = f(center - dx) + f(center + dx)
+        kronrod += wgk[k] * f_pair
+        if k % 2 == 1:
+            gauss += wg[k // 2] * f_pair
+    kronrod *= half
+    gauss *= half
+    return kronrod, abs(kronrod - gauss)
+
+
+@instrumented(outcome=error_outcome(1))
+def gauss_kronrod(a, b, f, es=1e-6, abs_tol=0.0, limit=200):
+    """
+    Adaptive Gauss-Kronrod 7-15 rule for given function
+    The subinterval with the largest error estimate is halved until
+    the total error estimate is small enough
+    a: start of integration interval
+    b: stop of integration interval
+    f: function to integrate
+    es: maximum relative error allowed in %
+    abs_tol: maximum absolute error allowed
+    limit: max. number of subintervals
+    returns integral, absolute error estimate, number of evaluations of f
+    """
+    integral, error = gk15(a, b, f)
+    n_evals = 15
+    heap = [(-error, a, b, integral)] # largest error on top
+    n_intervals = 1
+    while error > max(abs_tol, es / 100 * abs(integral)) and n_intervals < limit:
+        neg_error, xl, xu, old_integral = heapq.heappop(heap)
+        old_error = -neg_error
+        xm = (xl + xu) / 2
+        left, left_error = gk15(xl, xm, f)
+        right, right_error = gk15(xm, xu, f)
+        n_evals += 30
+        n_intervals += 1
+        heapq.heappush(heap, (-left_error, xl, xm, left))
+        heapq.heappush(heap, (-right_error, xm, xu, right))
+        integral += left + right - old_integral
+        error += left_error + right_error - old_error
+    integral = fsum(item[3] for item in heap) # avoid accumulated round-off of the updates
+    error = fsum(-item[0] for item in heap)
+    return integral, error, n_evals
+
+
+# The velocity of a falling object with air resistance
+# where g is acceleration due to gravity
+# m is mass
+# c is the drag coefficient
+# t is time
+def velocity(t):
+    """velocity as funtion of time"""
+    return g * m / c * (1 - exp(-(c * t / m)) )
+
+
+g = 9.8 # m/s² acceleration due to gravity
+m = 68.1 # kg mass
+c = 12.5 # kg/s drag coefficient
+
+distance_exact = 289.43515 # m
+
+
+if __name__ == "__main__":
+    # integrands: name, function, interval, exact value
+    problems = [
+        ("velocity v(t), falling parachutist", velocity, 0.0, 10.0,
+         g * m / c * (10.0 + m / c * (exp(-c * 10.0 / m) - 1))), # exact to all digits
+        ("sqrt(x), endpoint singular derivative", sqrt, 0.0, 1.0, 2 / 3),
+        ("1/((x-0.3)²+0.001), sharp peak", lambda x: 1 / ((x - 0.3)**2 + 0.001), 0.0, 1.0,
+         (atan(0.7 / sqrt(0.001)) + atan(0.3 / sqrt(0.001))) / sqrt(0.001)),
+    ]
+    es = 1e-8 # max. relative error in %
+    print("Adaptive numerical integration with error control")
+    print("-------------------------------------------------")
+    print(f"Maximum relative error es = {es}%\n")
+    for name, f, a, b, exact in problems:
+        print(name, f"on [{a}, {b}], exact integral = {exact}")
+        for method in (adaptive_simpson, gauss_kronrod):
+            integral, error, n_evals = method(a, b, f, es)
+            print(f"    {method.__name__:<17}: {integral:.12f}, error estimate {error:.1e},", end="")
+            print(f" true error {abs(integral - exact):.1e}, {n_evals} evaluations")
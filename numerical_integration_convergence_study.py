@@ -0,0 +1,194 @@
+# Convergence study of integration rules
+# with timing and accounting of the number of function evaluations
+#
+# Every rule is applied on every problem with a known exact value for a list of n.
+# For each run the true error, the number of evaluations of f and the wall time are recorded.
+# The results can be written as JSON or CSV.
+#
+# Observed order of convergence, least-squares fit of a straight line in a log-log plot
+# of the true error against the number of evaluations N:
+#
+#   et ≈ C . N^-p  →  log(et) = log(C) - p.log(N)
+#
+#   p = - ∑ (xi - x̄)(yi - ȳ) / ∑ (xi - x̄)²,  xi = log(Ni), yi = log(eti)
+#
+# For the Trapezoidal rule p ≈ 2, for Simpson's rules p ≈ 4.
+# Errors at the level of round-off are left out of the fit.
+
+from math import *
+import csv
+import json
+import time
+
+from numerical_integration_gauss_legendre import gauss_legendre
+from numerical_integration_simpsons_rule import trapm, simpsons13m, simpsons38m
+
+
+class _Counter:
+    """Function wrapper counting the number of evaluations"""
+    def __init__(self, f):
+        self.f = f
+        self.n_evals = 0
+
+    def __call__(self, x):
+        self.n_evals += 1
+        return self.f(x)
+
+
+def _integral(result):
+    """Integral from the result of a rule, a number or a tuple starting with the integral"""
+    return float(result[0] if isinstance(result, tuple) else result)
+
+
+def run_study(rules, problems, segments, repeat=3):
+    """
+    Convergence study of integration rules
+    rules: dict name: function rule(a, b, n, f) returning the integral
+           or a tuple starting with the integral
+    problems: list of tuples (name, f, a, b, exact value), exact value not zero
+    segments: list of values of n
+    repeat: number of timed runs, the fastest is kept
+    returns list of dicts, one per rule, problem and n, with keys
+    rule, problem, n, integral, exact, error, et (relative error in %), n_evals, time (s)
+    """
+    results = []
+    for problem, f, a, b, exact in problems:
+        for rule, method in rules.items():
+            for n in segments:
+                counter = _Counter(f)
+                integral = _integral(method(a, b, n, counter))
+                run_time = inf
+                for i in range(repeat):
+                    t_start = time.perf_counter()
+                    method(a, b, n, f)
+                    run_time = min(run_time, time.perf_counter() - t_start)
+                error = abs(integral - exact)
+                results.append(dict(zip(fields, (rule, problem, n, integral, exact, error,
+                                                 100 * error / abs(exact), counter.n_evals, run_time))))
+    return results
+
+
+def fit_order(results, rule, problem, et_min=1e-11):
+    """
+    Observed order of convergence p in et ≈ C . N^-p, N number of evaluations
+    results: list of dicts from run_study()
+    rule, problem: names of the rule and the problem
+    et_min: relative errors in % below et_min are round-off and left out of the fit
+    returns p, or None with less than two usable points
+    """
+    points = [(log(r["n_evals"]), log(r["et"])) for r in results
+              if r["rule"] == rule and r["problem"] == problem and r["et"] > et_min]
+    if len({x for x, y in points}) < 2:
+        return None
+    x_mean = sum(x for x, y in points) / len(points)
+    y_mean = sum(y for x, y in points) / len(points)
+    sxy = sum((x - x_mean) * (y - y_mean) for x, y in points)
+    sxx = sum((x - x_mean)**2 for x, y in points)
+    return -sxy / sxx
+
+
+def cheapest_rule(results, problem, target, cost="n_evals"):
+    """
+    Cheapest run meeting a target error
+    results: list of dicts from run_study()
+    problem: name of the problem
+    target: maximum relative error allowed in %
+    cost: "n_evals" or "time"
+    returns dict of the cheapest run, or None if no run meets the target
+    """
+    runs = [r for r in results if r["problem"] == problem and r["et"] <= target]
+    if not runs:
+        return None
+    return min(runs, key=lambda r: (r[cost], r["n_evals"], r["time"]))
+
+
+def write_json(results, path):
+    """Write results of run_study() to a JSON file"""
+    with open(path, "w") as file:
+        json.dump(results, file, indent=1)
+
+
+def write_csv(results, path):
+    """Write results of run_study() to a CSV file, one row per run, only the header without results"""
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(results[0]) if results else fields)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+# The velocity of a falling object with air resistance
+# where g is acceleration due to gravity
+# m is mass
+# c is the drag coefficient
+# t is time
+def velocity(t):
+    """velocity as funtion of time"""
+    return g * m / c * (1 - exp(-(c * t / m)) )
+
+
+def distance_exact(t):
+    """distance as function of time obtained using calculus"""
+    return g * m / c * (t + m / c * (exp(-(c * t / m)) - 1))
+
+
+def ellipse_integrand(theta):
+    """circumference of ellipse a_ellipse, b_ellipse is the integral of this function from 0 to π/2"""
+    return 4 * a_ellipse * sqrt(1 - (eccentricity * sin(theta))**2)
+
+
+g = 9.8 # m/s² acceleration due to gravity
+m = 68.1 # kg mass
+c = 12.5 # kg/s drag coefficient
+
+a_ellipse = 2
+b_ellipse = 1
+eccentricity = sqrt(1 - b_ellipse**2 / a_ellipse**2)
+
+# keys of the results of run_study(), columns of the CSV file
+fields = ["rule", "problem", "n", "integral", "exact", "error", "et", "n_evals", "time"]
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import tempfile
+
+    from numerical_integration_ellipse_batch import ellipse_circumference_agm
+
+    # path of the output files without extension, default in the temporary directory
+    prefix = sys.argv[1] if len(sys.argv) > 1 else os.path.join(tempfile.gettempdir(), "convergence_study")
+    rules = {
+        "Trapezoidal": trapm,
+        "Simpson 1/3": simpsons13m,
+        "Simpson 3/8": simpsons38m,
+        "Gauss-Legendre 4 nodes x n panels": lambda a, b, n, f: gauss_legendre(a, b, 4, f, panels=n),
+    }
+    problems = [
+        ("Distance falling parachutist at t = 10s", velocity, 0, 10.0, distance_exact(10.0)),
+        ("Circumference of ellipse a = 2, b = 1", ellipse_integrand, 0, pi / 2,
+         float(ellipse_circumference_agm(a_ellipse, b_ellipse))),
+        ("∫ √x on [0, 1]", sqrt, 0, 1.0, 2 / 3),
+    ]
+    segments = [2**k for k in range(1, 11)]
+    results = run_study(rules, problems, segments)
+    write_json(results, prefix + ".json")
+    write_csv(results, prefix + ".csv")
+
+    print("Convergence study of integration rules")
+    print("--------------------------------------")
+    print(f"n = {segments[0]} .. {segments[-1]}, results written to {prefix}.json and {prefix}.csv")
+    for problem, f, a, b, exact in problems:
+        print(f"\n{problem}, exact value {exact}")
+        print("Rule                              |observed order p|N for et < 1e-6%|time (s)")
+        for rule in rules:
+            p = fit_order(results, rule, problem)
+            runs = [r for r in results if r["rule"] == rule and r["problem"] == problem and r["et"] < 1e-6]
+            run = min(runs, key=lambda r: r["n_evals"]) if runs else None
+            print(f"{rule:<34}|{p:>16.2f}|" if p is not None else f"{rule:<34}|{'-':>16}|", end="")
+            print(f"{run['n_evals']:>16}|{run['time']:>8.1e}" if run else f"{'not reached':>16}|")
+        for target in [1e-3, 1e-6, 1e-10]:
+            run = cheapest_rule(results, problem, target)
+            if run:
+                print(f"    cheapest for et <= {target}%: {run['rule']}, n = {run['n']}, {run['n_evals']} evaluations")
+            else:
+                print(f"    cheapest for et <= {target}%: no rule reaches the target")
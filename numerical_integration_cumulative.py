@@ -0,0 +1,148 @@
+# Cumulative (running) integral with the Trapezoidal rule and Simpson's 1/3 rule
+# applied on Example 21.3 on page 622 and 623 of NUMERICAL METHODS FOR ENGINEERS 8th Edition
+#
+# One sweep over the nodes gives the integral from a to every node:
+#
+#          x_k
+#   I_k =  ∫ f(x).dx,  k = 0 .. n
+#          a
+#
+# Trapezoidal rule, each segment:  h/2 * (f_k + f_k+1)
+#
+# Simpson's 1/3 rule, the quadratic through f_k, f_k+1, f_k+2 is integrated
+# over each half of the panel:
+#   first half:   h/12 * ( 5.f_k + 8.f_k+1 - f_k+2 )
+#   second half:  h/12 * ( -f_k + 8.f_k+1 + 5.f_k+2 )
+# both halves together give Simpson's 1/3 rule h/3 * (f_k + 4.f_k+1 + f_k+2),
+# so at every even node the result equals simpsons13m().
+#
+# Between nodes, at requested output times, the same linear or quadratic
+# interpolant is integrated up to the output time.
+#
+# This code uses the numpy library
+
+import numpy as np
+
+from metrics_registry import instrumented
+
+
+def _evaluate(x, f, vectorized):
+    """Function values at all nodes, f called once on the array when vectorized"""
+    if vectorized:
+        return np.asarray(f(x), dtype=float)
+    return np.fromiter((f(xi) for xi in x), dtype=float, count=len(x))
+
+
+@instrumented
+def cumtrapm(a, b, n, f, t_out=None, vectorized=True):
+    """
+    Cumulative Trapezoidal rule for given function
+    a: start of integration interval
+    b: stop of integration interval
+    n: number of segments
+    f: function to integrate
+    t_out: optional array of output points in [a, b]
+    vectorized: if True, f is called once with a numpy array of all nodes
+    returns nodes and integral from a to every node,
+    or integral from a to every point of t_out when t_out is given
+    """
+    h = (b - a) / n
+    x = a + h * np.arange(n + 1)
+    fx = _evaluate(x, f, vectorized)
+    I = np.empty(n + 1)
+    I[0] = 0.0
+    np.cumsum(h / 2 * (fx[:-1] + fx[1:]), out=I[1:])
+    if t_out is None:
+        return x, I
+    t = np.asarray(t_out, dtype=float)
+    k = np.clip(np.searchsorted(x, t, side="right") - 1, 0, n - 1)
+    s = t - x[k]
+    f_t = fx[k] + (fx[k+1] - fx[k]) * s / h # linear interpolant at t
+    return np.ascontiguousarray(I[k] + s * (fx[k] + f_t) / 2)
+
+
+@instrumented
+def cumsimpsons13m(a, b, n, f, t_out=None, vectorized=True):
+    """
+    Cumulative Simpson's 1/3 rule for given function
+    For odd n the last segment uses the quadratic of the last panel
+    a: start of integration interval
+    b: stop of integration interval
+    n: number of segments, at least 2
+    f: function to integrate
+    t_out: optional array of output points in [a, b]
+    vectorized: if True, f is called once with a numpy array of all nodes
+    returns nodes and integral from a to every node,
+    or integral from a to every point of t_out when t_out is given
+    """
+    if n < 2:
+        raise ValueError("Simpson's 1/3 rule needs at least 2 segments")
+    h = (b - a) / n
+    x = a + h * np.arange(n + 1)
+    fx = _evaluate(x, f, vectorized)
+    # start of the panel used for each segment k, panels start at even nodes
+    # the last segment of odd n uses the panel n-2, n-1, n
+    k = np.arange(n)
+    p = k - k % 2
+    p[p + 2 > n] = n - 2
+    f0 = fx[p]; f1 = fx[p+1]; f2 = fx[p+2]
+    first_half = h / 12 * (5 * f0 + 8 * f1 - f2)
+    second_half = h / 12 * (-f0 + 8 * f1 + 5 * f2)
+    I = np.empty(n + 1)
+    I[0] = 0.0
+    np.cumsum(np.where(k == p, first_half, second_half), out=I[1:])
+    if t_out is None:
+        return x, I
+    t = np.asarray(t_out, dtype=float)
+    k = np.clip(np.searchsorted(x, t, side="right") - 1, 0, n - 1)
+    p = k - k % 2
+    p[p + 2 > n] = n - 2
+    f0 = fx[p]; f1 = fx[p+1]; f2 = fx[p+2]
+    d1 = (f1 - f0) / h
+    d2 = (f2 - 2 * f1 + f0) / (2 * h * h)
+    # integral of quadratic f0 + d1.u + d2.u.(u - h) from u = 0 to u = s
+    Q = lambda s: f0 * s + d1 * s**2 / 2 + d2 * (s**3 / 3 - h * s**2 / 2)
+    return np.ascontiguousarray(I[k] + Q(t - x[p]) - Q(x[k] - x[p]))
+
+
+# The velocity of a falling object with air resistance
+# where g is acceleration due to gravity
+# m is mass
+# c is the drag coefficient
+# t is time
+def velocity(t):
+    """velocity as funtion of time, t can be a numpy array"""
+    return g * m / c * (1 - np.exp(-(c * t / m)) )
+
+
+def distance_exact(t):
+    """distance as function of time obtained using calculus"""
+    return g * m / c * (t + m / c * (np.exp(-(c * t / m)) - 1))
+
+
+g = 9.8 # m/s² acceleration due to gravity
+m = 68.1 # kg mass
+c = 12.5 # kg/s drag coefficient
+
+
+if __name__ == "__main__":
+    a = 0
+    b = 10.0 # s
+    n = 100
+    print("Cumulative integral of velocity: distance of falling parachutist as function of time")
+    print("-------------------------------------------------------------------------------------")
+    print(f"One sweep with {n} segments, {n + 1} evaluations of v(t)\n")
+    x, D_trap = cumtrapm(a, b, n, velocity)
+    x, D_simpson = cumsimpsons13m(a, b, n, velocity)
+    print("t (s)  |D exact (m)   |Trapezoidal (m)|et(%)      |Simpson 1/3 (m)|et(%)")
+    for k in range(0, n + 1, 10):
+        exact = distance_exact(x[k])
+        error_trap = 100 * (D_trap[k] - exact) / exact if k else 0.0
+        error_simpson = 100 * (D_simpson[k] - exact) / exact if k else 0.0
+        print(f"{x[k]:>7.2f}|{exact:>14.6f}|{D_trap[k]:>15.6f}|{error_trap:>11.2e}|{D_simpson[k]:>15.6f}|{error_simpson:>11.2e}")
+
+    t_out = np.array([0.25, 1.234, 3.3333, 7.77, 9.99])
+    print(f"\nAt requested output times, still {n + 1} evaluations of v(t):")
+    D_out = cumsimpsons13m(a, b, n, velocity, t_out)
+    for t, D in zip(t_out, D_out):
+        print(f"t = {t:>6}s: D = {D:.6f}m, exact {distance_exact(t):.6f}m")
@@ -0,0 +1,158 @@
+# Circumference of many ellipses at once
+# using numpy arrays of semi-axes a and b or of eccentricities e
+#
+# Circumference using Elliptic integral:
+#
+#   e = √( 1 - b² / a² ), a > b
+#
+#                       π/2
+#   Circumference = 4.a.∫ √( 1 - e².sin²(θ) ).d(θ) = 4.a.E(e)
+#                       0
+#
+# Fast path, arithmetic-geometric mean (AGM), converges quadratically:
+#
+#   a0 = a, b0 = b, c0² = a² - b²
+#   an+1 = (an + bn) / 2,  bn+1 = √(an.bn),  cn+1 = (an - bn) / 2
+#   M(a, b) = lim an
+#
+#                       2.π   ⎛        ∞              ⎞
+#   Circumference = ⎯⎯⎯⎯⎯⎯⎯⎯  ⎜  a² -  ∑  2ⁿ⁻¹.cn²    ⎟
+#                    M(a, b)  ⎝       n=0             ⎠
+#
+# Verification path, quadrature with the eccentricity as batch axis:
+# the integrand is evaluated on a grid of eccentricities x nodes and
+# the weights of the rule are applied with a matrix-vector product.
+#
+# This code uses the numpy library
+
+import numpy as np
+
+from metrics_registry import instrumented
+from numerical_integration_gauss_legendre import gauss_legendre_nodes
+
+
+def _agm_sum(a, b, c2, imax=40):
+    """Arithmetic-geometric mean of arrays a and b and the sum ∑ 2ⁿ⁻¹.cn²
+    c2: c0², array"""
+    a = np.array(a, dtype=float); b = np.array(b, dtype=float)
+    total = 0.5 * np.asarray(c2, dtype=float)
+    power = 0.5
+    for iter_ in range(imax):
+        c = (a - b) / 2
+        a, b = (a + b) / 2, np.sqrt(a * b)
+        power *= 2
+        total = total + power * c * c
+        if np.all(np.abs(c) <= 2**-52 * a): # an and bn equal to machine precision
+            break
+    return a, total
+
+
+def integrand(theta, e):
+    """Function to be integrated, no global variables
+    theta: independant variable, array of nodes
+    e: eccentricity, array broadcast against theta"""
+    return np.sqrt(1 - (e * np.sin(theta))**2)
+
+
+@instrumented(function=None)
+def complete_elliptic_e(e):
+    """Complete elliptic integral of the second kind E(e) for an array of eccentricities
+    using the arithmetic-geometric mean
+    e: eccentricities, 0 <= e <= 1"""
+    e = np.asarray(e, dtype=float)
+    k = np.sqrt(1 - e * e)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        m, total = _agm_sum(np.ones_like(e), k, e * e)
+        result = np.pi / (2 * m) * (1 - total)
+    return np.where(e == 1, 1.0, result) # degenerate ellipse, AGM does not converge for b = 0
+
+
+@instrumented(function=None)
+def ellipse_circumference_agm(a, b):
+    """Circumference of ellipses with semi-axes a and b, arrays,
+    using the arithmetic-geometric mean
+    a, b: semi-axes, the larger one is taken as a"""
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    a, b = np.maximum(a, b), np.minimum(a, b)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        m, total = _agm_sum(a, b, a * a - b * b)
+        result = 2 * np.pi / m * (a * a - total)
+    return np.where(b == 0, 4 * a, result) # degenerate ellipse, AGM does not converge for b = 0
+
+
+@instrumented(function=None)
+def complete_elliptic_e_quadrature(e, n=16, rule="gauss", chunk_size=4096):
+    """Complete elliptic integral of the second kind E(e) for an array of eccentricities
+    using quadrature with the eccentricity as batch axis
+    e: eccentricities, 0 <= e <= 1
+    n: number of nodes for "gauss", number of segments for "trapezoidal" and "simpson13"
+    rule: "gauss", "trapezoidal" or "simpson13"
+    chunk_size: number of eccentricities evaluated at once"""
+    e = np.asarray(e, dtype=float)
+    a = 0.0; b = np.pi / 2
+    if rule == "gauss":
+        x, w = (np.asarray(v) for v in gauss_legendre_nodes(n))
+        theta = (a + b) / 2 + (b - a) / 2 * x
+        w = (b - a) / 2 * w
+    else:
+        if rule not in ("trapezoidal", "simpson13") or (rule == "simpson13" and n % 2):
+            raise ValueError(f"unknown rule {rule} or odd n for simpson13")
+        h = (b - a) / n
+        theta = a + h * np.arange(n + 1)
+        if rule == "trapezoidal":
+            w = np.full(n + 1, h); w[0] = w[-1] = h / 2
+        else:
+            w = np.where(np.arange(n + 1) % 2 == 1, 4 * h / 3, 2 * h / 3); w[0] = w[-1] = h / 3
+    flat = e.ravel()
+    result = np.empty_like(flat)
+    for start in range(0, len(flat), chunk_size):
+        stop = min(start + chunk_size, len(flat))
+        result[start:stop] = integrand(theta[None, :], flat[start:stop, None]) @ w
+    return result.reshape(e.shape)
+
+
+@instrumented(function=None)
+def ellipse_circumference_quadrature(a, b, n=16, rule="gauss"):
+    """Circumference of ellipses with semi-axes a and b, arrays, using quadrature
+    a, b: semi-axes, the larger one is taken as a
+    rule: "gauss", "trapezoidal" or "simpson13"
+    n: number of nodes or segments, see complete_elliptic_e_quadrature()"""
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    a, b = np.maximum(a, b), np.minimum(a, b)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        e = np.sqrt(1 - (b / a)**2)
+    e = np.where(a == 0, 0.0, e) # degenerate ellipse a = b = 0, circumference 0
+    return 4 * a * complete_elliptic_e_quadrature(e, n, rule)
+
+
+if __name__ == "__main__":
+    import time
+
+    print("Circumference of ellipses using numpy arrays")
+    print("--------------------------------------------")
+    print("Example ellipse a = 2, b = 1:")
+    print(f"    Arithmetic-geometric mean:           {ellipse_circumference_agm(2, 1)}")
+    print(f"    Gauss-Legendre 16 nodes:             {ellipse_circumference_quadrature(2, 1)}")
+    print(f"    Simpson's 1/3 rule 100 segments:     {ellipse_circumference_quadrature(2, 1, 100, 'simpson13')}")
+
+    n_ellipses = 1_000_000
+    rng = np.random.default_rng(1)
+    a = rng.uniform(1, 10, n_ellipses)
+    b = a * rng.uniform(0.01, 1, n_ellipses)
+    print(f"\n{n_ellipses} random ellipses, b/a from 0.01 to 1:")
+
+    t_start = time.perf_counter()
+    c_agm = ellipse_circumference_agm(a, b)
+    t_stop = time.perf_counter()
+    print(f"    Arithmetic-geometric mean:  {t_stop - t_start:.3f}s")
+
+    for n, rule in [(32, "gauss"), (100, "trapezoidal")]:
+        t_start = time.perf_counter()
+        c_quad = ellipse_circumference_quadrature(a, b, n, rule)
+        t_stop = time.perf_counter()
+        error = np.max(np.abs(c_quad - c_agm) / c_agm)
+        print(f"    {rule:<11} n = {n:<3}:      {t_stop - t_start:.3f}s, max. relative difference with AGM {error:.1e}")
+
+    h = (a - b)**2 / (a + b)**2 # Ramanujan's second approximation
+    c_ramanujan = np.pi * (a + b) * (1 + 3 * h / (10 + np.sqrt(4 - 3 * h)))
+    print(f"    Ramanujan's second approximation: max. relative difference with AGM {np.max(np.abs(c_ramanujan - c_agm) / c_agm):.1e}")
@@ -0,0 +1,199 @@
+# Gauss-Legendre and Gauss-Lobatto quadrature
+# applied on the circumference of an ellipse and Example 21.3 on page 622 and 623
+# of NUMERICAL METHODS FOR ENGINEERS 8th Edition
+#
+# Gauss-Legendre: the n nodes are the roots of the Legendre polynomial Pn(x)
+#
+#   wi = 2 / ( (1 - xi²) . Pn'(xi)² )
+#
+# Gauss-Lobatto: the n nodes are -1, 1 and the roots of Pn-1'(x)
+#
+#   wi = 2 / ( n.(n - 1) . Pn-1(xi)² )
+#
+# The roots are found with Newton-Raphson starting from the Chebyshev-like guesses
+#   xi ≈ cos( π.(i + 0.75) / (n + 0.5) )
+# Legendre polynomials are computed with the recurrence
+#   (k + 1).Pk+1(x) = (2k + 1).x.Pk(x) - k.Pk-1(x)
+#
+# Nodes and weights are computed once per order and kept in a table.
+# The composite mode splits [a, b] in panels and applies the rule on each panel.
+
+from math import *
+
+from metrics_registry import instrumented
+
+
+def legendre(n, x):
+    """Legendre polynomial Pn(x) and its derivative Pn'(x)
+    n: order of the polynomial
+    x: value to evaluate at"""
+    p0 = 1.0; p1 = x
+    if n == 0:
+        return 1.0, 0.0
+    for k in range(1, n):
+        p0, p1 = p1, ((2 * k + 1) * x * p1 - k * p0) / (k + 1)
+    if abs(x) == 1:
+        return p1, n * (n + 1) / 2 * x**(n + 1) # derivative at the end points
+    dp = n * (x * p1 - p0) / (x * x - 1)
+    return p1, dp
+
+
+def _newton(g, x, imax=100):
+    """Newton-Raphson on g(x) which returns value and derivative, until no more change"""
+    for iter_ in range(imax):
+        value, derivative = g(x)
+        dx = value / derivative
+        x -= dx
+        if abs(dx) <= 1e-16 * max(abs(x), 1):
+            break
+    return x
+
+
+def gauss_legendre_nodes(n):
+    """Nodes and weights of the n point Gauss-Legendre rule on [-1, 1]
+    computed once per n and kept in the table gauss_legendre_table
+    n: number of nodes"""
+    if n not in gauss_legendre_table:
+        if n < 1:
+            raise ValueError("Gauss-Legendre rule needs at least 1 node")
+        nodes = []; weights = []
+        for i in range(n):
+            x = _newton(lambda x: legendre(n, x), cos(pi * (i + 0.75) / (n + 0.5)))
+            p, dp = legendre(n, x)
+            nodes.append(x)
+            weights.append(2 / ((1 - x * x) * dp * dp))
+        gauss_legendre_table[n] = (nodes, weights)
+    return gauss_legendre_table[n]
+
+
+def gauss_lobatto_nodes(n):
+    """Nodes and weights of the n point Gauss-Lobatto rule on [-1, 1], end points included
+    computed once per n and kept in the table gauss_lobatto_table
+    n: number of nodes, at least 2"""
+    if n not in gauss_lobatto_table:
+        if n < 2:
+            raise ValueError("Gauss-Lobatto rule needs at least 2 nodes")
+
+        def dlegendre(x):
+            """Pn-1'(x) and Pn-1''(x), from the Legendre differential equation"""
+            p, dp = legendre(n - 1, x)
+            return dp, (2 * x * dp - (n - 1) * n * p) / (1 - x * x)
+
+        nodes = [1.0]
+        for i in range(1, n - 1):
+            nodes.append(_newton(dlegendre, cos(pi * i / (n - 1))))
+        nodes.append(-1.0)
+        weights = [2 / (n * (n - 1) * legendre(n - 1, x)[0]**2) for x in nodes]
+        gauss_lobatto_table[n] = (nodes, weights)
+    return gauss_lobatto_table[n]
+
+
+def _composite(a, b, f, panels, nodes, weights, vectorized):
+    """Apply rule with given nodes and weights on [-1, 1] on each panel of [a, b]"""
+    h = (b - a) / panels
+    if vectorized:
+        import numpy as np
+        x = np.asarray(nodes)
+        w = np.asarray(weights)
+        centers = a + h * (np.arange(panels) + 0.5)
+        fx = np.asarray(f(centers[:, None] + h / 2 * x[None, :]), dtype=float)
+        return h / 2 * float(np.sum(fx @ w))
+    sum = 0.0
+    for k in range(panels):
+        center = a + h * (k + 0.5)
+        for xi, wi in zip(nodes, weights):
+            sum += wi * f(center + h / 2 * xi)
+    return h / 2 * sum
+
+
+@instrumented
+def gauss_legendre(a, b, n, f, panels=1, vectorized=False):
+    """
+    Gauss-Legendre rule for given function
+    a: start of integration interval
+    b: stop of integration interval
+    n: number of nodes per panel
+    f: function to integrate
+    panels: number of equal panels [a, b] is split in
+    vectorized: if True, f is called once with a numpy array of all nodes
+    returns integral and number of evaluations of f
+    """
+    nodes, weights = gauss_legendre_nodes(n)
+    return _composite(a, b, f, panels, nodes, weights, vectorized), n * panels
+
+
+@instrumented
+def gauss_lobatto(a, b, n, f, panels=1, vectorized=False):
+    """
+    Gauss-Lobatto rule for given function, end points of the panels are nodes
+    a: start of integration interval
+    b: stop of integration interval
+    n: number of nodes per panel, at least 2
+    f: function to integrate
+    panels: number of equal panels [a, b] is split in
+    vectorized: if True, f is called once with a numpy array of all nodes
+    returns integral and number of evaluations of f,
+    nodes shared by neighbouring panels are evaluated twice
+    """
+    nodes, weights = gauss_lobatto_nodes(n)
+    return _composite(a, b, f, panels, nodes, weights, vectorized), n * panels
+
+
+# tables of nodes and weights, one entry per number of nodes
+gauss_legendre_table = {}
+gauss_lobatto_table = {}
+
+
+def ellipse_integrand(theta, eccentricity):
+    """Function to be integrated for circumference of ellipse
+    theta: independant variable
+    eccentricity: eccentricity of the ellipse"""
+    return sqrt(1 - (eccentricity * sin(theta))**2)
+
+
+# The velocity of a falling object with air resistance
+def velocity(t):
+    """velocity as funtion of time"""
+    return g * m / c * (1 - exp(-(c * t / m)) )
+
+
+g = 9.8 # m/s² acceleration due to gravity
+m = 68.1 # kg mass
+c = 12.5 # kg/s drag coefficient
+
+# parameters Ellipse
+a_ellipse = 2
+b_ellipse = 1
+eccentricity = sqrt(1 - b_ellipse**2 / a_ellipse**2)
+
+
+if __name__ == "__main__":
+    from numerical_integration_simpsons_rule import trapm, simpsons13m, simpsons38m
+
+    # reference values: Gauss-Legendre with many panels and the exact distance using calculus
+    integrand = lambda theta: ellipse_integrand(theta, eccentricity)
+    circumference_ref = 4 * a_ellipse * gauss_legendre(0, pi/2, 20, integrand, panels=20)[0]
+    distance_ref = g * m / c * (10.0 + m / c * (exp(-c * 10.0 / m) - 1))
+    problems = [("Circumference of ellipse a = 2, b = 1", integrand, 0, pi/2, 4 * a_ellipse, circumference_ref),
+                ("Distance falling parachutist at t = 10s", velocity, 0, 10.0, 1, distance_ref)]
+    print("Gauss-Legendre and Gauss-Lobatto quadrature compared with Trapezoidal and Simpson's rules")
+    print("-----------------------------------------------------------------------------------------")
+    for name, f, a, b, factor, reference in problems:
+        print(f"\n{name}, reference value {reference}")
+        print("Rule                |evaluations|result              |relative error")
+        rows = []
+        for n in [6, 12, 100]:
+            rows.append((f"Trapezoidal n={n}", n + 1, factor * trapm(a, b, n, f)[0]))
+            rows.append((f"Simpson 1/3 n={n}", n + 1, factor * simpsons13m(a, b, n, f)[0]))
+            integral, h, n_mod = simpsons38m(a, b, n, f)
+            rows.append((f"Simpson 3/8 n={n_mod}", n_mod + 1, factor * integral))
+        for n in [4, 6, 8, 12]:
+            integral, n_evals = gauss_legendre(a, b, n, f)
+            rows.append((f"Gauss-Legendre n={n}", n_evals, factor * integral))
+        for n in [6, 8, 12]:
+            integral, n_evals = gauss_lobatto(a, b, n, f)
+            rows.append((f"Gauss-Lobatto n={n}", n_evals, factor * integral))
+        integral, n_evals = gauss_legendre(a, b, 4, f, panels=3)
+        rows.append(("G-L n=4, 3 panels", n_evals, factor * integral))
+        for rule, n_evals, result in rows:
+            print(f"{rule:<20}|{n_evals:>11}|{result:>20.15f}|{abs(result - reference) / reference:>10.1e}")
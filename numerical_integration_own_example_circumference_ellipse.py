@@ -25,9 +25,10 @@ Method 2, Simple Arithmetic-Geometric Mean approximation:
         Circumference ≈ √(2).π.√( a² + b² )    
 """
 
-def integrand(theta):
+def integrand(theta, eccentricity):
     """Function to be integrated
-    theta: independant variable"""
+    theta: independant variable
+    eccentricity: eccentricity of the ellipse"""
     return sqrt(1 - (eccentricity * sin(theta))**2)
 
     
@@ -51,26 +52,25 @@ def simpsons38m(a ,b ,n ,f):
     return 3 * h * sum / 8, h
 
 
-print(info)
+if __name__ == "__main__":
+    print(info)
 
-# parameters Ellipse
-a = 2 
-b = 1
+    # parameters Ellipse
+    a = 2 
+    b = 1
 
-# parameters Simpson's rule
-n = 100 # nume-ber of iterations
+    # parameters Simpson's rule
+    n = 100 # nume-ber of iterations
 
-print(f"\nCalculation for an example ellipse with a = {a}  b = {b}:")
-print("------------------------------------------------------")
+    print(f"\nCalculation for an example ellipse with a = {a}  b = {b}:")
+    print("------------------------------------------------------")
 
-eccentricity = sqrt(1 - b**2 / a**2)
-print(f"\n        Eccentricity = {eccentricity}")
-
-integral, h = simpsons38m(0 ,pi/2 ,n ,integrand)
-c1 = 4 * a * integral
-print(f"\n        Using Elliptic integral calculated with Simpson's 3/8 rule coded in Python:\n        Circumference = {c1}")
-
-c2 = sqrt(2) * pi * sqrt(a**2 + b**2)
-print(f"\n        Using Simple Arithmetic-Geometric Mean approximation:\n        Circumference = {c2}")
+    eccentricity = sqrt(1 - b**2 / a**2)
+    print(f"\n        Eccentricity = {eccentricity}")
 
+    integral, h = simpsons38m(0 ,pi/2 ,n ,lambda theta: integrand(theta, eccentricity))
+    c1 = 4 * a * integral
+    print(f"\n        Using Elliptic integral calculated with Simpson's 3/8 rule coded in Python:\n        Circumference = {c1}")
 
+    c2 = sqrt(2) * pi * sqrt(a**2 + b**2)
+    print(f"\n        Using Simple Arithmetic-Geometric Mean approximation:\n        Circumference = {c2}")
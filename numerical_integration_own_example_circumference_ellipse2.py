@@ -21,9 +21,10 @@ Cicumference using Elliptic integral:
                             0
 """
 
-def integrand(theta):
+def integrand(theta, eccentricity):
     """Function to be integrated
-    theta: independant variable"""
+    theta: independant variable
+    eccentricity: eccentricity of the ellipse"""
     return sqrt(1 - (eccentricity * sin(theta))**2)
 
 # Trapezoidal rule
@@ -83,42 +84,41 @@ def simpsons38m(a ,b ,n ,f):
     return 3 * h * sum / 8, h
 
 
-print(info)
+if __name__ == "__main__":
+    print(info)
 
-# parameters Ellipse
-a_ellipse = 2 
-b_ellipse = 1
+    # parameters Ellipse
+    a_ellipse = 2 
+    b_ellipse = 1
 
-# parameters Simpson's rule
-n = 100 # number of iterations
+    # parameters Simpson's rule
+    n = 100 # number of iterations
 
-print(f"Calculation for an example ellipse with a = {a_ellipse}  b = {b_ellipse}:")
+    print(f"Calculation for an example ellipse with a = {a_ellipse}  b = {b_ellipse}:")
 
-eccentricity = sqrt(1 - b_ellipse**2 / a_ellipse**2)
-print(f"\n        Eccentricity = {eccentricity}")
+    eccentricity = sqrt(1 - b_ellipse**2 / a_ellipse**2)
+    print(f"\n        Eccentricity = {eccentricity}")
 
-# Trapezoidal rule 
-integral, h = trapm(0 ,pi/2 ,n ,integrand)
-c0 = 4 * a_ellipse * integral
-print(f"\n        Using Elliptic integral calculated with Trapezoidal rule coded in Python, {n} iterations:\n        Circumference = {c0}")
+    # Trapezoidal rule 
+    integral, h = trapm(0 ,pi/2 ,n ,lambda theta: integrand(theta, eccentricity))
+    c0 = 4 * a_ellipse * integral
+    print(f"\n        Using Elliptic integral calculated with Trapezoidal rule coded in Python, {n} iterations:\n        Circumference = {c0}")
 
-# Simpson's 1/3 rule
-integral, h = simpsons13m(0 ,pi/2 ,n ,integrand)
-c1 = 4 * a_ellipse * integral
-print(f"\n        Using Elliptic integral calculated with Simpson's 1/3 rule coded in Python, {n} iterations:\n        Circumference = {c1}")
-
-# Simpson's 3/8 rule
-integral, h = simpsons38m(0 ,pi/2 ,n ,integrand)
-c2 = 4 * a_ellipse * integral
-print(f"\n        Using Elliptic integral calculated with Simpson's 3/8 rule coded in Python, {n} iterations:\n        Circumference = {c2}")
-
-# Simple Arithmetic-Geometric Mean approximation
-c3 = sqrt(2) * pi * sqrt(a_ellipse**2 + b_ellipse**2)
-print(f"\n        Using Simple Arithmetic-Geometric Mean approximation:\n        Circumference = {c3}")
+    # Simpson's 1/3 rule
+    integral, h = simpsons13m(0 ,pi/2 ,n ,lambda theta: integrand(theta, eccentricity))
+    c1 = 4 * a_ellipse * integral
+    print(f"\n        Using Elliptic integral calculated with Simpson's 1/3 rule coded in Python, {n} iterations:\n        Circumference = {c1}")
 
-# Ramanujan's second approximation
-h = (a_ellipse - b_ellipse)**2 / (a_ellipse + b_ellipse)**2
-c4 = pi * (a_ellipse + b_ellipse) * (1 + 3 * h / (10 + sqrt(4 - 3 * h)))
-print(f"\n        Using Ramanujan's second approximation:\n        Circumference = {c4}")
+    # Simpson's 3/8 rule
+    integral, h = simpsons38m(0 ,pi/2 ,n ,lambda theta: integrand(theta, eccentricity))
+    c2 = 4 * a_ellipse * integral
+    print(f"\n        Using Elliptic integral calculated with Simpson's 3/8 rule coded in Python, {n} iterations:\n        Circumference = {c2}")
 
+    # Simple Arithmetic-Geometric Mean approximation
+    c3 = sqrt(2) * pi * sqrt(a_ellipse**2 + b_ellipse**2)
+    print(f"\n        Using Simple Arithmetic-Geometric Mean approximation:\n        Circumference = {c3}")
 
+    # Ramanujan's second approximation
+    h = (a_ellipse - b_ellipse)**2 / (a_ellipse + b_ellipse)**2
+    c4 = pi * (a_ellipse + b_ellipse) * (1 + 3 * h / (10 + sqrt(4 - 3 * h)))
+    print(f"\n        Using Ramanujan's second approximation:\n        Circumference = {c4}")
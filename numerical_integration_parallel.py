@@ -0,0 +1,171 @@
+# Parallel panel-wise integration for expensive integrands
+# Trapezoidal rule and Simpson's rules of NUMERICAL METHODS FOR ENGINEERS 8th Edition
+# with the nodes split in panels which are evaluated on a pool of threads or processes
+#
+# Every node xi = a + i*h belongs to exactly one panel and gets the weight
+# of the composite rule for its index i, so the split in panels does not change the rule.
+# Each panel returns the weighted sum of its nodes,
+# the panel sums are added in panel order, never in order of completion.
+# The result is bit-identical to panel_integrate(), the serial version with the same panels.
+#
+# Weights of the rules for nodes x0 .. xn:
+#   Trapezoidal rule:   h/2 * (1, 2, 2, ..., 2, 1)
+#   Simpson's 1/3 rule: h/3 * (1, 4, 2, 4, ..., 2, 4, 1)
+#   Simpson's 3/8 rule: 3h/8 * (1, 3, 3, 2, 3, 3, 2, ..., 2, 3, 3, 1)
+# For an odd n Simpson's 1/3 rule uses the weights of simpsons13m(): h/3 * (1, 4, 2, ..., 4, 2, 0, 4, 1)
+
+from math import *
+
+from metrics_registry import instrumented
+
+
+def _weight(rule, i, n):
+    """Weight of node i of n segments for composite rule, without the factor in h"""
+    if rule == "simpson13" and n % 2:
+        return _weight_simpson13_odd(i, n)
+    if i == 0 or i == n:
+        return 1
+    if rule == "trapezoidal":
+        return 2
+    elif rule == "simpson13":
+        return 4 if i % 2 == 1 else 2
+    return 2 if i % 3 == 0 else 3 # simpson38
+
+
+def _weight_simpson13_odd(i, n):
+    """Weight of node i of Simpson's 1/3 rule for an odd number of segments n, the weights simpsons13m() uses:
+    1, 4, 2, 4, ..., 2 up to node n-3, 0 for node n-2, then 4 for node n-1 and 1 for node n"""
+    weight = 1 if i == 0 else 0
+    if 0 < i < n - 2:
+        weight += 4 if i % 2 == 1 else 2
+    if i == n - 1:
+        weight += 4
+    if i == n:
+        weight += 1
+    return weight
+
+
+def _panel_sum(task):
+    """Weighted sum of f over the nodes i_start <= i < i_stop of one panel
+    task: tuple (f, rule, a, b, n, i_start, i_stop)"""
+    f, rule, a, b, n, i_start, i_stop = task
+    h = (b - a) / n
+    sum = 0.0
+    for i in range(i_start, i_stop):
+        x = b if i == n else a + i * h
+        sum += _weight(rule, i, n) * f(x)
+    return sum
+
+
+def _tasks(a, b, n, f, rule, panel_size):
+    """Split nodes 0 .. n in panels of panel_size segments"""
+    if rule not in factors:
+        raise ValueError(f"unknown rule {rule}, use one of {list(factors)}")
+    if rule == "simpson38":
+        n = (n // 3 + 1) * 3 # modify n so it is multiple of 3, as simpsons38m() does
+    tasks = []
+    for i_start in range(0, n + 1, panel_size):
+        i_stop = min(i_start + panel_size, n + 1)
+        if i_stop == n: # last node goes with the last panel
+            i_stop = n + 1
+        tasks.append((f, rule, a, b, n, i_start, i_stop))
+        if i_stop == n + 1:
+            break
+    return tasks, n
+
+
+def _combine(sums, rule, a, b, n):
+    """Add the panel sums in panel order and apply the factor of the rule"""
+    h = (b - a) / n
+    total = 0.0
+    for s in sums:
+        total += s
+    return factors[rule] * h * total, h, n
+
+
+@instrumented
+def panel_integrate(a, b, n, f, rule="simpson13", panel_size=1000):
+    """
+    Composite rule evaluated panel by panel, serial version
+    a: start of integration interval
+    b: stop of integration interval
+    n: number of segments
+    f: function to integrate
+    rule: "trapezoidal", "simpson13" or "simpson38"
+    panel_size: number of segments per panel
+    returns integral, segment size h, number of segments used
+    """
+    tasks, n = _tasks(a, b, n, f, rule, panel_size)
+    return _combine(map(_panel_sum, tasks), rule, a, b, n)
+
+
+@instrumented(function=None) # f is sent to the worker processes
+def parallel_integrate(a, b, n, f, rule="simpson13", panel_size=1000, workers=4, executor="process"):
+    """
+    Composite rule with panels evaluated on a pool of workers
+    Result is bit-identical to panel_integrate() with the same panel_size
+    a: start of integration interval
+    b: stop of integration interval
+    n: number of segments
+    f: function to integrate, for processes a function defined at module level
+    rule: "trapezoidal", "simpson13" or "simpson38"
+    panel_size: number of segments per panel
+    workers: number of threads or processes
+    executor: "process" or "thread", threads only help when f releases the GIL
+    returns integral, segment size h, number of segments used
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor # imported only when used
+
+    tasks, n = _tasks(a, b, n, f, rule, panel_size)
+    pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    with pool_class(max_workers=workers) as pool:
+        sums = list(pool.map(_panel_sum, tasks)) # map returns results in panel order
+    return _combine(sums, rule, a, b, n)
+
+
+# factor in h of each rule
+factors = {"trapezoidal": 1 / 2, "simpson13": 1 / 3, "simpson38": 3 / 8}
+
+
+# The velocity of a falling object with air resistance,
+# simulated by integrating dv/dt = g - c/m * v with many small Euler steps
+# to stand in for an expensive model of the velocity
+def velocity_simulated(t):
+    """velocity as funtion of time, Euler method with 2000 steps"""
+    steps = 2000
+    dt = t / steps
+    v = 0.0
+    for step in range(steps):
+        v += dt * (g - c / m * v)
+    return v
+
+
+g = 9.8 # m/s² acceleration due to gravity
+m = 68.1 # kg mass
+c = 12.5 # kg/s drag coefficient
+
+
+if __name__ == "__main__":
+    import os
+    import time
+
+    a = 0
+    b = 10.0 # s
+    n = 2000
+    panel_size = 100
+    workers = os.cpu_count() or 1
+    print("Parallel panel-wise integration of an expensive integrand")
+    print("---------------------------------------------------------")
+    print(f"Distance of falling parachutist at t = {b}s, velocity from a simulation with 2000 Euler steps")
+    print(f"{n} segments, panels of {panel_size} segments, {workers} workers\n")
+    for rule in factors:
+        t_start = time.perf_counter()
+        serial = panel_integrate(a, b, n, velocity_simulated, rule, panel_size)
+        t_serial = time.perf_counter() - t_start
+        print(f"{rule:<12} serial:   D = {serial[0]!r}m in {t_serial:.2f}s")
+        for executor in ("thread", "process"):
+            t_start = time.perf_counter()
+            result = parallel_integrate(a, b, n, velocity_simulated, rule, panel_size, workers, executor)
+            t_parallel = time.perf_counter() - t_start
+            print(f"{rule:<12} {executor + ':':<9} D = {result[0]!r}m in {t_parallel:.2f}s,", end="")
+            print(" bit-identical" if result == serial else " DIFFERENT")
@@ -0,0 +1,98 @@
+# Romberg integration based on the book NUMERICAL METHODS FOR ENGINEERS 8th Edition
+# adapted from the pseudocode for Romberg integration
+# applied on Example 21.3 on page 622 and 623
+#
+# The trapezoidal rule is refined by doubling the number of segments.
+# The nodes of the previous level are kept, only the new midpoints are evaluated:
+#
+#   I(2n) = I(n) / 2 + h(2n) * ∑ f(new midpoints)
+#
+# Richardson extrapolation combines the trapezoidal results to higher order:
+#
+#          4^(k-1) * I(j+1, k-1) - I(j, k-1)
+# I(j,k) = ⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯
+#                    4^(k-1) - 1
+
+from math import *
+
+from metrics_registry import instrumented, tolerance_outcome
+from numerical_integration_simpsons_rule import trapm
+
+
+@instrumented(iterations=1, outcome=tolerance_outcome(2))
+def romberg(a, b, maxit, es, f, abs_tol=0.0):
+    """
+    Romberg integration for given function
+    Each level doubles the number of segments of the trapezoidal rule,
+    only the new midpoints are evaluated
+    a: start of integration interval
+    b: stop of integration interval
+    maxit: max. number of levels
+    es: maximum relative error allowed in %
+    f: function to integrate
+    abs_tol: maximum absolute error allowed, for an integral which is about 0
+    returns integral, number of levels, relative error estimate in %,
+    number of evaluations of f
+    """
+    I = [[0.0] * (maxit + 2) for _ in range(maxit + 2)]
+    n = 1
+    I[0][0], h = trapm(a, b, n, f) # first level, 2 evaluations of f
+    n_evals = 2
+    iter_ = 0
+    while True:
+        iter_ += 1
+        h = h / 2 # segment size of the new level
+        new_midpoints = 0.0
+        for i in range(1, 2 * n, 2): # only the odd nodes are new
+            new_midpoints += f(a + i * h)
+        n_evals += n
+        n = 2 * n
+        I[iter_][0] = I[iter_-1][0] / 2 + h * new_midpoints
+        for k in range(1, iter_ + 1): # Richardson extrapolation
+            j = iter_ - k
+            I[j][k] = (4**k * I[j+1][k-1] - I[j][k-1]) / (4**k - 1)
+        change = abs(I[0][iter_] - I[1][iter_-1])
+        if I[0][iter_] != 0:
+            ea = change / abs(I[0][iter_]) * 100 # relative error estimate in %
+        else:
+            ea = 0.0 if change == 0 else inf # no relative error of a zero integral
+        if iter_ >= maxit or ea <= es or change <= abs_tol:
+            break
+    return I[0][iter_], iter_, ea, n_evals
+
+
+# The velocity of a falling object with air resistance
+# where g is acceleration due to gravity
+# m is mass
+# c is the drag coefficient
+# t is time
+def velocity(t):
+    """velocity as funtion of time"""
+    return g * m / c * (1 - exp(-(c * t / m)) )
+
+
+g = 9.8 # m/s² acceleration due to gravity
+m = 68.1 # kg mass
+c = 12.5 # kg/s drag coefficient
+
+distance_exact = 289.43515 # m
+
+
+if __name__ == "__main__":
+    a = 0
+    b = 10.0 # s
+    maxit = 20
+    print("Romberg integration based on the book NUMERICAL METHODS FOR ENGINEERS 8th Edition")
+    print("----------------------------------------------------------------------------------")
+    print("Applied on Example 21.3 on page 622 and 623")
+    print("Velocity: v(t) = g * m / c * (1 - exp(-(c * t / m))")
+    print(f"Exact answer obtained using calculus is D = {distance_exact}m")
+    print()
+    print("es (%)   |D (m)         |ea (%)     |et (%)     |levels|evaluations of v(t)")
+    for es in [1, 1e-2, 1e-4, 1e-6, 1e-8, 1e-10]:
+        distance, levels, ea, n_evals = romberg(a, b, maxit, es, velocity)
+        error = 100 * (distance - distance_exact) / distance_exact
+        print(f"{es:>9.0e}|{distance:>14.8f}|{ea:>11.2e}|{error:>11.2e}|{levels:>6}|{n_evals:>6}")
+    distance, h = trapm(a, b, 10000, velocity)
+    error = 100 * (distance - distance_exact) / distance_exact
+    print(f"\nFor comparison, Trapezoidal rule with 10000 segments: D = {distance:.8f}m, et = {error:.2e}%, 10001 evaluations of v(t)")
@@ -0,0 +1,180 @@
+# Trapezoidal rule and Simpson's 1/3 rule for sampled data
+# streamed from memory-mapped files, uniform or non-uniform spacing
+#
+# The samples are read chunk by chunk, neighbouring chunks share their boundary sample.
+# The partial sums of the chunks are added with compensated (Neumaier) summation,
+# so a file of several GB is integrated with constant memory.
+#
+# Trapezoidal rule, each segment:  (x_k+1 - x_k) * (y_k + y_k+1) / 2
+#
+# Simpson's 1/3 rule on a panel of two segments h0 = x1 - x0, h1 = x2 - x1:
+#
+#   h0 + h1  ⎛⎛     h1 ⎞       (h0 + h1)²        ⎛     h0 ⎞    ⎞
+#   ⎯⎯⎯⎯⎯⎯⎯  ⎜⎜ 2 - ⎯⎯ ⎟.y0 +  ⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯ .y1 +  ⎜ 2 - ⎯⎯ ⎟.y2 ⎟
+#      6     ⎝⎝     h0 ⎠         h0.h1           ⎝     h1 ⎠    ⎠
+#
+# for uniform spacing this is h/3 * (y0 + 4.y1 + y2).
+# With an odd number of segments the last segment h, with previous segment hp, adds
+#   α.yN + β.yN-1 - η.yN-2
+#   α = (2h² + 3h.hp) / (6(hp + h)),  β = (h² + 3h.hp) / (6hp),  η = h³ / (6hp(hp + h))
+#
+# This code uses the numpy library
+
+import numpy as np
+
+from interpolation_streaming_memmap import open_query_file as open_samples
+from metrics_registry import instrumented
+
+
+class _Accumulator:
+    """Running sum with Neumaier compensation"""
+    def __init__(self):
+        self.sum = 0.0
+        self.compensation = 0.0
+
+    def add(self, value):
+        value = float(value)
+        total = self.sum + value
+        if abs(self.sum) >= abs(value):
+            self.compensation += (self.sum - total) + value
+        else:
+            self.compensation += (value - total) + self.sum
+        self.sum = total
+
+    def result(self):
+        return self.sum + self.compensation
+
+
+def _chunk(y, x, start, stop):
+    """Samples start .. stop, boundary sample included, as float arrays"""
+    y_chunk = np.asarray(y[start:stop + 1], dtype=float)
+    x_chunk = None if x is None else np.asarray(x[start:stop + 1], dtype=float)
+    return y_chunk, x_chunk
+
+
+@instrumented
+def trapz_samples(y, x=None, dx=1.0, chunk_size=2**20):
+    """
+    Trapezoidal rule for sampled data, streamed in chunks
+    y: sampled values, numpy array or memory-mapped file
+    x: sample positions (e.g. time), same length as y, or None for uniform spacing
+    dx: spacing of the samples when x is None
+    chunk_size: number of segments processed at once
+    returns integral
+    """
+    n_segments = len(y) - 1
+    total = _Accumulator()
+    for start in range(0, n_segments, chunk_size):
+        stop = min(start + chunk_size, n_segments)
+        yc, xc = _chunk(y, x, start, stop)
+        if xc is None:
+            total.add(dx * (np.sum(yc) - (yc[0] + yc[-1]) / 2))
+        else:
+            total.add(np.sum(np.diff(xc) * (yc[:-1] + yc[1:])) / 2)
+    return total.result()
+
+
+def _simpson_panels(yc, xc, dx):
+    """Simpson's 1/3 rule over a chunk with an even number of segments"""
+    y0 = yc[0:-1:2]; y1 = yc[1::2]; y2 = yc[2::2]
+    if xc is None:
+        return dx / 3 * np.sum(y0 + 4 * y1 + y2)
+    h0 = xc[1::2] - xc[0:-1:2]
+    h1 = xc[2::2] - xc[1::2]
+    return np.sum((h0 + h1) / 6 * ((2 - h1 / h0) * y0 + (h0 + h1)**2 / (h0 * h1) * y1 + (2 - h0 / h1) * y2))
+
+
+@instrumented
+def simpson_samples(y, x=None, dx=1.0, chunk_size=2**20):
+    """
+    Simpson's 1/3 rule for sampled data, streamed in chunks
+    An odd number of segments is handled with a correction for the last segment
+    y: sampled values, numpy array or memory-mapped file
+    x: sample positions (e.g. time), same length as y, or None for uniform spacing
+    dx: spacing of the samples when x is None
+    chunk_size: number of segments processed at once, rounded down to even
+    returns integral
+    """
+    n_segments = len(y) - 1
+    if n_segments < 2:
+        return trapz_samples(y, x, dx)
+    chunk_size = max(2, chunk_size - chunk_size % 2)
+    n_even = n_segments - n_segments % 2
+    total = _Accumulator()
+    for start in range(0, n_even, chunk_size):
+        stop = min(start + chunk_size, n_even)
+        total.add(_simpson_panels(*_chunk(y, x, start, stop), dx))
+    if n_segments % 2: # last segment with the two segments before it
+        yc, xc = _chunk(y, x, n_segments - 2, n_segments)
+        h = dx if xc is None else xc[2] - xc[1]
+        hp = dx if xc is None else xc[1] - xc[0]
+        alpha = (2 * h**2 + 3 * h * hp) / (6 * (hp + h))
+        beta = (h**2 + 3 * h * hp) / (6 * hp)
+        eta = h**3 / (6 * hp * (hp + h))
+        total.add(alpha * yc[2] + beta * yc[1] - eta * yc[0])
+    return total.result()
+
+
+# The velocity of a falling object with air resistance
+# where g is acceleration due to gravity
+# m is mass
+# c is the drag coefficient
+# t is time
+def velocity(t):
+    """velocity as funtion of time, t can be a numpy array"""
+    return g * m / c * (1 - np.exp(-(c * t / m)) )
+
+
+g = 9.8 # m/s² acceleration due to gravity
+m = 68.1 # kg mass
+c = 12.5 # kg/s drag coefficient
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+
+    from interpolation_streaming_memmap import create_output_file
+
+    n = 10_000_001 # number of samples of the velocity log
+    chunk_size = 100_000
+    t_stop = 10.0 # s
+    distance_exact = g * m / c * (t_stop + m / c * (np.exp(-(c * t_stop / m)) - 1))
+    print("Integration of sampled data streamed from memory-mapped files")
+    print("-------------------------------------------------------------")
+    print(f"Velocity log of falling parachutist, {n} samples from 0 to {t_stop}s")
+    print(f"Exact distance obtained using calculus D = {distance_exact}m\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # write velocity log in chunks: uniform time steps and time steps with jitter
+        rng = np.random.default_rng(1)
+        paths = {name: os.path.join(tmp_dir, name + ".npy") for name in ("t_jitter", "v_uniform", "v_jitter")}
+        t_log = create_output_file(paths["t_jitter"], n)
+        v_uniform = create_output_file(paths["v_uniform"], n)
+        v_jitter = create_output_file(paths["v_jitter"], n)
+        dt = t_stop / (n - 1)
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            t = np.arange(start, stop) * dt
+            v_uniform[start:stop] = velocity(t)
+            t = t + rng.uniform(-0.3, 0.3, stop - start) * dt # non-uniform sample times
+            t[t < 0] = 0.0; t[t > t_stop] = t_stop
+            if stop == n:
+                t[-1] = t_stop
+            t_log[start:stop] = t
+            v_jitter[start:stop] = velocity(t)
+        for array in (t_log, v_uniform, v_jitter):
+            array.flush()
+        del t_log, v_uniform, v_jitter
+
+        t_log = open_samples(paths["t_jitter"])
+        for name, y, x in [("uniform spacing", open_samples(paths["v_uniform"]), None),
+                           ("non-uniform spacing", open_samples(paths["v_jitter"]), t_log)]:
+            for method in (trapz_samples, simpson_samples):
+                t_start = time.perf_counter()
+                distance = method(y, x, dt, chunk_size)
+                t_end = time.perf_counter()
+                print(f"{name:<20} {method.__name__:<16}: D = {distance:.10f}m,", end="")
+                print(f" error {distance - distance_exact:.1e}m, {t_end - t_start:.2f}s")
+        del t_log, y, x
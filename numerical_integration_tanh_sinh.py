@@ -0,0 +1,137 @@
+# Tanh-sinh (double exponential) quadrature
+# for integrands with a singularity or a singular derivative at an end point
+#
+# Substitution x = tanh( π/2 . sinh(t) ) maps t on (-∞, ∞) to x on (-1, 1).
+# The transformed integrand decays double exponentially, so the
+# trapezoidal rule with step h in t converges almost exponentially:
+#
+#   1              ∞
+#   ∫ f(x).dx ≈ h. ∑  wj.f(xj),  xj = tanh( π/2.sinh(j.h) )
+#  -1             j=-∞
+#
+#   wj = π/2 . cosh(j.h) / cosh²( π/2.sinh(j.h) )
+#
+# Nodes near the end points are stored as the distance to the end point
+#   1 - xj = exp(-u) / cosh(u),  u = π/2.sinh(j.h)
+# so they are never rounded onto the end point itself.
+#
+# Each level halves h. The nodes of the previous levels are kept,
+# only the new nodes at odd multiples of h are evaluated.
+# Nodes and weights of each level are computed once and kept in a table.
+
+from math import *
+
+from metrics_registry import instrumented, tolerance_outcome
+
+
+def tanh_sinh_nodes(level):
+    """Nodes and weights of one level of tanh-sinh quadrature,
+    computed once per level and kept in the table tanh_sinh_table
+    level 0: t = 0, 1, 2, ..., level k: t = odd multiples of 2^-k
+    level: level of refinement
+    returns list of distances 1 - x of the nodes to the end point, list of weights"""
+    if level not in tanh_sinh_table:
+        h = 2.0**-level
+        j = 0 if level == 0 else 1
+        step = 1 if level == 0 else 2
+        distances = []; weights = []
+        while True:
+            t = j * h
+            u = pi / 2 * sinh(t)
+            if u > 350: # distance 1 - x below the smallest normal float
+                break
+            distance = exp(-u) / cosh(u)
+            weight = pi / 2 * cosh(t) / cosh(u)**2
+            distances.append(distance)
+            weights.append(weight)
+            j += step
+        tanh_sinh_table[level] = (distances, weights)
+    return tanh_sinh_table[level]
+
+
+def _level_sum(a, b, f, level):
+    """Weighted sum of f over the new nodes of one level mapped on [a, b]
+    returns sum and number of evaluations of f"""
+    half = (b - a) / 2
+    distances, weights = tanh_sinh_nodes(level)
+    sum = 0.0
+    n_evals = 0
+    for distance, weight in zip(distances, weights):
+        if distance == 1: # t = 0, center of the interval
+            sum += weight * f(a + half)
+            n_evals += 1
+            continue
+        xl = a + half * distance
+        xu = b - half * distance
+        if xl != a: # skip nodes rounded onto the end points
+            sum += weight * f(xl)
+            n_evals += 1
+        if xu != b:
+            sum += weight * f(xu)
+            n_evals += 1
+    return half * sum, n_evals
+
+
+@instrumented(iterations=1, outcome=tolerance_outcome(2))
+def tanh_sinh(a, b, f, es=1e-10, max_level=10, abs_tol=0.0):
+    """
+    Tanh-sinh quadrature for given function, f is never evaluated at a or b
+    a: start of integration interval
+    b: stop of integration interval
+    f: function to integrate
+    es: maximum relative error allowed in %
+    max_level: max. number of times the step h is halved, at least 1
+    abs_tol: maximum absolute error allowed, for an integral which is about 0
+    returns integral, number of levels, relative error estimate in %,
+    number of evaluations of f
+    """
+    if max_level < 1:
+        raise ValueError("max_level must be at least 1")
+    sum, n_evals = _level_sum(a, b, f, 0)
+    integral = sum
+    for level in range(1, max_level + 1):
+        new_sum, new_evals = _level_sum(a, b, f, level)
+        sum += new_sum
+        n_evals += new_evals
+        integral_old = integral
+        integral = sum * 2.0**-level
+        change = abs(integral - integral_old)
+        if integral != 0:
+            ea = change / abs(integral) * 100 # relative error estimate in %
+        else:
+            ea = 0.0 if change == 0 else inf
+        if ea <= es or change <= abs_tol:
+            break
+    return integral, level, ea, n_evals
+
+
+# tables of nodes and weights, one entry per level
+tanh_sinh_table = {}
+
+
+if __name__ == "__main__":
+    from numerical_integration_simpsons_rule import simpsons13m
+    from numerical_integration_ellipse_batch import complete_elliptic_e
+
+    eccentricity = 0.999999
+    problems = [
+        ("1/sqrt(x)", lambda x: 1 / sqrt(x), 0.0, 1.0, 2.0),
+        ("log(x)", log, 0.0, 1.0, -1.0),
+        ("sqrt(1 - x²)", lambda x: sqrt(1 - x * x), 0.0, 1.0, pi / 4),
+        (f"√(1 - e².sin²(θ)), e = {eccentricity}", lambda theta: sqrt(1 - (eccentricity * sin(theta))**2),
+         0.0, pi / 2, float(complete_elliptic_e(eccentricity))),
+    ]
+    es = 1e-10 # max. relative error in %
+    print("Tanh-sinh (double exponential) quadrature")
+    print("-----------------------------------------")
+    print(f"Maximum relative error es = {es}%")
+    for name, f, a, b, exact in problems:
+        integral, levels, ea, n_evals = tanh_sinh(a, b, f, es)
+        print(f"\n∫ {name} on [{a}, {b:.6f}], exact {exact}")
+        print(f"    tanh-sinh:   {integral:.15f}, ea = {ea:.1e}%, true error {abs(integral - exact):.1e}, {levels} levels, {n_evals} evaluations")
+        try:
+            for n in [100, 10000]:
+                integral, h = simpsons13m(a, b, n, f)
+                print(f"    Simpson 1/3: {integral:.15f}, true error {abs(integral - exact):.1e}, {n + 1} evaluations")
+        except (ZeroDivisionError, ValueError) as e:
+            print(f"    Simpson 1/3: cannot evaluate integrand at end point, {e}")
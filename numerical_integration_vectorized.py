@@ -0,0 +1,166 @@
+# Numerical Integration based on the book NUMERICAL METHODS FOR ENGINEERS 8th Edition
+# Trapezoidal rule and Simpsons rule adapted from pseudocode on page 632
+# array versions for integrands which accept a numpy array of x values
+#
+# The grid of nodes is built once, the integrand is called once on all nodes
+# and the weights of the rule are applied to all function values at once.
+# The weighted function values are added using pairwise summation (numpy.sum),
+# which keeps round-off error small for large n.
+# For very large n the nodes are processed in chunks so memory use stays bounded,
+# the partial sums of the chunks are added with math.fsum.
+#
+# Weights of the rules for nodes x0 .. xn:
+#   Trapezoidal rule:   h/2 * (1, 2, 2, ..., 2, 1)
+#   Simpson's 1/3 rule: h/3 * (1, 4, 2, 4, ..., 2, 4, 1)
+#   Simpson's 3/8 rule: 3h/8 * (1, 3, 3, 2, 3, 3, 2, ..., 2, 3, 3, 1)
+#
+# This code uses the numpy library
+
+from math import fsum
+
+import numpy as np
+
+from metrics_registry import instrumented
+
+
+def _weights_trap(i, n):
+    """Trapezoidal rule weights for node indices i, without factor h/2"""
+    w = np.full(len(i), 2.0)
+    w[(i == 0) | (i == n)] = 1.0
+    return w
+
+
+def _weights_simpson13(i, n):
+    """Simpson's 1/3 rule weights for node indices i, without factor h/3
+    follows simpsons13m(), n is expected to be even"""
+    w = np.zeros(len(i))
+    w[(i % 2 == 1) & (i <= n - 3)] = 4.0
+    w[(i % 2 == 0) & (i >= 2) & (i <= n - 2)] = 2.0
+    w[i == 0] += 1.0
+    w[i == n - 1] += 4.0
+    w[i == n] += 1.0
+    return w
+
+
+def _weights_simpson38(i, n):
+    """Simpson's 3/8 rule weights for node indices i, without factor 3h/8
+    n is a multiple of 3"""
+    w = np.where(i % 3 == 0, 2.0, 3.0)
+    w[(i == 0) | (i == n)] = 1.0
+    return w
+
+
+def _weighted_sum(a, h, n, f, weights, chunk_size, x_last=None):
+    """Sum of weights * f(x) over the nodes x = a + i * h, i = 0 .. n
+    evaluated chunk by chunk
+    x_last: value used for the last node instead of a + n * h"""
+    partial_sums = []
+    for start in range(0, n + 1, chunk_size):
+        i = np.arange(start, min(start + chunk_size, n + 1))
+        x = a + i * h
+        if x_last is not None and i[-1] == n:
+            x[-1] = x_last
+        fx = np.asarray(f(x), dtype=float)
+        partial_sums.append(np.sum(weights(i, n) * fx)) # pairwise summation
+    return fsum(partial_sums)
+
+
+# Trapezoidal rule
+@instrumented
+def trapm_arr(a, b, n, f, chunk_size=2**20):
+    """
+    Trapezoidal rule for given function, array version
+    a: start of integration interval
+    b: stop of integration interval
+    n: number of segments
+    f: function to integrate, accepting a numpy array of x values
+    chunk_size: max. number of nodes evaluated at once
+    """
+    h = (b - a) / n
+    sum = _weighted_sum(a, h, n, f, _weights_trap, chunk_size, x_last=b)
+    return h * sum / 2, h
+
+# Simpson's 1/3 rule
+# Integral ≈ (b - a) * 1/6 * (f(x0) + 4*f(x1) + f(x2))
+@instrumented
+def simpsons13m_arr(a, b, n, f, chunk_size=2**20):
+    """
+    Simpson's 1/3 rule for given function, array version
+    a: start of integration interval
+    b: stop of integration interval
+    n: number of segments
+    f: function to integrate, accepting a numpy array of x values
+    chunk_size: max. number of nodes evaluated at once
+    """
+    h = (b - a) / n
+    sum = _weighted_sum(a, h, n, f, _weights_simpson13, chunk_size)
+    return 2 * h * sum / 6, h
+
+# Simpson's 3/8 rule
+# Integral ≈ (b - a) * 1/8 * (f(x0) + 3*f(x1) + 3*f(x2) + f(x3))
+@instrumented
+def simpsons38m_arr(a, b, n, f, chunk_size=2**20):
+    """
+    Simpson's 3/8 rule for given function, array version
+    a: start of integration interval
+    b: stop of integration interval
+    n: number of segments
+    f: function to integrate, accepting a numpy array of x values
+    chunk_size: max. number of nodes evaluated at once
+    """
+    n_mod = (n // 3 + 1) * 3 # modify n so it is multiple of 3
+    h = (b - a) / n_mod
+    sum = _weighted_sum(a, h, n_mod, f, _weights_simpson38, chunk_size)
+    return 3 * h * sum / 8, h, n_mod
+
+
+# The velocity of a falling object with air resistance
+# where g is acceleration due to gravity
+# m is mass
+# c is the drag coefficient
+# t is time
+def velocity(t):
+    """velocity as funtion of time, t can be a numpy array"""
+    return g * m / c * (1 - np.exp(-(c * t / m)) )
+
+
+g = 9.8 # m/s² acceleration due to gravity
+m = 68.1 # kg mass
+c = 12.5 # kg/s drag coefficient
+
+distance_exact = 289.43515 # m
+
+
+if __name__ == "__main__":
+    import time
+
+    segments = [a*b for b in [1,10,100] for a in [1,10,20,50]]
+    segments.append(10000)
+
+    a = 0
+    b = 10.0 # s
+    print("Numerical Integration based on the book NUMERICAL METHODS FOR ENGINEERS 8th Edition")
+    print("-----------------------------------------------------------------------------------")
+    print("Trapezoidal rule, Simpson's 1/3 rule and Simpson's 3/8 rule, array versions")
+    print("Velocity: v(t) = g * m / c * (1 - exp(-(c * t / m))")
+    print(f"Exact answer obtained using calculus is D = {distance_exact}m")
+    print()
+    print("                           Trapezoidal rule          Simpson's 1/3 rule          Simpson's 3/8 rule")
+    print("Segments | Segment size|D (m)       |et(%)       |D (m)       |et(%)       |n mod    |D (m)       |et(%)      ")
+    for n in segments:
+        distance_trap, h = trapm_arr(a, b , n, velocity)
+        distance_simpson13, h = simpsons13m_arr(a, b , n, velocity)
+        distance_simpson38, h, n_mod = simpsons38m_arr(a, b , n, velocity)
+        error_trap = 100 * (distance_trap - distance_exact) / distance_exact
+        error_simpson13 = 100 * (distance_simpson13 - distance_exact) / distance_exact
+        error_simpson38 = 100 * (distance_simpson38 - distance_exact) / distance_exact
+        print(f"{n:>9}|{h:>13.1e}|{distance_trap:>12.6f}|{error_trap:>11.2}%|", end = "")
+        print(f"{distance_simpson13:>12.6f}|{error_simpson13:>11.2}%|", end = "")
+        print(f"{n_mod:>9}|{distance_simpson38:>12.6f}|{error_simpson38:>11.2}%")
+
+    print("\nTime for Simpson's 1/3 rule, array version, nodes evaluated in chunks of 2**20")
+    for n in [10**4, 10**6, 10**7]:
+        t_start = time.perf_counter()
+        distance, h = simpsons13m_arr(a, b, n, velocity)
+        t_stop = time.perf_counter()
+        print(f"n = {n:>9}: D = {distance:.8f}m in {t_stop - t_start:.4f}s")
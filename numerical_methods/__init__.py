@@ -0,0 +1,109 @@
+# Solvers, integrators and interpolators of this repository as one importable package
+#
+#   import numerical_methods as nm
+#   root, iterations, ea = nm.modfalsepos(f, (0, 1.3), 100, 0.01)
+#
+# Importing the package imports none of the scripts. A name is imported from its script
+# on first use (module __getattr__, PEP 562), so numpy is only imported for the
+# vectorized functions and matplotlib never. The scripts are found next to this package,
+# the demos of the scripts only run when a script itself is run.
+#
+# numerical_methods_import_benchmark.py checks the import time of the package and the scripts.
+
+import importlib
+
+# name: script the name is imported from
+_exports = {
+    # roots of equations
+    "bisect": "numerical_methods_mod_false_pos",
+    "standardfalsepos": "numerical_methods_mod_false_pos",
+    "modfalsepos": "numerical_methods_mod_false_pos",
+    "illinois": "numerical_methods_mod_false_pos",
+    "anderson_bjorck": "numerical_methods_mod_false_pos",
+    "ridders": "numerical_methods_mod_false_pos",
+    "itp": "numerical_methods_mod_false_pos",
+    "count_evaluations": "numerical_methods_mod_false_pos",
+    "newton_raphson": "numerical_methods_newton_raphson",
+    "secant": "numerical_methods_secant",
+    "secant_mod": "numerical_methods_modified_secant",
+    "brents": "root_finding_brents_method",
+    "brents_wiki": "brents_method_wikipedia",
+    "Interval": "interval_arithmetic_root_search",
+    "branch_and_prune": "interval_arithmetic_root_search",
+    "interval_root_search": "interval_arithmetic_root_search",
+    "BracketNotFound": "root_bracket_discovery",
+    "find_bracket": "root_bracket_discovery",
+    "solve_bracketed": "root_bracket_discovery",
+    "bisect_arr": "rectifier_capacitor_ripple_sweep",
+    "newton_safeguarded_arr": "rectifier_capacitor_ripple_sweep",
+    "ripple_sweep": "rectifier_capacitor_ripple_sweep",
+    # circuit simulation
+    "Event": "time_stepping_events",
+    "locate_events": "time_stepping_events",
+    "Circuit": "rectifier_transient_simulation",
+    "DiodeModel": "rectifier_transient_simulation",
+    "DenseSystem": "rectifier_transient_simulation",
+    "transient": "rectifier_transient_simulation",
+    "diode_event": "rectifier_transient_simulation",
+    "shooting": "rectifier_periodic_steady_state",
+    "parse_netlist": "spice_netlist_mna",
+    "read_netlist": "spice_netlist_mna",
+    "SparseSystem": "spice_netlist_mna",
+    "run_tran": "spice_netlist_mna",
+    "tran_batch": "spice_netlist_mna",
+    "WaveformWriter": "waveform_writer_memmap",
+    "open_waveforms": "waveform_writer_memmap",
+    "minmax_preview": "waveform_writer_memmap",
+    # numerical integration
+    "trapm": "numerical_integration_simpsons_rule",
+    "simpsons13m": "numerical_integration_simpsons_rule",
+    "simpsons38m": "numerical_integration_simpsons_rule",
+    "gauss_legendre": "numerical_integration_gauss_legendre",
+    "gauss_lobatto": "numerical_integration_gauss_legendre",
+    "gauss_legendre_nodes": "numerical_integration_gauss_legendre",
+    "romberg": "numerical_integration_romberg",
+    "adaptive_simpson": "numerical_integration_adaptive",
+    "gauss_kronrod": "numerical_integration_adaptive",
+    "tanh_sinh": "numerical_integration_tanh_sinh",
+    "panel_integrate": "numerical_integration_parallel",
+    "parallel_integrate": "numerical_integration_parallel",
+    "trapm_arr": "numerical_integration_vectorized",
+    "simpsons13m_arr": "numerical_integration_vectorized",
+    "simpsons38m_arr": "numerical_integration_vectorized",
+    "cumtrapm": "numerical_integration_cumulative",
+    "cumsimpsons13m": "numerical_integration_cumulative",
+    "trapz_samples": "numerical_integration_sampled_data",
+    "simpson_samples": "numerical_integration_sampled_data",
+    "cubature": "numerical_integration_2d",
+    "adaptive_cubature": "numerical_integration_2d",
+    "ellipse_circumference_agm": "numerical_integration_ellipse_batch",
+    "ellipse_circumference_quadrature": "numerical_integration_ellipse_batch",
+    "run_study": "numerical_integration_convergence_study",
+    # interpolation
+    "lagrange": "lagrange_interpolation4",
+    "lagrange_arr": "lagrange_interpolation4",
+    "linear_arr": "lagrange_interpolation4",
+    "prepare_interpolator": "interpolation_streaming_memmap",
+    "interpolate_file": "interpolation_streaming_memmap",
+    "InterpolatorCache": "interpolation_weights_cache",
+    # metrics
+    "metrics": "metrics_registry",
+    "MetricsRegistry": "metrics_registry",
+    "instrumented": "metrics_registry",
+    "ResultCache": "result_cache",
+}
+
+__all__ = sorted(_exports)
+
+
+def __getattr__(name):
+    """Import name from its script on first use"""
+    if name not in _exports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_exports[name]), name)
+    globals()[name] = value # next use does not call __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_exports))
@@ -0,0 +1,97 @@
+# Import-time benchmark of the numerical_methods package and the scripts of this repository
+#
+# Every import is measured in a new Python process (cold start), the fastest of several
+# runs is kept. An import fails the benchmark when it:
+#   - takes longer than the budget, for scripts using numpy the budget comes on top of
+#     the import time of numpy itself
+#   - prints anything or reads input, the demos must only run when the script itself is run
+#   - imports matplotlib, or numpy for the package and the scripts which are not in numpy_scripts
+#
+# Usage: python numerical_methods_import_benchmark.py [budget in ms] [number of runs]
+# the exit status is 1 when an import fails, for use in a test pipeline.
+
+import glob
+import json
+import os
+import subprocess
+import sys
+
+# measured in the new process, the result is the last line of its output
+probe = """
+import sys, time, json
+t_start = time.perf_counter()
+import {module}
+run_time = time.perf_counter() - t_start
+print(json.dumps([run_time, "numpy" in sys.modules, "matplotlib" in sys.modules]))
+"""
+
+
+def import_time(module, runs=5):
+    """
+    Cold-start import time of module, fastest of runs new processes
+    returns import time in s, numpy imported, matplotlib imported, other output of the import
+    """
+    best = None
+    for run in range(runs):
+        process = subprocess.run([sys.executable, "-c", probe.format(module=module)], cwd=root,
+                                 stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=60)
+        lines = process.stdout.splitlines()
+        if process.returncode != 0 or not lines:
+            return None, False, False, (process.stdout + process.stderr).strip()
+        run_time, uses_numpy, uses_matplotlib = json.loads(lines[-1])
+        best = run_time if best is None else min(best, run_time)
+    return best, uses_numpy, uses_matplotlib, "\n".join(lines[:-1]).strip()
+
+
+def benchmark(budget=0.05, runs=5):
+    """
+    Import time of the package and of every script in the repository
+    budget: max. import time in s, added to the import time of numpy for scripts using numpy
+    runs: number of new processes per import
+    returns list of tuples (module, import time, numpy imported, problem or ""), all passed
+    """
+    numpy_time = import_time("numpy", runs)[0]
+    scripts = sorted(os.path.basename(path)[:-3] for path in glob.glob(os.path.join(root, "*.py")))
+    scripts.remove(os.path.basename(__file__)[:-3])
+    results = []
+    for module in ["numerical_methods"] + scripts:
+        run_time, uses_numpy, uses_matplotlib, output = import_time(module, runs)
+        if run_time is None:
+            problem = f"import failed: {output.splitlines()[-1] if output else 'no output'}"
+        elif output:
+            problem = f"prints on import: {output.splitlines()[0]}"
+        elif uses_matplotlib:
+            problem = "imports matplotlib"
+        elif uses_numpy and module not in numpy_scripts:
+            problem = "imports numpy"
+        elif run_time > budget + (numpy_time if uses_numpy else 0.0):
+            problem = f"over budget of {1e3 * budget:.0f}ms"
+        else:
+            problem = ""
+        results.append((module, run_time, uses_numpy, problem))
+    return results, numpy_time, all(not problem for *values, problem in results)
+
+
+root = os.path.dirname(os.path.abspath(__file__))
+# scripts which use numpy themselves, every other module fails when it imports numpy
+numpy_scripts = {
+    "interpolation_streaming_memmap", "interpolation_weights_cache",
+    "numerical_integration_2d", "numerical_integration_cumulative", "numerical_integration_ellipse_batch",
+    "numerical_integration_sampled_data", "numerical_integration_vectorized",
+    "rectifier_capacitor_ripple_sweep", "rectifier_periodic_steady_state", "rectifier_transient_simulation",
+    "spice_netlist_mna", "waveform_writer_memmap"}
+
+
+if __name__ == "__main__":
+    budget = float(sys.argv[1]) / 1e3 if len(sys.argv) > 1 else 0.05 # s
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    print("Import-time benchmark")
+    print("---------------------")
+    results, numpy_time, passed = benchmark(budget, runs)
+    print(f"budget {1e3 * budget:.0f}ms, fastest of {runs} runs, numpy itself imports in {1e3 * numpy_time:.1f}ms\n")
+    print("Module                                                  |time (ms)|numpy|result")
+    for module, run_time, uses_numpy, problem in results:
+        time_text = "" if run_time is None else f"{1e3 * run_time:.1f}"
+        print(f"{module:<56}|{time_text:>9}|{'yes' if uses_numpy else '':<5}|{problem or 'ok'}")
+    print(f"\n{'All imports within budget' if passed else 'Some imports failed'}")
+    sys.exit(0 if passed else 1)
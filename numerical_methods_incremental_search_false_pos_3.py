@@ -146,8 +146,8 @@ def main_loop():
         if len(results)>0:
             print(f"\nFinding root at each zero crossing using Mofified False Position method")
             print(f"Function {fun}=0\nwith x in interval {xl} to {xu}")
-            print(f"{"Interval with zero crossing":25}\t|{"Solution":30}")
-            print(f"{"xl":8}\t{"xu":8}\t|{"xr (root)":8}\t{"ea (% error)":8}\t{"residual":8}\tn")
+            print(f"{'Interval with zero crossing':25}\t|{'Solution':30}")
+            print(f"{'xl':8}\t{'xu':8}\t|{'xr (root)':8}\t{'ea (% error)':8}\t{'residual':8}\tn")
             for xl, xu in results:
                 root, steps, rel_error, msg = modfalsepos(fun, (xl, xu), N, es)
                 if msg == "ZeroDivisionError":
@@ -176,5 +176,6 @@ math_fun_dict = {
 
 file_name = "roots.txt"
 
-main_loop()        
+if __name__ == "__main__":
+    main_loop()        
 
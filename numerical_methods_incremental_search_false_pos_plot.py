@@ -7,7 +7,6 @@
 
 from math import *
 import sys
-import matplotlib.pyplot as plt
 
 def incremental(f, interval, n_steps):
     """incremental search for sign c-changes
@@ -140,6 +139,9 @@ def get_input():
 
 
 def main_loop():
+    import matplotlib.pyplot as plt # imported only when plotting
+    plt.rcParams.update({'font.size': 14})
+    plt.rcParams["figure.figsize"] = (16,12)
     terminate = False
     while not terminate:
         print("Incremental search for sign changes of function")
@@ -151,8 +153,8 @@ def main_loop():
         if len(results)>0:
             print(f"\nFinding root at each zero crossing using Mofified False Position method")
             print(f"Function {fun}=0\nwith x in interval {xl} to {xu}")
-            print(f"{"Interval with zero crossing":25}\t|{"Solution":30}")
-            print(f"{"xl":8}\t{"xu":8}\t|{"xr (root)":8}\t{"ea (% error)":8}\t{"residual":8}\tn")
+            print(f"{'Interval with zero crossing':25}\t|{'Solution':30}")
+            print(f"{'xl':8}\t{'xu':8}\t|{'xr (root)':8}\t{'ea (% error)':8}\t{'residual':8}\tn")
             for xl, xu in results:
                 root, steps, rel_error, msg = modfalsepos(fun, (xl, xu), N, es)
                 if msg == "ZeroDivisionError":
@@ -187,8 +189,6 @@ math_fun_dict = {
   "asin": asin, "acos": acos, "atan": atan,
   "atan2": atan2, "abs": abs}
 
-plt.rcParams.update({'font.size': 14})
-plt.rcParams["figure.figsize"] = (16,12)
-
-main_loop()        
+if __name__ == "__main__":
+    main_loop()        
 
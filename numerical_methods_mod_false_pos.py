@@ -4,6 +4,9 @@
 
 from math import *
 
+from metrics_registry import instrumented, tolerance_outcome
+
+@instrumented(iterations=1, outcome=tolerance_outcome(2))
 def modfalsepos(f, interval, imax, es):
     """Modified false position method"""
     """
@@ -47,6 +50,7 @@ def modfalsepos(f, interval, imax, es):
     return xr, iter_, ea
 
 
+@instrumented(iterations=1, outcome=tolerance_outcome(2))
 def standardfalsepos(f, interval, imax, es):
     """Standard false position method"""
     """
@@ -82,6 +86,7 @@ def standardfalsepos(f, interval, imax, es):
 
 
 
+@instrumented(iterations=1, outcome=tolerance_outcome(2))
 def bisect(f, interval, imax, es):
     """Bisection method"""
     """
@@ -113,6 +118,172 @@ def bisect(f, interval, imax, es):
             break
     return xr, iter_, ea
 
+@instrumented(iterations=1, outcome=tolerance_outcome(2))
+def illinois(f, interval, imax, es):
+    """Illinois method"""
+    """
+    False position where the function value at the end point which is kept
+    is halved when the same end point is kept twice in a row, one call to f() per iteration
+    f: function of one argument to find root of
+    interval: iterable with lowel and upper guess (xl,xu)
+    imax: max allowed number of iterations
+    es: maximum relative error allowed in %
+    """
+    return _false_position_scaled(f, interval, imax, es, lambda fr, f_replaced: 0.5)
+
+
+@instrumented(iterations=1, outcome=tolerance_outcome(2))
+def anderson_bjorck(f, interval, imax, es):
+    """Anderson-Bjorck method"""
+    """
+    False position where the function value at the end point which is kept twice in a row
+    is scaled with m = 1 - f(xr) / f(replaced end point), or 0.5 when m <= 0
+    f: function of one argument to find root of
+    interval: iterable with lowel and upper guess (xl,xu)
+    imax: max allowed number of iterations
+    es: maximum relative error allowed in %
+    """
+    def scale(fr, f_replaced):
+        m = 1 - fr / f_replaced
+        return m if m > 0 else 0.5
+    return _false_position_scaled(f, interval, imax, es, scale)
+
+
+def _false_position_scaled(f, interval, imax, es, scale):
+    """False position, scale(fr, f_replaced) is the factor of the function value at the kept end point"""
+    xl, xu = interval # lower and upper guesses
+    iter_ = 0
+    fl = f(xl)
+    fu = f(xu)
+    xr = xu
+    side = 0 # -1 xu was replaced in the previous iteration, +1 xl
+    while True:
+        xr_old = xr # save previous root estimation
+        xr = xu - fu * (xl - xu) / (fl - fu) # new estimate for root
+        fr = f(xr) # function value at new root estimate, only 1 call to f() per iteration
+        iter_ += 1
+        if xr != 0:
+            ea = abs((xr - xr_old) / xr) * 100 # relative error estimate in %
+        test = fl * fr
+        if test < 0: # root in lower part, xu is replaced
+            if side == -1: # xl kept twice in a row
+                fl *= scale(fr, fu)
+            xu = xr; fu = fr; side = -1
+        elif test > 0: # root in upper part, xl is replaced
+            if side == 1: # xu kept twice in a row
+                fu *= scale(fr, fl)
+            xl = xr; fl = fr; side = 1
+        else:
+            ea = 0 # fr must be zero, then xr is root
+        if ea < es or iter_ >= imax: # rel error small enough or max iter reached
+            break
+    return xr, iter_, ea
+
+
+@instrumented(iterations=1, outcome=tolerance_outcome(2))
+def ridders(f, interval, imax, es):
+    """Ridders' method"""
+    """
+    The midpoint xm of the interval and an exponential factor give a new estimate
+    xr = xm + (xm - xl) * sign(fl - fu) * fm / sqrt(fm**2 - fl * fu), two calls to f() per iteration
+    f: function of one argument to find root of
+    interval: iterable with lowel and upper guess (xl,xu)
+    imax: max allowed number of iterations
+    es: maximum relative error allowed in %
+    """
+    xl, xu = interval # lower and upper guesses
+    iter_ = 0
+    fl = f(xl)
+    fu = f(xu)
+    xr = xu
+    while True:
+        xr_old = xr # save previous root estimation
+        xm = (xl + xu) / 2
+        fm = f(xm)
+        s = sqrt(fm * fm - fl * fu) # > 0 as fl and fu have different signs
+        xr = xm + (xm - xl) * copysign(1, fl - fu) * fm / s
+        fr = f(xr)
+        iter_ += 1
+        if xr != 0:
+            ea = abs((xr - xr_old) / xr) * 100 # relative error estimate in %
+        if fr == 0:
+            ea = 0 # xr is root
+        elif fm * fr < 0: # root between xm and xr
+            xl, fl, xu, fu = xm, fm, xr, fr
+        elif fl * fr < 0: # root between xl and xr
+            xu = xr; fu = fr
+        else: # root between xr and xu
+            xl = xr; fl = fr
+        if ea < es or iter_ >= imax: # rel error small enough or max iter reached
+            break
+    return xr, iter_, ea
+
+
+@instrumented(iterations=1, outcome=tolerance_outcome(2))
+def itp(f, interval, imax, es, k1=None, k2=2.0, n0=1):
+    """ITP method, Interpolate Truncate and Project"""
+    """
+    The false position estimate is moved towards the midpoint (truncation) and kept
+    within a distance of the midpoint (projection) so the interval never needs more iterations
+    than bisection plus n0 to reach the tolerance, one call to f() per iteration
+    f: function of one argument to find root of
+    interval: iterable with lowel and upper guess (xl,xu)
+    imax: max allowed number of iterations
+    es: maximum relative error allowed in %, ea is half the width of the interval relative to xr,
+    an upper bound of the true error
+    k1, k2: truncation parameters, default k1 = 0.2 / (xu - xl)
+    n0: extra iterations allowed above bisection
+    """
+    xl, xu = interval # lower and upper guesses
+    fl = f(xl)
+    fu = f(xu)
+    s = copysign(1, fu) # s * f is negative at xl and positive at xu
+    k1 = 0.2 / (xu - xl) if k1 is None else k1
+    # tolerance on the root: relative to the smallest possible root, absolute when 0 is in the interval
+    eps = es / 100 * (min(abs(xl), abs(xu)) if xl * xu > 0 else xu - xl)
+    n_max = ceil(log2((xu - xl) / (2 * eps))) + n0 # max. number of iterations
+    iter_ = 0
+    while True:
+        x_half = (xl + xu) / 2
+        r = max(eps * 2.0**(n_max - iter_) - (xu - xl) / 2, 0.0) # radius of the projection
+        delta = k1 * (xu - xl)**k2
+        x_f = (fu * xl - fl * xu) / (fu - fl) # false position
+        sigma = copysign(1, x_half - x_f)
+        x_t = x_f + sigma * delta if delta <= abs(x_half - x_f) else x_half # truncation
+        xr = x_t if abs(x_t - x_half) <= r else x_half - sigma * r # projection
+        fr = f(xr)
+        iter_ += 1
+        if s * fr > 0:
+            xu = xr; fu = fr
+        elif s * fr < 0:
+            xl = xr; fl = fr
+        else:
+            xl = xu = xr # xr is root
+        if xl == xu:
+            ea = 0
+        else:
+            xr = (xl + xu) / 2
+            ea = abs((xu - xl) / 2 / xr) * 100 if xr != 0 else 100.0 # relative error estimate in %
+        if ea < es or iter_ >= imax: # rel error small enough or max iter reached
+            break
+    return xr, iter_, ea
+
+
+def count_evaluations(method, f, interval, imax, es):
+    """
+    Call a bracketing method and count the calls of f
+    method: bisect, standardfalsepos, modfalsepos, illinois, anderson_bjorck, ridders or itp
+    returns root, number of iterations, relative error estimate in %, number of calls of f
+    """
+    n_evals = 0
+    def counted(x):
+        nonlocal n_evals
+        n_evals += 1
+        return f(x)
+    xr, iter_, ea = method(counted, interval, imax, es)
+    return xr, iter_, ea, n_evals
+
+
 def report(f, method, result):
     root, steps, rel_error =result
     print("\n"+method.__doc__)
@@ -130,18 +301,44 @@ def fun(x):
     """f(x) = x**10 - 1 = 0"""
     return x**10 - 1
 
-interval = (0, 1.3)
-error_percent = 0.01
-N = 100
 
-result = bisect(fun, interval, N, error_percent)
-report(fun, bisect, result)
+if __name__ == "__main__":
+    interval = (0, 1.3)
+    error_percent = 0.01
+    N = 100
+
+    result = bisect(fun, interval, N, error_percent)
+    report(fun, bisect, result)
+
+    result = standardfalsepos(fun, interval, N, error_percent)
+    report(fun, standardfalsepos, result)
+
+
+    result = modfalsepos(fun, interval, N, error_percent)
+    report(fun, modfalsepos, result)
 
-result = standardfalsepos(fun, interval, N, error_percent)
-report(fun, standardfalsepos, result)
+    result = illinois(fun, interval, N, error_percent)
+    report(fun, illinois, result)
 
+    result = anderson_bjorck(fun, interval, N, error_percent)
+    report(fun, anderson_bjorck, result)
 
-result = modfalsepos(fun, interval, N, error_percent)
-report(fun, modfalsepos, result)
+    result = ridders(fun, interval, N, error_percent)
+    report(fun, ridders, result)
 
+    result = itp(fun, interval, N, error_percent)
+    report(fun, itp, result)
 
+    # number of calls of f to reach es = 1e-8% on some problems of this repository
+    from rectifier_capacitor_ripple import f as ripple
+    problems = [("x**10 - 1", fun, (0, 1.3)),
+                ("exp(-x) - x", lambda x: exp(-x) - x, (0, 1)),
+                ("Colebrook", lambda f: 1/sqrt(f) + 2 * log10(1.5e-6/(3.7*0.005) + 2.51/(13743*sqrt(f))), (0.008, 0.08)),
+                ("Ripple", lambda t: ripple(t, 5e3, 220e-6, 50), (5e-3, 10e-3)),
+                ("x**3 - 2x - 5", lambda x: x**3 - 2*x - 5, (2, 3))]
+    methods = [bisect, standardfalsepos, modfalsepos, illinois, anderson_bjorck, ridders, itp]
+    print("\nNumber of calls of f for es = 1e-8%, at most 1000 iterations")
+    print(f"{'':<14}|" + "|".join(f"{method.__name__:>16}" for method in methods))
+    for name, g, bracket in problems:
+        counts = [count_evaluations(method, g, bracket, 1000, 1e-8)[3] for method in methods]
+        print(f"{name:<14}|" + "|".join(f"{count:>16}" for count in counts))
@@ -20,13 +20,17 @@
 
 from math import *
 
-def secant_mod(f, x0, epsilon, es, imax):
+from metrics_registry import instrumented, tolerance_outcome
+
+@instrumented(iterations=1, outcome=tolerance_outcome(2, "zero_difference"))
+def secant_mod(f, x0, epsilon, es, imax, verbose=True):
     """Modified secant method
        f: function to find root of
        x0: initial guess of root
        epsilon: small factor, dx is approximated by epsilon*x
        es: maximum allowed percentage error
-       imax: maximum number iterations"""
+       imax: maximum number iterations
+       verbose: print the estimate of every iteration"""
     for iter_ in range(imax):
         f0 = f(x0)
         f1 = f(x0 + epsilon * x0)
@@ -37,7 +41,8 @@ def secant_mod(f, x0, epsilon, es, imax):
             break
         if x1 != 0:
             ea = abs((x1 - x0) / x1) * 100
-        print(f"step {iter_+1}: x{iter_+2} = {x1:.8f}, ea = {ea:.4}%")
+        if verbose:
+            print(f"step {iter_+1}: x{iter_+2} = {x1:.8f}, ea = {ea:.4}%")
         if ea < es:
             break
         x0 = x1
@@ -61,12 +66,12 @@ def f(x):
     """f(x) = exp(-x) - x = 0"""
     return  exp(-x) - x
 
-x0 = 1.0 # intial guesses for root
-epsilon = 0.01
-es = 0.01 # max. relative error in %
-imax = 100 # max. number of iterations
-
-result = secant_mod(f, x0, epsilon, es, imax)
-report(f, secant_mod, result)
 
+if __name__ == "__main__":
+    x0 = 1.0 # intial guesses for root
+    epsilon = 0.01
+    es = 0.01 # max. relative error in %
+    imax = 100 # max. number of iterations
 
+    result = secant_mod(f, x0, epsilon, es, imax)
+    report(f, secant_mod, result)
@@ -8,13 +8,17 @@
 
 from math import *
 
-def newton_raphson(f, Df, x0, es, imax):
+from metrics_registry import instrumented, tolerance_outcome
+
+@instrumented(iterations=1, outcome=tolerance_outcome(2, "zero_derivative"))
+def newton_raphson(f, Df, x0, es, imax, verbose=True):
     """Newton-Raphson method
        f: function to find root of
        Df: derivative function of f
        x0: initial guess for root
        es: max. percentage error
-       imax: max. number iterations"""
+       imax: max. number iterations
+       verbose: print the estimate of every iteration"""
     xr = x0
     for iter_ in range(imax): 
         xr_old = xr
@@ -26,7 +30,8 @@ def newton_raphson(f, Df, x0, es, imax):
             break
         if xr != 0:
             ea = abs((xr - xr_old) / xr) * 100
-        print(f"x{iter_} = {xr:.8f}, ea = {ea:.4}%")
+        if verbose:
+            print(f"x{iter_} = {xr:.8f}, ea = {ea:.4}%")
         if ea < es:
             break
     return xr, iter_+1, ea
@@ -53,11 +58,11 @@ def Df(x):
     """df/dt"""
     return -exp(-x) - 1
 
-x_init = 0
-es = 0.1
-imax = 100
-
-result = newton_raphson(f, Df, x_init, es, imax)
-report(f, newton_raphson, result)
 
+if __name__ == "__main__":
+    x_init = 0
+    es = 0.1
+    imax = 100
 
+    result = newton_raphson(f, Df, x_init, es, imax)
+    report(f, newton_raphson, result)
@@ -14,14 +14,19 @@
 
 from math import *
 
-def secant(f, x0, x1, es, imax):
+from metrics_registry import instrumented, tolerance_outcome
+
+@instrumented(iterations=1, outcome=tolerance_outcome(2, "zero_difference"))
+def secant(f, x0, x1, es, imax, verbose=True):
     """Secant method
        f: function to find root of
        x0,x1: two guesses of root, does not have to bracket the root value
        es: maximum allowed percentage error
-       imax: maximum number iterations"""
+       imax: maximum number iterations
+       verbose: print the estimate of every iteration"""
     f0 = f(x0); f1 = f(x1)
-    print(f"x0 = {x0:.8f}"); print(f"x1 = {x1:.8f}")
+    if verbose:
+        print(f"x0 = {x0:.8f}"); print(f"x1 = {x1:.8f}")
     for iter_ in range(imax):
         if f0 != f1:
             x2 = x1 - f1 * (x0 - x1) / (f0 - f1)
@@ -32,7 +37,8 @@ def secant(f, x0, x1, es, imax):
         f1, f0 = f(x1), f1
         if x1 != 0:
             ea = abs((x1 - x0) / x1) * 100
-        print(f"step {iter_+1}: x{iter_+2} = {x1:.8f}, ea = {ea:.4}%")
+        if verbose:
+            print(f"step {iter_+1}: x{iter_+2} = {x1:.8f}, ea = {ea:.4}%")
         if ea < es:
             break
     return x1, iter_+1, ea
@@ -55,12 +61,12 @@ def f(x):
     """f(x) = exp(-x) - x = 0"""
     return  exp(-x) - x
 
-x0 = 0.0 # intial guesses for root
-x1 = 0.2
-es = 0.01 # max. relative error in %
-imax = 100 # max. number of iterations
-
-result = secant(f, x0, x1, es, imax)
-report(f, secant, result)
 
+if __name__ == "__main__":
+    x0 = 0.0 # intial guesses for root
+    x1 = 0.2
+    es = 0.01 # max. relative error in %
+    imax = 100 # max. number of iterations
 
+    result = secant(f, x0, x1, es, imax)
+    report(f, secant, result)
@@ -25,13 +25,13 @@ exp(-t1/(R*C)) + cos(2*pi*f*t1) = 0"""
 from math import *
 
 
-def f(t):
+def f(t, R, C, f_mains):
     """exp(-t1/(R*C)) + cos(2*pi*f*t1) = 0"""
     return exp(-t/(R*C)) + cos(2*pi*f_mains*t)
 
-def v(t):
+def v(t, Vamplitude, R, C):
     """Vamplitude*exp(-t1/(R*C))"""
-    return Vamplitude*exp(-t1/(R*C))
+    return Vamplitude*exp(-t/(R*C))
 
 
 def bisect(f, interval, imax, es):
@@ -67,33 +67,35 @@ def bisect(f, interval, imax, es):
 
 
 
-# circuit parameters
-Vrms = 230 # Volt
-Vamplitude = sqrt(2)*Vrms
-R = 5E3 # Ohm
-C = 220E-6 # Farad
-f_mains = 50 # Hertz
-
-# numerical parameters
-t0 = 0.0 # intial guesses for t
-t1 = 10E-3
-es = 0.01 # max. relative error in %
-imax = 100 # max. number of iterations
-
-# find root and display result
-print(info)
-print("\nUsing Bisection Method")
-print(f"Finding root of {f.__doc__} which will give time tr\nwhen voltage on capacitor is lowest")
-print(f"Initial guesses for t: t0 = {t0}, t1 = {t1}")
-root, steps, rel_error = bisect(f, (t0, t1), imax, es)
-
-if root != None:
-    print(f"\nFound tr = {root:10.8e} +-{rel_error:.1}% after {steps} iterations, Residual: f(tr) = {f(root):.3}")
-    print(f"Mains voltage: {Vrms}V at {f_mains} Hz, With smoothing capacitor C = {C:.1e}F, load resistance R = {R}Ohm")
-    vmin = v(root)
-    print(f"Lowest voltage on capacitor at t={root:10.3e}s = {vmin:.3f}V")
-    print(f"Mains voltage of {Vrms}Vrms, Amplitude of mains voltage is also highest voltage on capacitor: {Vamplitude:.3f}V")
-    vripple = Vamplitude - vmin
-    print(f"Ripple voltage: Vripple = {Vamplitude:.3f}V - {vmin:.3f}V = {vripple:.3f}Vpp")
-else:
-    print(f"No root found after {steps} iterations")
+if __name__ == "__main__":
+    # circuit parameters
+    Vrms = 230 # Volt
+    Vamplitude = sqrt(2)*Vrms
+    R = 5E3 # Ohm
+    C = 220E-6 # Farad
+    f_mains = 50 # Hertz
+
+    # numerical parameters
+    t0 = 0.0 # intial guesses for t
+    t1 = 10E-3
+    es = 0.01 # max. relative error in %
+    imax = 100 # max. number of iterations
+
+    # find root and display result
+    print(info)
+    print("\nUsing Bisection Method")
+    print(f"Finding root of {f.__doc__} which will give time tr\nwhen voltage on capacitor is lowest")
+    print(f"Initial guesses for t: t0 = {t0}, t1 = {t1}")
+    f_circuit = lambda t: f(t, R, C, f_mains) # function of t only for bisect()
+    root, steps, rel_error = bisect(f_circuit, (t0, t1), imax, es)
+
+    if root != None:
+        print(f"\nFound tr = {root:10.8e} +-{rel_error:.1}% after {steps} iterations, Residual: f(tr) = {f_circuit(root):.3}")
+        print(f"Mains voltage: {Vrms}V at {f_mains} Hz, With smoothing capacitor C = {C:.1e}F, load resistance R = {R}Ohm")
+        vmin = v(root, Vamplitude, R, C)
+        print(f"Lowest voltage on capacitor at t={root:10.3e}s = {vmin:.3f}V")
+        print(f"Mains voltage of {Vrms}Vrms, Amplitude of mains voltage is also highest voltage on capacitor: {Vamplitude:.3f}V")
+        vripple = Vamplitude - vmin
+        print(f"Ripple voltage: Vripple = {Vamplitude:.3f}V - {vmin:.3f}V = {vripple:.3f}Vpp")
+    else:
+        print(f"No root found after {steps} iterations")
@@ -0,0 +1,177 @@
+# Ripple voltage of the rectified mains voltage for many combinations of R, C, Vrms and f_mains
+# vectorized version of rectifier_capacitor_ripple.py using numpy arrays
+#
+# Voltage on capacitor drops until the next pair of diodes conduct, ignoring diode forward voltage:
+#
+#   exp(-t1/(R*C)) + cos(2*pi*f*t1) = 0
+#
+# The root t1 always lies in the bracket [1/(4f), 1/(2f)]:
+#   at t = 1/(4f) cos() = 0 and the equation is positive,
+#   at t = 1/(2f) cos() = -1 and the equation is negative.
+# All combinations are solved at once, every iteration works on whole arrays.
+#
+# Safeguarded Newton-Raphson: the Newton step is used when it stays inside the bracket,
+# else a bisection step is taken, the bracket is updated after every step.
+# For a small ripple the root lies close to the minimum of the equation near t = 1/(2f),
+# the derivative is almost zero there and Newton-Raphson converges slowly.
+# On the bracket cos(2*pi*f*t) = -cos(pi - 2*pi*f*t), the same root solves
+#
+#   g(t) = 2*pi*f*t + arccos( exp(-t/(R*C)) ) - pi = 0
+#
+#   dg/dt = 2*pi*f + exp(-t/(R*C)) / (R*C) / sqrt( 1 - exp(-2t/(R*C)) )
+#
+# g is increasing with dg/dt >= 2*pi*f, so Newton-Raphson converges fast for any ripple.
+#
+# This code uses the numpy library
+
+from math import *
+
+import numpy as np
+
+from metrics_registry import instrumented, tolerance_outcome
+
+
+def ripple_equation(t, R, C, f_mains):
+    """exp(-t/(R*C)) + cos(2*pi*f_mains*t), numpy arrays"""
+    return np.exp(-t / (R * C)) + np.cos(2 * np.pi * f_mains * t)
+
+
+def ripple_equation_arccos(t, R, C, f_mains):
+    """2*pi*f_mains*t + arccos(exp(-t/(R*C))) - pi, same root as ripple_equation(), numpy arrays"""
+    return 2 * np.pi * f_mains * t + np.arccos(np.exp(-t / (R * C))) - np.pi
+
+
+def ripple_equation_arccos_derivative(t, R, C, f_mains):
+    """derivative of ripple_equation_arccos() to t, numpy arrays"""
+    e = np.exp(-t / (R * C))
+    return 2 * np.pi * f_mains + e / (R * C) / np.sqrt(1 - e * e)
+
+
+@instrumented(iterations=2, outcome=tolerance_outcome(1))
+def bisect_arr(f, xl, xu, imax, es):
+    """
+    Bisection method on arrays of brackets, every element has a sign change in [xl, xu]
+    f: function of an array returning an array
+    xl, xu: arrays of lower and upper guesses
+    imax: max allowed number of iterations
+    es: maximum relative error allowed in %
+    returns arrays of roots and relative error estimates in %, number of iterations
+    """
+    xl = np.array(xl, dtype=float); xu = np.array(xu, dtype=float)
+    fl = f(xl)
+    xr = xu.copy()
+    ea = np.full(xr.shape, 100.0)
+    for iter_ in range(1, imax + 1):
+        xr_old = xr
+        xr = (xl + xu) / 2
+        fr = f(xr)
+        ea = np.where(xr != 0, np.abs((xr - xr_old) / np.where(xr != 0, xr, 1)) * 100, ea)
+        test = fl * fr
+        xu = np.where(test < 0, xr, xu) # root in lower half
+        upper = test > 0 # root in upper half
+        xl = np.where(upper, xr, xl)
+        fl = np.where(upper, fr, fl)
+        ea = np.where(test == 0, 0.0, ea)
+        if np.all(ea < es):
+            break
+    return xr, ea, iter_
+
+
+@instrumented(iterations=2, outcome=tolerance_outcome(1))
+def newton_safeguarded_arr(f, df, xl, xu, imax, es):
+    """
+    Newton-Raphson method with bisection as safeguard, on arrays of brackets
+    every element has a sign change in [xl, xu]
+    f: function of an array returning an array
+    df: derivative of f
+    xl, xu: arrays of lower and upper guesses
+    imax: max allowed number of iterations
+    es: maximum relative error allowed in %
+    returns arrays of roots and relative error estimates in %, number of iterations
+    """
+    xl = np.array(xl, dtype=float); xu = np.array(xu, dtype=float)
+    fl = f(xl)
+    xr = (xl + xu) / 2
+    ea = np.full(xr.shape, 100.0)
+    for iter_ in range(1, imax + 1):
+        fr = f(xr)
+        upper = fl * fr > 0 # update the bracket with the current estimate
+        xl = np.where(upper, xr, xl); fl = np.where(upper, fr, fl)
+        xu = np.where(upper, xu, xr)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_newton = xr - fr / df(xr)
+        inside = (x_newton > xl) & (x_newton < xu) # else bisection step
+        xr_old = xr
+        xr = np.where(fr == 0, xr, np.where(inside, x_newton, (xl + xu) / 2))
+        ea = np.abs((xr - xr_old) / xr) * 100
+        if np.all(ea < es):
+            break
+    return xr, ea, iter_
+
+
+def ripple_sweep(R, C, Vrms, f_mains, method="newton", es=1e-8, imax=100):
+    """
+    Ripple voltage for arrays of circuit parameters, broadcast against each other
+    R: load resistance in Ohm
+    C: smoothing capacitor in F
+    Vrms: mains voltage in V rms
+    f_mains: mains frequency in Hz
+    method: "newton" for safeguarded Newton-Raphson or "bisection"
+    es: maximum relative error allowed in %
+    imax: max allowed number of iterations
+    returns arrays of time of lowest voltage tr, lowest voltage Vmin and ripple voltage Vpp
+    """
+    R, C, Vrms, f_mains = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (R, C, Vrms, f_mains)))
+    xl = 1 / (4 * f_mains); xu = 1 / (2 * f_mains)
+    if method == "newton":
+        g = lambda t: ripple_equation_arccos(t, R, C, f_mains)
+        dg = lambda t: ripple_equation_arccos_derivative(t, R, C, f_mains)
+        tr, ea, iter_ = newton_safeguarded_arr(g, dg, xl, xu, imax, es)
+    elif method == "bisection":
+        tr, ea, iter_ = bisect_arr(lambda t: ripple_equation(t, R, C, f_mains), xl, xu, imax, es)
+    else:
+        raise ValueError(f"unknown method {method}, use newton or bisection")
+    Vamplitude = sqrt(2) * Vrms
+    Vmin = Vamplitude * np.exp(-tr / (R * C))
+    return tr, Vmin, Vamplitude - Vmin
+
+
+if __name__ == "__main__":
+    import time
+
+    from rectifier_capacitor_ripple import bisect, f, v
+
+    R = np.geomspace(500, 20e3, 50)[:, None, None, None] # Ohm
+    C = np.geomspace(10e-6, 2200e-6, 50)[None, :, None, None] # Farad
+    Vrms = np.array([115.0, 230.0])[None, None, :, None] # Volt
+    f_mains = np.array([50.0, 60.0])[None, None, None, :] # Hertz
+    n = np.broadcast(R, C, Vrms, f_mains).size
+    print("Ripple voltage of rectified mains voltage for a grid of R, C, Vrms and f_mains")
+    print("-------------------------------------------------------------------------------")
+    print(f"{n} combinations solved at once\n")
+    results = {}
+    for method in ("newton", "bisection"):
+        t_start = time.perf_counter()
+        results[method] = ripple_sweep(R, C, Vrms, f_mains, method)
+        print(f"{method:<11}: {time.perf_counter() - t_start:.3f}s")
+    tr, Vmin, Vpp = results["newton"]
+
+    # check against the scalar bisection of rectifier_capacitor_ripple.py
+    t_start = time.perf_counter()
+    def ripple_scalar(R, C, Vrms, f_mains):
+        """ripple voltage for one combination with the scalar bisect()"""
+        tr, iter_, ea = bisect(lambda t: f(t, R, C, f_mains), (1 / (4 * f_mains), 1 / (2 * f_mains)), 100, 1e-8)
+        return sqrt(2) * Vrms - v(tr, sqrt(2) * Vrms, R, C)
+    Vpp_scalar = np.vectorize(ripple_scalar)(R, C, Vrms, f_mains)
+    print(f"scalar loop: {time.perf_counter() - t_start:.3f}s")
+    for method, (tr_m, Vmin_m, Vpp_m) in results.items():
+        print(f"    max. difference of {method} with scalar bisect(): {np.max(np.abs(Vpp_scalar - Vpp_m)):.1e}V")
+
+    print("\nSmallest capacitor for less than 5Vpp ripple at 230Vrms, 50Hz:")
+    for i in [0, 24, 49]:
+        ok = Vpp[i, :, 1, 0] < 5
+        if ok.any():
+            j = np.argmax(ok)
+            print(f"R = {R[i, 0, 0, 0]:>8.1f}Ohm: C = {C[0, j, 0, 0] * 1e6:>7.1f}uF, ripple {Vpp[i, j, 1, 0]:.3f}Vpp, Vmin = {Vmin[i, j, 1, 0]:.3f}V")
+        else:
+            print(f"R = {R[i, 0, 0, 0]:>8.1f}Ohm: no capacitor in the grid is large enough")
@@ -0,0 +1,126 @@
+# Periodic steady state of the bridge rectifier with the shooting method
+#
+# The transient simulation of rectifier_capacitor_ripple.sp runs 150ms mostly to get past
+# the start-up transient. The steady state is the periodic orbit of the capacitor voltage:
+#
+#   vC(t0 + T) = vC(t0),  T = 1 / f_mains
+#
+# Φ(v0) is the capacitor voltage after integrating one period starting from vC(t0) = v0,
+# the shooting method solves F(v0) = Φ(v0) - v0 = 0 with Newton-Raphson:
+#
+#   v0(i+1) = v0(i) - F(v0(i)) / F'(v0(i)),   F'(v0) ≈ ( Φ(v0 + δ) - Φ(v0) ) / δ - 1
+#
+# t0 is a zero crossing of the mains voltage, where the diodes do not conduct.
+# The capacitor is recharged every half period, so Φ hardly depends on v0 and F' ≈ -1 changes little:
+# the derivative of the first iteration is kept (chord method), the first iteration costs two
+# integrations over one period and every next iteration one.
+#
+# Conduction angle: the part of a half period in which the diodes conduct, in degrees.
+
+from math import *
+
+import numpy as np
+
+from metrics_registry import instrumented, tolerance_outcome
+from rectifier_transient_simulation import rectifier_circuit, transient
+
+
+def period_map(circuit, v0, t0, period, node="vp", t_step=None, **options):
+    """
+    Integrate the circuit over one period starting from node voltage v0 on the capacitor
+    circuit: Circuit
+    v0: initial voltage of node at t0
+    t0: start time of the period in s
+    period: period in s
+    node: node of the capacitor voltage
+    t_step: step of the transient simulation, default period / 200
+    options: further arguments of transient()
+    returns node voltage at t0 + period and TransientResult of the period
+    """
+    t_step = period / 200 if t_step is None else t_step
+    result = transient(circuit, t0 + period, t_step, t_start=t0, ic={node: v0}, **options)
+    return result.v(node)[-1], result
+
+
+@instrumented(function=None, iterations=2, outcome=tolerance_outcome(3))
+def shooting(circuit, period, v0, node="vp", t0=0.0, es=1e-4, imax=20, delta=1e-3, **options):
+    """
+    Periodic steady state with the shooting method, Newton-Raphson on the capacitor voltage
+    circuit: Circuit
+    period: period of the sources in s
+    v0: initial guess of the node voltage at t0, below the peak of the orbit the diodes conduct
+        in the first period and the derivative of the first iteration is close to the one on the orbit
+    node: node of the capacitor voltage
+    t0: start time of the periods in s
+    es: maximum relative error allowed in %
+    imax: max. number of iterations
+    delta: relative change of v0 for the finite-difference derivative
+    options: further arguments of transient()
+    returns node voltage at t0 on the periodic orbit, TransientResult of one period on the orbit,
+    number of iterations, relative error estimate in %, number of integrated periods
+    """
+    n_periods = 0
+    dF = None
+    for iter_ in range(1, imax + 1):
+        v_end, result = period_map(circuit, v0, t0, period, node, **options)
+        n_periods += 1
+        F = v_end - v0
+        if dF is None: # derivative of the first iteration is kept
+            dv = delta * max(abs(v0), 1.0)
+            v_end_delta, result_delta = period_map(circuit, v0 + dv, t0, period, node, **options)
+            n_periods += 1
+            dF = (v_end_delta - v_end) / dv - 1
+        v0_new = v0 - F / dF
+        ea = abs((v0_new - v0) / v0_new) * 100 # relative error estimate in %
+        if ea <= es: # result is the orbit of the last v0, within the error estimate
+            break
+        v0 = v0_new
+    return v0, result, iter_, ea, n_periods
+
+
+def ripple(result, node="vp"):
+    """peak to peak voltage of node over the simulated time"""
+    v = result.v(node)
+    return np.max(v) - np.min(v)
+
+
+def conduction_angle(result, source, period, fraction=0.01):
+    """
+    Conduction angle of the rectifier in degrees per half period of the mains
+    result: TransientResult of one period
+    source: name of the mains voltage source
+    period: period in s
+    fraction: the diodes conduct when |i| is above this fraction of the peak current
+    """
+    i = np.abs(result.i(source))
+    conducting = i > fraction * np.max(i)
+    dt = np.diff(result.time)
+    t_on = np.sum(dt[conducting[1:] & conducting[:-1]]) # segments with both ends conducting
+    return t_on / (period / 2) * 180
+
+
+if __name__ == "__main__":
+    import time
+
+    f_mains = 50.0 # Hz
+    period = 1 / f_mains
+    amplitude = 325.0 # V
+    circuit = rectifier_circuit(amplitude, f_mains)
+    print("Periodic steady state of bridge rectifier with the shooting method")
+    print("------------------------------------------------------------------")
+    print(f"Circuit of rectifier_capacitor_ripple.sp, mains {amplitude}V amplitude at {f_mains}Hz")
+
+    t_start = time.perf_counter()
+    v0, orbit, iterations, ea, n_periods = shooting(circuit, period, 0.9 * amplitude)
+    t_shooting = time.perf_counter() - t_start
+    print(f"\nShooting method: vC(t0) = {v0:.6f}V after {iterations} iterations, ea = {ea:.1e}%")
+    print(f"    {n_periods} periods integrated in {t_shooting:.2f}s")
+    print(f"    ripple {ripple(orbit):.3f}Vpp, Vmax = {np.max(orbit.v('vp')):.3f}V, Vmin = {np.min(orbit.v('vp')):.3f}V")
+    print(f"    conduction angle {conduction_angle(orbit, 'V1', period):.1f}° per half period")
+
+    t_start = time.perf_counter()
+    result = transient(circuit, 150e-3, period / 200)
+    t_transient = time.perf_counter() - t_start
+    last_period = result.time >= 150e-3 - period
+    print(f"\nTransient simulation of 150ms from vC = 0V in {t_transient:.2f}s")
+    print(f"    ripple in last period {np.ptp(result.v('vp')[last_period]):.3f}Vpp")
@@ -0,0 +1,442 @@
+# Transient simulation of the bridge rectifier with smoothing capacitor
+# circuit of rectifier_capacitor_ripple.sp, solved in-process instead of with ngspice
+#
+# Modified nodal analysis (MNA): unknowns are the node voltages and the current
+# of every voltage source, at each time point the circuit gives G.x = b
+#
+# Capacitor, companion model of the Trapezoidal rule (Backward Euler on the first step):
+#
+#   Trapezoidal:     i(n+1) = 2C/h . (v(n+1) - v(n)) - i(n)
+#   Backward Euler:  i(n+1) = C/h . (v(n+1) - v(n))
+#
+# Diode, Shockley equation with series resistance rs (extra internal node):
+#
+#   id = is . ( exp( vd / (n.Vt) ) - 1 ),  gd = is / (n.Vt) . exp( vd / (n.Vt) )
+#
+# The diode is nonlinear, at each time point Newton-Raphson is applied: the diode is replaced
+# by conductance gd in parallel with current id - gd.vd, G.x = b is solved and repeated until x converges.
+# The junction voltage change per iteration is limited (pnjlim of SPICE) to keep exp() from overflowing.
+# G.x = b is solved with dense numpy arrays (DenseSystem), spice_netlist_mna.py has a sparse version.
+#
+# Step size control with the local truncation error (LTE) of the Trapezoidal rule:
+#
+#   LTE of charge ≈ C . h³/12 . v'''  ≈  C . h³/2 . |v[t(n-2), t(n-1), t(n), t(n+1)]|
+#
+# using the third divided difference of the capacitor voltage. A step with too large an error is
+# rejected and repeated with a smaller h, a step where Newton-Raphson does not converge is halved.
+#
+# Events (time_stepping_events.py) are located after every accepted step on the dense interpolant.
+# For a terminal or restart event the step is repeated to end exactly on the event time.
+# For long simulations the waveforms are streamed to a memory-mapped file (waveform_writer_memmap.py).
+#
+# This code uses the numpy library
+
+from math import *
+
+import numpy as np
+
+from time_stepping_events import Event, locate_events
+
+
+class DiodeModel:
+    """Parameters of the Shockley diode model
+    is_: saturation current in A
+    n: emission coefficient
+    rs: series resistance in Ohm"""
+    def __init__(self, is_=1e-14, n=1.0, rs=0.0):
+        self.is_ = is_
+        self.n = n
+        self.rs = rs
+
+
+class Circuit:
+    """Circuit of resistors, capacitors, diodes and sine voltage sources,
+    node "0" is ground"""
+    def __init__(self, title=""):
+        self.title = title
+        self.nodes = [] # names of nodes except ground, in order of creation
+        self.resistors = [] # (name, node+, node-, R)
+        self.capacitors = [] # (name, node+, node-, C)
+        self.diodes = [] # (name, anode, cathode, model)
+        self.sources = [] # (name, node+, node-, offset, amplitude, frequency)
+
+    def node(self, name):
+        """Index of node, ground has index -1"""
+        if name == "0":
+            return -1
+        if name not in self.nodes:
+            self.nodes.append(name)
+        return self.nodes.index(name)
+
+    def add_resistor(self, name, n_plus, n_minus, value):
+        self.resistors.append((name, self.node(n_plus), self.node(n_minus), value))
+
+    def add_capacitor(self, name, n_plus, n_minus, value):
+        self.capacitors.append((name, self.node(n_plus), self.node(n_minus), value))
+
+    def add_diode(self, name, anode, cathode, model):
+        if model.rs > 0: # series resistance to an internal node
+            internal = f"{name}#internal"
+            self.add_resistor(f"{name}#rs", anode, internal, model.rs)
+            anode = internal
+        self.diodes.append((name, self.node(anode), self.node(cathode), model))
+
+    def add_sine_source(self, name, n_plus, n_minus, offset, amplitude, frequency):
+        """voltage source v(t) = offset + amplitude * sin(2*pi*frequency*t)"""
+        self.sources.append((name, self.node(n_plus), self.node(n_minus), offset, amplitude, frequency))
+
+
+class TransientResult:
+    """Waveforms of a transient simulation
+    time: numpy array of accepted time points
+    data: numpy array of node voltages and source currents, one row per time point
+    names: names of the columns of data
+    stats: dict of numbers of accepted and rejected steps and Newton-Raphson iterations
+    events: list of tuples (name, time) of the events found"""
+    def __init__(self, time, data, names, stats, events=None):
+        self.time = time
+        self.data = data
+        self.names = names
+        self.stats = stats
+        self.events = [] if events is None else events
+
+    def v(self, node):
+        """voltage of node as numpy array"""
+        if node == "0":
+            return np.zeros_like(self.time)
+        return self.data[:, self.names.index(f"v({node})")]
+
+    def i(self, source):
+        """current through voltage source as numpy array"""
+        return self.data[:, self.names.index(f"i({source})")]
+
+
+class _Waveforms:
+    """Growing numpy arrays, capacity doubled when full"""
+    def __init__(self, width, capacity=1024):
+        self.time = np.empty(capacity)
+        self.data = np.empty((capacity, width))
+        self.length = 0
+
+    def append(self, t, x):
+        if self.length == len(self.time):
+            self.time = np.concatenate([self.time, np.empty_like(self.time)])
+            self.data = np.concatenate([self.data, np.empty_like(self.data)])
+        self.time[self.length] = t
+        self.data[self.length] = x
+        self.length += 1
+
+    def arrays(self):
+        return self.time[:self.length].copy(), self.data[:self.length].copy()
+
+
+def pnjlim(v_new, v_old, vt, vcrit):
+    """Limit the change of the junction voltage of a diode, numpy arrays
+    as in SPICE: above vcrit the step is logarithmic instead of linear"""
+    v_new = np.array(v_new, dtype=float)
+    limit = (v_new > vcrit) & (np.abs(v_new - v_old) > 2 * vt)
+    if limit.any():
+        arg = 1 + (v_new - v_old) / vt
+        with np.errstate(invalid="ignore", divide="ignore"):
+            from_old = np.where(arg > 0, v_old + vt * np.log(np.maximum(arg, 1e-300)), vcrit)
+            from_zero = vt * np.log(np.maximum(v_new / vt, 1e-300))
+        v_new = np.where(limit, np.where(v_old > 0, from_old, from_zero), v_new)
+    return v_new
+
+
+class _Stamps:
+    """Index arrays of the circuit for stamping G and b with numpy,
+    ground is mapped on the extra last row and column which are dropped before solving"""
+    def __init__(self, circuit, gmin):
+        n_nodes = len(circuit.nodes)
+        self.size = n_nodes + len(circuit.sources)
+        ground = self.size
+        idx = lambda i: ground if i < 0 else i
+        self.G_linear = np.zeros((self.size + 1, self.size + 1))
+        for name, p, m, value in circuit.resistors:
+            _stamp_conductance(self.G_linear, idx(p), idx(m), 1 / value)
+        for i in range(n_nodes): # gmin from every node to ground
+            self.G_linear[i, i] += gmin
+        for k, (name, p, m, offset, amplitude, frequency) in enumerate(circuit.sources):
+            row = n_nodes + k
+            self.G_linear[idx(p), row] += 1; self.G_linear[idx(m), row] -= 1
+            self.G_linear[row, idx(p)] += 1; self.G_linear[row, idx(m)] -= 1
+        self.source_rows = n_nodes + np.arange(len(circuit.sources))
+        self.source_params = np.array([s[3:] for s in circuit.sources], dtype=float).reshape(-1, 3)
+        self.cap_p = np.array([idx(c[1]) for c in circuit.capacitors], dtype=int)
+        self.cap_m = np.array([idx(c[2]) for c in circuit.capacitors], dtype=int)
+        self.cap_c = np.array([c[3] for c in circuit.capacitors], dtype=float)
+        self.diode_a = np.array([idx(d[1]) for d in circuit.diodes], dtype=int)
+        self.diode_k = np.array([idx(d[2]) for d in circuit.diodes], dtype=int)
+        self.diode_is = np.array([d[3].is_ for d in circuit.diodes], dtype=float)
+        self.diode_vt = np.array([d[3].n * Vt for d in circuit.diodes], dtype=float)
+        self.diode_vcrit = self.diode_vt * np.log(self.diode_vt / (sqrt(2) * self.diode_is))
+
+    def branch_voltage(self, x_ground, p, m):
+        """voltage between index arrays p and m, x_ground has 0 appended for ground"""
+        return x_ground[p] - x_ground[m]
+
+    def source_values(self, t):
+        offset, amplitude, frequency = self.source_params.T
+        return offset + amplitude * np.sin(2 * pi * frequency * t)
+
+
+def _stamp_conductance(G, p, m, g):
+    """Add conductance g between rows/columns p and m, scalars or index arrays"""
+    np.add.at(G, (p, p), g); np.add.at(G, (m, m), g)
+    np.add.at(G, (p, m), -g); np.add.at(G, (m, p), -g)
+
+
+def _stamp_current(b, p, m, i):
+    """Current i flowing from node p through the element to node m"""
+    np.add.at(b, p, -i); np.add.at(b, m, i)
+
+
+class DenseSystem:
+    """Linear system G.x = b of one Newton-Raphson iteration in dense numpy arrays
+    stamps: _Stamps of the circuit"""
+    def __init__(self, stamps):
+        self.stamps = stamps
+        self.stats = {"factorizations": 0}
+
+    def load_step(self, t, geq, ieq):
+        """Parts of G and b that are constant during the iterations of time point t:
+        linear elements, capacitor companion models with geq and ieq, source voltages"""
+        stamps = self.stamps
+        self.G_step = stamps.G_linear.copy()
+        self.b_step = np.zeros(stamps.size + 1)
+        _stamp_conductance(self.G_step, stamps.cap_p, stamps.cap_m, geq)
+        _stamp_current(self.b_step, stamps.cap_p, stamps.cap_m, -ieq)
+        self.b_step[stamps.source_rows] = stamps.source_values(t)
+
+    def solve(self, g_d, i_eq):
+        """Solution x with the diodes replaced by conductances g_d in parallel with currents i_eq"""
+        stamps = self.stamps
+        size = stamps.size
+        G = self.G_step.copy(); b = self.b_step.copy()
+        _stamp_conductance(G, stamps.diode_a, stamps.diode_k, g_d)
+        _stamp_current(b, stamps.diode_a, stamps.diode_k, i_eq)
+        self.stats["factorizations"] += 1
+        return np.linalg.solve(G[:size, :size], b[:size])
+
+
+def _newton(system, stamps, t, x_guess, vd_guess, geq, ieq, abstol, reltol, vntol, itl):
+    """Newton-Raphson at one time point
+    system: DenseSystem or an object with the same methods
+    geq, ieq: companion conductances and currents of the capacitors
+    returns solution x, junction voltages of the diodes, number of iterations, converged"""
+    size = stamps.size
+    x = x_guess.copy()
+    vd = vd_guess.copy()
+    system.load_step(t, geq, ieq)
+    for iter_ in range(1, itl + 1):
+        with np.errstate(over="ignore"):
+            e = np.exp(vd / stamps.diode_vt)
+        i_d = stamps.diode_is * (e - 1)
+        g_d = stamps.diode_is / stamps.diode_vt * e
+        x_new = system.solve(g_d, i_d - g_d * vd)
+        x_ground = np.append(x_new, 0.0)
+        vd_new = pnjlim(stamps.branch_voltage(x_ground, stamps.diode_a, stamps.diode_k),
+                        vd, stamps.diode_vt, stamps.diode_vcrit)
+        limited = not np.allclose(vd_new, stamps.branch_voltage(x_ground, stamps.diode_a, stamps.diode_k))
+        tol = reltol * np.maximum(np.abs(x_new), np.abs(x)) + np.where(np.arange(size) < size - len(stamps.source_rows), vntol, abstol)
+        converged = not limited and np.all(np.abs(x_new - x) <= tol)
+        x = x_new; vd = vd_new
+        if converged and iter_ > 1:
+            return x, vd, iter_, True
+    return x, vd, itl, False
+
+
+def transient(circuit, t_stop, t_step, t_max=None, t_start=0.0, ic=None, reltol=1e-3, abstol=1e-12, vntol=1e-6,
+              chgtol=1e-14, trtol=7, itl1=100, itl4=10, gmin=1e-12, events=None, system=DenseSystem,
+              sink=None):
+    """
+    Transient simulation starting from all voltages and currents zero (UIC)
+    or from the initial node voltages in ic
+    circuit: Circuit
+    t_stop: end time of the simulation in s
+    t_step: suggested step, used for the first step
+    t_max: max. step size, default t_step
+    t_start: start time of the simulation in s
+    ic: optional dict of initial node voltages, e.g. {"vp": 320.0}, like .ic in SPICE
+    reltol, abstol, vntol, chgtol, trtol, itl1, itl4, gmin: tolerances with the meaning and default of SPICE,
+    itl1 is the max. number of Newton-Raphson iterations of the first step, itl4 of the other steps
+    events: optional list of Event, event functions g(t, x) of the solution vector x
+    system: class of the linear system, DenseSystem or SparseSystem of spice_netlist_mna.py
+    sink: optional WaveformWriter of waveform_writer_memmap.py, the waveforms are written to its file
+          instead of kept in memory, the result has views of the memory-mapped file
+    returns TransientResult
+    """
+    stamps = _Stamps(circuit, gmin)
+    linear_system = system(stamps)
+    size = stamps.size
+    names = [f"v({name})" for name in circuit.nodes] + [f"i({s[0]})" for s in circuit.sources]
+    t_max = t_step if t_max is None else t_max
+    h_min = (t_stop - t_start) * 1e-12
+    if sink is None:
+        waves = _Waveforms(size)
+    else:
+        waves = sink
+        sink.begin(names)
+    x = np.zeros(size)
+    for node, value in (ic or {}).items():
+        x[circuit.nodes.index(node)] = value
+    vd = np.minimum(stamps.branch_voltage(np.append(x, 0.0), stamps.diode_a, stamps.diode_k), stamps.diode_vcrit)
+    i_cap = np.zeros(len(stamps.cap_c))
+    # accepted time points and capacitor voltages
+    history = [(t_start, stamps.branch_voltage(np.append(x, 0.0), stamps.cap_p, stamps.cap_m))]
+    waves.append(t_start, x)
+    points = [(t_start, x)] # last accepted solutions for the dense interpolant of events
+    found_events = []
+    t_break = None; break_event = None # time and event the next step has to end on
+    t = t_start
+    h = t_step / 10
+    first = True
+    stats = {"accepted": 0, "rejected_lte": 0, "rejected_newton": 0, "newton_iterations": 0}
+    while t_stop - t > h_min:
+        h = min(h, t_max, t_stop - t)
+        to_break = t_break is not None and h >= t_break - t
+        if to_break:
+            h = t_break - t
+        x_ground = np.append(x, 0.0)
+        v_cap = stamps.branch_voltage(x_ground, stamps.cap_p, stamps.cap_m)
+        if first: # Backward Euler
+            geq = stamps.cap_c / h
+            ieq = geq * v_cap
+        else: # Trapezoidal rule
+            geq = 2 * stamps.cap_c / h
+            ieq = geq * v_cap + i_cap
+        x_new, vd_new, iters, converged = _newton(linear_system, stamps, t + h, x, vd, geq, ieq, abstol, reltol, vntol,
+                                                  itl1 if first else itl4)
+        stats["newton_iterations"] += iters
+        if not converged:
+            stats["rejected_newton"] += 1
+            h /= 2
+            if h < h_min:
+                raise RuntimeError(f"time step too small at t = {t}s, Newton-Raphson does not converge")
+            continue
+        v_cap_new = stamps.branch_voltage(np.append(x_new, 0.0), stamps.cap_p, stamps.cap_m)
+        i_cap_new = geq * v_cap_new - ieq
+        h_new = 2 * h
+        if len(history) >= 3 and len(i_cap):
+            (t0, v0), (t1, v1), (t2, v2) = history[-3:]
+            t3 = t + h
+            dd1 = [(v1 - v0) / (t1 - t0), (v2 - v1) / (t2 - t1), (v_cap_new - v2) / (t3 - t2)]
+            dd2 = [(dd1[1] - dd1[0]) / (t2 - t0), (dd1[2] - dd1[1]) / (t3 - t1)]
+            dd3 = (dd2[1] - dd2[0]) / (t3 - t0)
+            i_error = stamps.cap_c * h**2 / 2 * np.abs(dd3) # LTE of charge / h
+            q_max = stamps.cap_c * np.maximum(np.abs(v_cap_new), np.abs(v2))
+            tol = np.maximum(reltol * np.maximum(np.abs(i_cap_new), np.abs(i_cap)) + abstol,
+                             np.maximum(reltol * q_max, chgtol) / h)
+            with np.errstate(over="ignore", divide="ignore"):
+                ratio = np.min(trtol * tol / i_error)
+            h_new = h * min(2.0, sqrt(ratio))
+            if h_new < 0.9 * h:
+                stats["rejected_lte"] += 1
+                h = h_new
+                if h < h_min:
+                    raise RuntimeError(f"time step too small at t = {t}s, truncation error too large")
+                continue
+        t_new = t_break if to_break else t + h
+        if events: # the event the previous step ended on is not checked again in the next step
+            check = [e for e in events if e is not break_event]
+            found = locate_events(check, points[-2:] + [(t_new, x_new)])
+            stopping = [item for item in found if item[1].terminal or item[1].restart]
+            if stopping and t_new - stopping[0][0] > h_min: # repeat the step to end on the event
+                t_break, break_event = stopping[0][:2]
+                h = t_break - t
+                continue
+            found_events.extend((event.name, t_event) for t_event, event, crossing in found
+                                if not (event.terminal or event.restart))
+            if stopping: # event at the end of the step
+                to_break = True; break_event = stopping[0][1]
+            elif not to_break:
+                break_event = None
+        t = t_new
+        x = x_new; vd = vd_new; i_cap = i_cap_new
+        history = history[-2:] + [(t, v_cap_new)]
+        points = points[-2:] + [(t, x)]
+        waves.append(t, x)
+        stats["accepted"] += 1
+        first = False
+        h = h_new
+        if to_break:
+            found_events.append((break_event.name, t))
+            if break_event.terminal:
+                break
+            # restart: Backward Euler and a small step, no interpolation over the event
+            first = True
+            history = [(t, v_cap_new)]
+            points = [(t, x)]
+            h = min(h, t_step / 10)
+            t_break = None
+    stats.update(linear_system.stats)
+    time, data = waves.arrays()
+    return TransientResult(time, data, names, stats, found_events)
+
+
+def diode_event(circuit, name, level=0.6, direction=0, terminal=False, restart=False, event_name=None):
+    """Event of the junction voltage of a diode crossing level
+    circuit: Circuit
+    name: name of the diode
+    level: junction voltage in V
+    direction: +1 rising (turn-on), -1 falling (turn-off), 0 both
+    terminal, restart: see Event
+    event_name: name of the event, default name of the diode
+    returns Event"""
+    anode, cathode = [(a, k) for n, a, k, model in circuit.diodes if n == name][0]
+
+    def junction_voltage(t, x):
+        return (x[anode] if anode >= 0 else 0.0) - (x[cathode] if cathode >= 0 else 0.0) - level
+
+    return Event(junction_voltage, name if event_name is None else event_name, direction, terminal, restart)
+
+
+def rectifier_circuit(amplitude=325.0, f_mains=50.0, rs_source=1.0, C=220e-6, R=5e3, model=None):
+    """Bridge rectifier of rectifier_capacitor_ripple.sp as Circuit
+    amplitude, f_mains: mains voltage amplitude in V and frequency in Hz
+    rs_source: resistance in series with the mains in Ohm
+    C, R: smoothing capacitor in F and load resistance in Ohm
+    model: DiodeModel, default d1n4007"""
+    model = d1n4007 if model is None else model
+    circuit = Circuit("Bridge rectifier with smoothing capacitor")
+    circuit.add_sine_source("V1", "mains1", "1", 0.0, amplitude, f_mains)
+    circuit.add_resistor("Rs", "1", "mains2", rs_source)
+    circuit.add_diode("D1", "mains1", "vp", model)
+    circuit.add_diode("D2", "0", "mains1", model)
+    circuit.add_diode("D3", "mains2", "vp", model)
+    circuit.add_diode("D4", "0", "mains2", model)
+    circuit.add_capacitor("C1", "vp", "0", C)
+    circuit.add_resistor("R1", "vp", "0", R)
+    return circuit
+
+
+Vt = 1.380649e-23 * 300.15 / 1.602176634e-19 # V thermal voltage k.T/q at 27°C
+
+# .model d1n4007 of rectifier_capacitor_ripple.sp, junction and diffusion capacitance
+# (cjo, vj, m, fc, tt) and breakdown (bv, ibv) are not part of this model
+d1n4007 = DiodeModel(is_=1.09774e-8, n=1.78309, rs=0.0414388)
+
+
+if __name__ == "__main__":
+    import time
+
+    t_stop = 150e-3 # s
+    t_step = 0.1e-3 # s
+    circuit = rectifier_circuit()
+    print("Transient simulation of bridge rectifier with smoothing capacitor")
+    print("-----------------------------------------------------------------")
+    print(f"Circuit of rectifier_capacitor_ripple.sp, .tran {t_step}s {t_stop}s UIC")
+    print(f"Diode d1n4007: is = {d1n4007.is_}A, n = {d1n4007.n}, rs = {d1n4007.rs}Ohm")
+    t_start = time.perf_counter()
+    result = transient(circuit, t_stop, t_step)
+    t_end = time.perf_counter()
+    print(f"\n{len(result.time)} time points in {t_end - t_start:.2f}s, {result.stats}")
+    vp = result.v("vp")
+    last_period = result.time >= t_stop - 20e-3
+    v_max = np.max(vp[last_period]); v_min = np.min(vp[last_period])
+    print(f"Last period of mains: Vmax = {v_max:.3f}V, Vmin = {v_min:.3f}V, ripple {v_max - v_min:.3f}Vpp")
+    print("\nt (ms)   |v(vp) (V) |v(mains1)-v(mains2) (V)")
+    for t_print in np.arange(0, t_stop + 1e-9, 10e-3):
+        k = np.argmin(np.abs(result.time - t_print))
+        print(f"{1e3 * result.time[k]:>9.3f}|{vp[k]:>10.3f}|{result.v('mains1')[k] - result.v('mains2')[k]:>10.3f}")
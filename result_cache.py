@@ -0,0 +1,308 @@
+# Persistent cache of solver and integrator results in a SQLite database
+# Jobs which solve the same problems again after a restart, the friction factor of the
+# Colebrook equation, the ripple voltage of the rectifier or an integral with the same
+# parameters, get the stored result instead of iterating again.
+#
+# The key of a result is the SHA-256 hash of:
+#   - the method: the compiled code of the solver or integrator
+#   - the function to solve or integrate: its compiled code (which only changes with its source),
+#     default values, closure variables and the global variables it uses, such as the
+#     parameters Re, D and eps of the Colebrook equation.
+#     An expression string as used by eval_fun() in numerical_methods_incremental_search_false_pos_3.py
+#     is part of the key as text.
+#   - all other arguments by name, with their default values: interval, tolerance, max. iterations, ...
+#     numpy arrays by data type, shape and hash of their data
+#
+# Arguments named verbose only print and are not part of the key. Results are stored with pickle,
+# only open cache files written by your own jobs.
+#
+# The cache is bounded by a number of entries and a number of bytes,
+# the least recently used results are evicted first. Hits, misses and evictions are
+# counted in the database, so they are kept over restarts.
+
+import functools
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+import types
+
+from metrics_registry import metrics
+
+
+class ResultCache:
+    """
+    Persistent least recently used cache of results of solvers and integrators
+    path: SQLite database file, ":memory:" for a cache which is not kept
+    max_entries: maximum number of results in the cache
+    max_bytes: maximum total size of the stored results in bytes
+    """
+    def __init__(self, path="numerical_methods_cache.sqlite", max_entries=10000, max_bytes=64 * 2**20):
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("max_entries and max_bytes must be at least 1")
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL") # readers in other processes do not block
+        self._db.executescript(schema)
+
+    def key(self, function, *args, **kwargs):
+        """Key of the result of function(*args, **kwargs), hexadecimal SHA-256 hash"""
+        import inspect # only imported when the cache is used
+        arguments = inspect.signature(function).bind(*args, **kwargs)
+        arguments.apply_defaults()
+        content = {"method": fingerprint(function, with_globals=False), "version": key_version,
+                   "arguments": {name: _canonical(value, set()) for name, value in arguments.arguments.items()
+                                 if name not in ignored_arguments}}
+        return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key):
+        """Return (True, result) for a stored key, else (False, None)"""
+        with self._lock:
+            row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._count("misses")
+                return False, None
+            self._db.execute("UPDATE results SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+            self._count("hits")
+        return True, pickle.loads(row[0])
+
+    def put(self, key, result, method=""):
+        """Store result under key, evict the least recently used results when the cache is full"""
+        value = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(value) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, 0)",
+                                 (key, method, value, len(value), now, now))
+                entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+                evicted = 0
+                while entries > self.max_entries or size > self.max_bytes:
+                    old_key, old_size = self._db.execute("SELECT key, size FROM results WHERE key != ? "
+                                                         "ORDER BY last_used LIMIT 1", (key,)).fetchone()
+                    self._db.execute("DELETE FROM results WHERE key = ?", (old_key,))
+                    entries -= 1; size -= old_size; evicted += 1
+                if evicted:
+                    self._count("evictions", evicted)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def call(self, function, *args, **kwargs):
+        """Result of function(*args, **kwargs), from the cache or computed and stored"""
+        key = self.key(function, *args, **kwargs)
+        method = getattr(function, "__name__", type(function).__name__)
+        found, result = self.get(key)
+        metrics.inc("cache_hits_total" if found else "cache_misses_total", method=method)
+        if not found:
+            result = function(*args, **kwargs)
+            self.put(key, result, method)
+        return result
+
+    def wrap(self, function):
+        """function with its results cached, same arguments as function"""
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            return self.call(function, *args, **kwargs)
+        return wrapper
+
+    def stats(self):
+        """Counters of the cache as a dictionary, hits, misses and evictions since the last clear()"""
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            counters = dict(self._db.execute("SELECT name, value FROM counters").fetchall())
+        hits = counters.get("hits", 0); misses = counters.get("misses", 0)
+        return {"max_entries": self.max_entries, "max_bytes": self.max_bytes, "entries": entries, "bytes": size,
+                "hits": hits, "misses": misses, "evictions": counters.get("evictions", 0),
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0}
+
+    def clear(self):
+        """Remove all results and reset the counters"""
+        with self._lock:
+            self._db.execute("DELETE FROM results")
+            self._db.execute("DELETE FROM counters")
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _count(self, name, value=1):
+        self._db.execute("INSERT INTO counters VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + ?",
+                         (name, value, value))
+
+
+def fingerprint(function, with_globals=True):
+    """
+    Stable description of a function for the key of a result, JSON serializable
+    function: Python function, functools.partial, builtin function or numpy ufunc
+    with_globals: include the global variables and functions the function uses
+    """
+    return _function(function, set(), with_globals)
+
+
+def _function(function, seen, with_globals=True):
+    while hasattr(function, "__wrapped__"): # decorated, for example by @instrumented
+        function = function.__wrapped__
+    if not isinstance(function, types.FunctionType):
+        return _canonical(function, seen)
+    if id(function) in seen: # recursive function
+        return ["recursive", function.__qualname__]
+    seen.add(id(function))
+    code = function.__code__
+    description = ["function", _code(code), _canonical(function.__defaults__, seen),
+                   _canonical(function.__kwdefaults__, seen),
+                   [_canonical(cell.cell_contents, seen) for cell in function.__closure__ or ()]]
+    if with_globals:
+        description.append({name: _canonical(function.__globals__[name], seen)
+                            for name in sorted(_global_names(code)) if name in function.__globals__})
+    return description
+
+
+def _code(code):
+    """Compiled code without line numbers and file name, so moving a function does not change it"""
+    consts = [_constant(c) for c in code.co_consts]
+    return [code.co_code.hex(), consts, list(code.co_names), code.co_argcount, code.co_kwonlyargcount]
+
+
+def _constant(value):
+    """Description of a constant of compiled code, frozensets in sorted order"""
+    if isinstance(value, types.CodeType):
+        return _code(value)
+    if isinstance(value, tuple):
+        return ["tuple", [_constant(item) for item in value]]
+    if isinstance(value, frozenset): # x in {1, 2, 3} is compiled to a frozenset
+        return ["frozenset", _sorted([_constant(item) for item in value])]
+    return repr(value)
+
+
+def _sorted(items):
+    """Items in a fixed order, the order of a set depends on PYTHONHASHSEED"""
+    return sorted(items, key=lambda item: json.dumps(item, sort_keys=True))
+
+
+def _global_names(code):
+    """Names used by code and the functions, lambdas and comprehensions defined in it"""
+    names = set(code.co_names)
+    for c in code.co_consts:
+        if isinstance(c, types.CodeType):
+            names |= _global_names(c)
+    return names
+
+
+def _canonical(value, seen):
+    """JSON serializable description of an argument for the key of a result"""
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, (float, complex)):
+        return [type(value).__name__, repr(value)] # exact, also nan and inf
+    if isinstance(value, (tuple, list)):
+        return [type(value).__name__, [_canonical(item, seen) for item in value]]
+    if isinstance(value, dict):
+        return ["dict", _sorted([_canonical(k, seen), _canonical(v, seen)] for k, v in value.items())]
+    if isinstance(value, (set, frozenset)):
+        return [type(value).__name__, _sorted([_canonical(item, seen) for item in value])]
+    if hasattr(value, "dtype") and hasattr(value, "tobytes"): # numpy array or scalar, numpy is not imported
+        return ["array", value.dtype.str, list(getattr(value, "shape", ())), hashlib.sha256(value.tobytes()).hexdigest()]
+    if isinstance(value, functools.partial):
+        return ["partial", _function(value.func, seen), _canonical(value.args, seen), _canonical(value.keywords, seen)]
+    if isinstance(value, types.FunctionType) or hasattr(value, "__wrapped__"):
+        return _function(value, seen)
+    if isinstance(value, types.ModuleType):
+        return ["module", value.__name__]
+    if isinstance(value, type):
+        return ["class", value.__module__, value.__qualname__]
+    if callable(value) and hasattr(value, "__name__") and not hasattr(value, "__dict__"): # builtin function, ufunc
+        return ["builtin", getattr(value, "__module__", None) or type(value).__name__, value.__name__]
+    text = repr(value)
+    if " at 0x" in text:
+        raise TypeError(f"no stable fingerprint for {type(value).__name__}, pass numbers, strings, arrays or functions")
+    return [type(value).__name__, text]
+
+
+# arguments which do not change the result
+ignored_arguments = ("verbose",)
+# changed when the key of the same call changes, so old results are not found
+key_version = 2
+schema = """
+CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, method TEXT, value BLOB, size INTEGER,
+                                    created REAL, last_used REAL, hits INTEGER);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER);
+"""
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    from math import *
+
+    from numerical_methods_mod_false_pos import modfalsepos
+    from numerical_methods_incremental_search_false_pos_3 import modfalsepos as modfalsepos_expression
+    from numerical_integration_romberg import romberg
+    from numerical_integration_adaptive import gauss_kronrod
+    from rectifier_capacitor_ripple_sweep import ripple_sweep
+    import numpy as np
+
+    def colebrook(f):
+        """Colebrook equation of the friction factor f of a pipe"""
+        return 1 / sqrt(f) + 2 * log10(eps / (3.7 * D) + 2.51 / (Re * sqrt(f)))
+
+    def velocity(t):
+        """velocity of the falling parachutist in m/s"""
+        return g * m / c * (1 - exp(-(c * t / m)))
+
+    D = 0.005; eps = 0.0015e-3 # m
+    g = 9.81; m = 68.1; c = 12.5
+    R = np.geomspace(500, 20e3, 200)[:, None]; C = np.geomspace(10e-6, 2200e-6, 200)[None, :]
+
+    def nightly_job(cache):
+        """The same problems every night, returns results and time in s"""
+        global Re
+        t_start = time.perf_counter()
+        results = []
+        for Re in (4e3, 1e4, 1e5, 1e6):
+            results.append(cache.call(modfalsepos, colebrook, (0.008, 0.08), 1000, 1e-10))
+        results.append(cache.call(modfalsepos_expression, "x**10 - 1", (0, 1.3), 100, 1e-10))
+        results.append(cache.call(romberg, 0, 10, 20, 1e-12, velocity))
+        results.append(cache.call(gauss_kronrod, 0, 10, velocity, es=1e-12))
+        results.append(cache.call(ripple_sweep, R, C, 230.0, 50.0, method="bisection", es=1e-10))
+        return results, time.perf_counter() - t_start
+
+    print("Persistent cache of solver and integrator results")
+    print("-------------------------------------------------")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "results.sqlite")
+        runs = []
+        for label in ("first run, empty cache", "second run", "after restart"):
+            with ResultCache(path) as cache: # a new connection as after a restart of the job
+                results, run_time = nightly_job(cache)
+                runs.append(results)
+                stats = cache.stats()
+            print(f"{label:<23}: {1e3 * run_time:7.2f}ms, {stats['entries']} entries, {stats['hits']} hits, {stats['misses']} misses")
+        same = pickle.dumps(runs[0]) == pickle.dumps(runs[2])
+        print(f"results after restart identical to the first run: {same}")
+
+        with ResultCache(path) as cache:
+            Re = 1e5
+            key = cache.key(modfalsepos, colebrook, (0.008, 0.08), 1000, 1e-10)
+            Re = 2e5
+            print(f"key changes with the global Re of colebrook(): {key != cache.key(modfalsepos, colebrook, (0.008, 0.08), 1000, 1e-10)}")
+            print(f"key changes with the tolerance: {key != cache.key(modfalsepos, colebrook, (0.008, 0.08), 1000, 1e-8)}")
+
+        with ResultCache(path, max_entries=4) as cache:
+            cache.call(modfalsepos, colebrook, (0.008, 0.08), 1000, 1e-10)
+            print(f"\nmax_entries = 4: {cache.stats()}")
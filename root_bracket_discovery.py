@@ -0,0 +1,242 @@
+# Automatic bracket discovery for the bracketing root finding methods
+# bisect(), modfalsepos(), itp(), brents() and brents_wiki() need an interval (xl, xu) where f changes sign.
+# When the initial guess is slightly off, this code finds such an interval first:
+#
+# Expansion outward from a guess x0 or an interval (xl, xu), the end point with the smallest |f| moves:
+#
+#         xl <-- factor * (xu - xl) --  xl   xu
+#   f:    +                             +    +          until f(xl) and f(xu) have different signs
+#
+# Scan inward: an interval with the same sign of f at both ends can hold an even number of roots,
+# the interval is split in 2, 4, 8, ... parts until two neighbouring points have different signs.
+#
+# The search stops after max_evals calls of f. Points outside domain (xmin, xmax) are never used.
+# A point where f raises ValueError, ZeroDivisionError or OverflowError, or returns nan,
+# is outside the domain of f: the search steps back halfway to the last valid point.
+
+from math import *
+
+from metrics_registry import instrumented
+
+
+class BracketNotFound(ValueError):
+    """No sign change found within the evaluation budget"""
+
+
+def _evaluate(f, x):
+    """f(x), None outside the domain of f"""
+    try:
+        y = f(x)
+    except (ValueError, ZeroDivisionError, OverflowError):
+        return None
+    if isinstance(y, complex) or isnan(y):
+        return None
+    return y
+
+
+def _opposite(fa, fb):
+    return fa == 0 or fb == 0 or copysign(1, fa) != copysign(1, fb)
+
+
+@instrumented
+def expand_bracket(f, interval, factor=1.6, max_evals=50, domain=(-inf, inf), points=None):
+    """
+    Expand an interval outward until f changes sign
+    f: function of one argument
+    interval: iterable with lower and upper guess (xl, xu)
+    factor: the moving end point moves factor times the width of the interval
+    max_evals: max. number of calls of f
+    domain: (xmin, xmax), the interval stays within these limits
+    points: dictionary x: f(x) of the points already evaluated, updated
+    returns interval (xl, xu) with a sign change, number of calls of f
+    """
+    xmin, xmax = domain
+    xl, xu = sorted(interval)
+    xl = max(xl, xmin); xu = min(xu, xmax)
+    if xl >= xu:
+        raise ValueError(f"interval {tuple(interval)} has no width within the domain {domain}")
+    points = {} if points is None else points
+    n_evals = 0
+    n_steps = 0 # every step counts against max_evals, also when f(x) is known already
+    def value(x):
+        nonlocal n_evals
+        if x not in points:
+            n_evals += 1
+            points[x] = _evaluate(f, x)
+        return points[x]
+    fl = value(xl); fu = value(xu)
+    # step inward until both end points are in the domain of f
+    while (fl is None or fu is None) and max(n_evals, n_steps) < max_evals and xl < xu:
+        n_steps += 1
+        if fl is None:
+            xmin = xl; xl = xl + (xu - xl) / 2; fl = value(xl)
+        if fu is None:
+            xmax = xu; xu = xu - (xu - xl) / 2; fu = value(xu)
+    if fl is None or fu is None or xl >= xu:
+        raise BracketNotFound(f"f is not defined on the interval {tuple(interval)}")
+    lower_limit = xmin; upper_limit = xmax # f is not defined beyond the limits
+    while not _opposite(fl, fu):
+        n_steps += 1
+        if n_evals >= max_evals or n_steps > max_evals:
+            raise BracketNotFound(f"no sign change in ({xl}, {xu}) after {n_evals} evaluations")
+        can_lower = xl > lower_limit; can_upper = xu < upper_limit
+        if not (can_lower or can_upper):
+            raise BracketNotFound(f"no sign change in ({xl}, {xu}), the domain limits are reached")
+        if can_lower and (abs(fl) < abs(fu) or not can_upper): # move the end point closest to zero
+            x = max(xl - factor * (xu - xl), lower_limit)
+            fx = value(x)
+            while fx is None and n_evals < max_evals and xl - x > 1e-12 * max(1.0, abs(xl)):
+                lower_limit = x # outside the domain of f, step back halfway
+                x = xl - (xl - x) / 2
+                fx = value(x)
+            if fx is None:
+                lower_limit = xl
+            else:
+                xl = x; fl = fx
+        else:
+            x = min(xu + factor * (xu - xl), upper_limit)
+            fx = value(x)
+            while fx is None and n_evals < max_evals and x - xu > 1e-12 * max(1.0, abs(xu)):
+                upper_limit = x
+                x = xu + (x - xu) / 2
+                fx = value(x)
+            if fx is None:
+                upper_limit = xu
+            else:
+                xu = x; fu = fx
+    return (xl, xu), n_evals
+
+
+@instrumented
+def scan_bracket(f, interval, max_evals=32, points=None):
+    """
+    Split an interval in 2, 4, 8, ... parts until f changes sign between two neighbouring points
+    f: function of one argument
+    interval: iterable with lower and upper bound (xl, xu)
+    max_evals: max. number of calls of f
+    points: dictionary x: f(x) of the points already evaluated, updated,
+    the points in the interval are used as the first parts
+    returns interval (xl, xu) with a sign change, number of calls of f
+    """
+    xl, xu = sorted(interval)
+    if xl == xu:
+        raise ValueError(f"interval {tuple(interval)} has no width")
+    points = {} if points is None else points
+    n_evals = 0
+    n_steps = 0 # every halving counts against max_evals, also when f(x) is known already
+    def value(x):
+        nonlocal n_evals
+        if x not in points:
+            n_evals += 1
+            points[x] = _evaluate(f, x)
+        return points[x]
+    xs = sorted({xl, xu} | {x for x in points if xl < x < xu and points[x] is not None})
+    values = [value(x) for x in xs]
+    while True:
+        for a, b, fa, fb in zip(xs, xs[1:], values, values[1:]):
+            if fa is not None and fb is not None and _opposite(fa, fb):
+                return (a, b), n_evals
+        n_steps += 1
+        if n_evals + len(xs) - 1 > max_evals or n_steps > max_evals:
+            raise BracketNotFound(f"no sign change in ({xl}, {xu}) with {len(xs)} points")
+        new_xs = [xs[0]]; new_values = [values[0]]
+        for a, b, fb in zip(xs, xs[1:], values[1:]):
+            m = a + (b - a) / 2
+            new_xs += [m, b]; new_values += [value(m), fb]
+        xs, values = new_xs, new_values
+
+
+@instrumented
+def find_bracket(f, guess, step=None, factor=1.6, max_evals=50, domain=(-inf, inf), scan_evals=8):
+    """
+    Interval where f changes sign, from a guess of the root or an interval
+    f: function of one argument
+    guess: number x0 or iterable (xl, xu)
+    step: half width of the first interval around a number x0, or around xl = xu, default 10% of |x0| or 0.1
+    factor: expansion factor of expand_bracket()
+    max_evals: max. number of calls of f
+    domain: (xmin, xmax), the interval stays within these limits
+    scan_evals: max. number of calls of f to scan an interval inward before it is expanded
+    When the expansion fails, the explored interval is scanned with the remaining calls of f,
+    a narrow region with the other sign can be passed by the expansion
+    returns interval (xl, xu) with a sign change, number of calls of f
+    raises BracketNotFound
+    """
+    if not isinstance(guess, (int, float)):
+        xl, xu = sorted(guess)
+        if xl == xu: # no width, same as a guess of the root
+            guess = xl
+    if isinstance(guess, (int, float)):
+        step = (0.1 * abs(guess) or 0.1) if step is None else step
+        interval = (max(guess - step, domain[0]), min(guess + step, domain[1]))
+    else:
+        interval = (xl, xu)
+    points = {}
+    n_evals = 0
+    if not isinstance(guess, (int, float)):
+        try:
+            return scan_bracket(f, interval, min(scan_evals, max_evals), points)
+        except BracketNotFound:
+            n_evals = len(points)
+    try:
+        bracket, n_expand = expand_bracket(f, interval, factor, max_evals - n_evals, domain, points)
+        return bracket, n_evals + n_expand
+    except BracketNotFound as error:
+        message = f"{error}, starting from {guess}"
+    valid = [x for x, y in points.items() if y is not None]
+    if len(valid) >= 2 and len(points) < max_evals:
+        try:
+            bracket, n_scan = scan_bracket(f, (min(valid), max(valid)), max_evals - len(points), points)
+            return bracket, len(points)
+        except BracketNotFound:
+            pass
+    raise BracketNotFound(message)
+
+
+@instrumented
+def solve_bracketed(method, f, guess, *args, bracket_options=None, **kwargs):
+    """
+    Find a bracket, then solve with a bracketing method
+    method: function method(f, interval, *args, **kwargs), for example bisect, modfalsepos, itp, brents_wiki
+    f: function of one argument
+    guess: number x0 or iterable (xl, xu)
+    bracket_options: dictionary of arguments of find_bracket()
+    returns result of method, bracket, number of calls of f to find the bracket
+    """
+    bracket, n_evals = find_bracket(f, guess, **(bracket_options or {}))
+    return method(f, bracket, *args, **kwargs), bracket, n_evals
+
+
+if __name__ == "__main__":
+    from numerical_methods_mod_false_pos import itp, modfalsepos
+    from brents_method_wikipedia import brents_wiki
+    from rectifier_capacitor_ripple import f as ripple
+
+    def colebrook(f):
+        """Colebrook equation of the friction factor f, Re = 13743, eps/D = 3e-4"""
+        return 1 / sqrt(f) + 2 * log10(1.5e-6 / (3.7 * 0.005) + 2.51 / (13743 * sqrt(f)))
+
+    problems = [("Colebrook", colebrook, (0.03, 0.08), {"domain": (0.0, 1.0)}),
+                ("exp(-x) - x", lambda x: exp(-x) - x, 10.0, {}),
+                ("log(x) - 3", lambda x: log(x) - 3, (0.5, 2.0), {}),
+                ("x**2 - 1", lambda x: x**2 - 1, (-2.0, 2.0), {}),
+                ("Ripple, 60Hz", lambda t: ripple(t, 5e3, 220e-6, 60), (5e-3, 7e-3), {"domain": (0.0, 1 / 60)}),
+                ("sqrt(x) - 100", lambda x: sqrt(x) - 100, 1.0, {"domain": (0.0, inf)}),
+                ("x**2 + 1", lambda x: x**2 + 1, (0.0, 1.0), {})]
+    print("Automatic bracket discovery")
+    print("---------------------------")
+    print("brents_wiki() on the initial guesses:", end=" ")
+    print(brents_wiki(colebrook, (0.03, 0.08), verbose=False))
+    print(f"\n{'f(x)':<14}|{'guess':<18}|{'bracket':<40}|evals|root (itp)")
+    for name, f, guess, options in problems:
+        try:
+            (root, iter_, ea), bracket, n_evals = solve_bracketed(itp, f, guess, 100, 1e-10, bracket_options=options)
+        except BracketNotFound as error:
+            print(f"{name:<14}|{str(guess):<18}|{error}")
+            continue
+        text = f"({bracket[0]:.6g}, {bracket[1]:.6g})"
+        print(f"{name:<14}|{str(guess):<18}|{text:<40}|{n_evals:>5}|{root:.12g}")
+
+    bracket, n_evals = find_bracket(colebrook, (0.03, 0.08), domain=(0.0, 1.0))
+    print(f"\nColebrook with brents_wiki() on {bracket}: f = {brents_wiki(colebrook, bracket, verbose=False)}")
+    print(f"Colebrook with modfalsepos() on {bracket}: f = {modfalsepos(colebrook, bracket, 100, 1e-10)[0]}")
@@ -5,11 +5,16 @@
 
 from math import *
 
-def brents(fun, interval):
+from metrics_registry import instrumented
+
+@instrumented(function="fun")
+def brents(fun, interval, verbose=True):
     """Brent's Method
        fun: function to find root of
-       interval: iterable of two x values which bracket the root"""
-    print("Brent's Method for root finding")
+       interval: iterable of two x values which bracket the root
+       verbose: print the method used in every iteration"""
+    if verbose:
+        print("Brent's Method for root finding")
     # machine epsilon for a standard 64 bit double float = 2**-52
     # Machine Epsilon describes the round-off error for a floating-point number with a certain amount of precision.
     # It is the upper bound on the relative approximated error caused due to rounding off floating numbers.
@@ -37,11 +42,13 @@ def brents(fun, interval):
         if abs(e) >= tol and abs(fc) > abs(fb): # open method
             s = fb / fc
             if a == c: # *** Secant method ****
-                print(f"{counter}: Secant method  b={b:.12}")
+                if verbose:
+                    print(f"{counter}: Secant method  b={b:.12}")
                 p = 2 * m * s
                 q = 1 - s
             else: # *** inverse quadratic interpolation ***
-                print(f"{counter}: Inverse quadratic interpolation  b={b:.12}")
+                if verbose:
+                    print(f"{counter}: Inverse quadratic interpolation  b={b:.12}")
                 q = fc / fa; r = fb / fa
                 p = s * ( 2 * m * q * (q - r)   -   (b - c) * (r - 1) )
                 q = (q - 1) * (r - 1) * (s - 1)
@@ -54,7 +61,8 @@ def brents(fun, interval):
             else:
                 d = m; e = m
         else: # *** Bisection ***
-            print(f"{counter}: Bisection  b={b:.12}")
+            if verbose:
+                print(f"{counter}: Bisection  b={b:.12}")
             d = m; e = m
         c = b; fc = fb
         if abs(d) > tol:
@@ -85,20 +93,17 @@ Re = rho*V*D/mu # Reynolds number
 interval = (0.008, 0.08)
 
 
-
-print("Case Study 8.4 Pipe Friction")
-print("----------------------------")
-print("Finding friction factor f using Colebrook equation:")
-print("-1/sqrt(f) = 2 * log10( eps/(3.7*D) + 2.51/(Re*sqrt(f)) )")
-print("By appying Brent's method for root finding on:")
-print("1/sqrt(f) + 2 * log10( eps/(3.7*D) + 2.51/(Re*sqrt(f)) ) = 0")
-print(f"Reynolds number: Re={Re}")
-print(f"Roughness: epsilon={eps}m")
-print(f"Diameter: D={D}m\n")
-friction_factor = brents(Colebrook_eq, interval)
-print("\nResult for friction factor f:")
-print(f"f = {friction_factor}")
-print(f"Residual: Colebrook equation(f) = {Colebrook_eq(friction_factor)}")
-        
-
-    
+if __name__ == "__main__":
+    print("Case Study 8.4 Pipe Friction")
+    print("----------------------------")
+    print("Finding friction factor f using Colebrook equation:")
+    print("-1/sqrt(f) = 2 * log10( eps/(3.7*D) + 2.51/(Re*sqrt(f)) )")
+    print("By appying Brent's method for root finding on:")
+    print("1/sqrt(f) + 2 * log10( eps/(3.7*D) + 2.51/(Re*sqrt(f)) ) = 0")
+    print(f"Reynolds number: Re={Re}")
+    print(f"Roughness: epsilon={eps}m")
+    print(f"Diameter: D={D}m\n")
+    friction_factor = brents(Colebrook_eq, interval)
+    print("\nResult for friction factor f:")
+    print(f"f = {friction_factor}")
+    print(f"Residual: Colebrook equation(f) = {Colebrook_eq(friction_factor)}")
@@ -0,0 +1,467 @@
+# SPICE netlist reader and sparse modified nodal analysis (MNA)
+# runs the .tran analysis of netlists like rectifier_capacitor_ripple.sp in-process,
+# with the transient simulation of rectifier_transient_simulation.py
+#
+# Netlist subset:
+#   first line          title
+#   * ...               comment line, text after ; is a comment
+#   + ...               continuation of the previous line
+#   Rname n1 n2 value
+#   Cname n1 n2 value [IC=v]
+#   Dname anode cathode model
+#   Vname n+ n- [DC] value  or  Vname n+ n- SIN(vo va freq)
+#   .model name D(is=.. n=.. rs=..)
+#   .tran tstep tstop [tstart [tmax]] [UIC]
+#   .control ... .endc  skipped,  .end  end of the netlist
+# Values with the scale factors of SPICE: f p n u m k meg g t mil, letters after them are ignored (220uF, 5k)
+#
+# Sparse LU decomposition of G:  P.G.Q = L.U
+# G is stored as a flat array of the values of the entries that any element stamps on (the pattern).
+# The pattern does not change during a simulation, only the values of the entries change.
+#
+#   ordering (symbolic): pivots chosen with the Markowitz criterion, pivot (i, j) with the lowest
+#                        (entries in row i - 1) * (entries in column j - 1) to keep the fill-in small,
+#                        only pivots with |Gij| >= pivtol * max |G column j| for stability
+#   factorization (numeric): the elimination with the order, generated as Python code with one statement
+#                        per operation on the flat list of values, the positions of all updates and of
+#                        the fill-in are fixed by the ordering: v[12] -= f * v[4]
+#
+# As in SPICE the order is reused for every Newton-Raphson iteration and every time step,
+# it is computed again only when a pivot becomes too small. The orders are kept per pattern,
+# netlist variants with other values but the same elements reuse the order of the first variant.
+#
+# This code uses the numpy library
+
+from math import *
+import re
+
+import numpy as np
+
+from rectifier_transient_simulation import (Circuit, DiodeModel, DenseSystem, TransientResult,
+                                            _Stamps, _newton, _stamp_current, transient)
+
+
+def parse_value(text):
+    """Number with optional SPICE scale factor, e.g. "220uF" -> 0.00022, "5k" -> 5000.0"""
+    match = re.fullmatch(r"([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)([a-zA-Z]*)", text)
+    if match is None:
+        raise ValueError(f"not a number: {text}")
+    number, suffix = float(match.group(1)), match.group(2).lower()
+    if suffix.startswith("meg"):
+        return number * 1e6
+    if suffix.startswith("mil"):
+        return number * 25.4e-6
+    return number * scale_factors.get(suffix[:1], 1.0)
+
+
+class Netlist:
+    """Parsed netlist
+    title: first line of the netlist
+    elements: list of tuples (type letter, name, nodes, values)
+    models: dict of model name to dict of parameters
+    tran: dict of t_step, t_stop, t_start, t_max and uic of the .tran card, None without .tran
+    ic: dict of initial node voltages from IC= of capacitors to ground
+    ignored: list of messages about parts of the netlist that are not simulated"""
+    def __init__(self, title):
+        self.title = title
+        self.elements = []
+        self.models = {}
+        self.tran = None
+        self.ic = {}
+        self.ignored = []
+
+    def circuit(self, overrides=None):
+        """
+        Circuit of the netlist with optional changed values
+        overrides: dict, keys are element names with the new value for R and C,
+                   a tuple (offset, amplitude, frequency) for V, a model name for D,
+                   or "model.parameter" with the new value of a model parameter, e.g. {"C1": 100e-6, "d1n4007.rs": 0.1}
+        returns Circuit
+        """
+        overrides = {key.lower(): value for key, value in (overrides or {}).items()}
+        models = {}
+        for name, params in self.models.items():
+            params = {key: overrides.get(f"{name}.{key}", value) for key, value in params.items()}
+            models[name] = DiodeModel(params.get("is", 1e-14), params.get("n", 1.0), params.get("rs", 0.0))
+        circuit = Circuit(self.title)
+        for letter, name, nodes, values in self.elements:
+            values = overrides.get(name.lower(), values)
+            if letter == "r":
+                circuit.add_resistor(name, *nodes, values)
+            elif letter == "c":
+                circuit.add_capacitor(name, *nodes, values)
+            elif letter == "d":
+                if values.lower() not in models:
+                    raise ValueError(f"model {values} of {name} not found")
+                circuit.add_diode(name, *nodes, models[values.lower()])
+            else:
+                circuit.add_sine_source(name, *nodes, *values)
+        return circuit
+
+
+def _lines(text):
+    """Lines of a netlist without comments, continuation lines joined, .control blocks removed"""
+    lines = []
+    control = False
+    for line in text.splitlines()[1:]:
+        line = line.split(";")[0].strip()
+        if not line or line.startswith("*"):
+            continue
+        if control:
+            control = not line.lower().startswith(".endc")
+        elif line.lower().startswith(".control"):
+            control = True
+        elif line.startswith("+"):
+            if not lines:
+                raise ValueError(f"continuation line without a line before it: {line}")
+            lines[-1] += " " + line[1:]
+        else:
+            lines.append(line)
+    return lines
+
+
+def parse_netlist(text):
+    """
+    Parse the text of a netlist
+    text: netlist as a string, the first line is the title
+    returns Netlist
+    """
+    netlist = Netlist(text.splitlines()[0].lstrip("*").strip() if text.strip() else "")
+    for line in _lines(text):
+        tokens = line.replace("(", " ").replace(")", " ").replace(",", " ").replace("=", " ").split()
+        card = tokens[0].lower()
+        if card == ".end":
+            break
+        if card == ".model":
+            name, kind = tokens[1].lower(), tokens[2].lower()
+            if kind != "d":
+                raise ValueError(f"unsupported model type {kind} of model {name}")
+            params = dict(zip((t.lower() for t in tokens[3::2]), tokens[4::2]))
+            netlist.models[name] = {key: parse_value(params[key]) for key in ("is", "n", "rs") if key in params}
+            other = [key for key in params if key not in ("is", "n", "rs")]
+            if other:
+                netlist.ignored.append(f"model {name}: parameters {' '.join(other)} not used")
+        elif card == ".tran":
+            uic = "uic" in (t.lower() for t in tokens)
+            values = [parse_value(t) for t in tokens[1:] if t.lower() != "uic"]
+            t_step, t_stop = values[:2]
+            netlist.tran = {"t_step": t_step, "t_stop": t_stop, "t_start": values[2] if len(values) > 2 else 0.0,
+                            "t_max": values[3] if len(values) > 3 else None, "uic": uic}
+        elif card.startswith("."):
+            netlist.ignored.append(f"card {tokens[0]} not used")
+        elif card[0] in "rc":
+            nodes = [t.lower() for t in tokens[1:3]]
+            netlist.elements.append((card[0], tokens[0], nodes, parse_value(tokens[3])))
+            extra = [t.lower() for t in tokens[4:]]
+            if card[0] == "c" and extra[:1] == ["ic"]:
+                if nodes[1] != "0":
+                    netlist.ignored.append(f"{tokens[0]}: IC only used for capacitors to ground")
+                else:
+                    netlist.ic[nodes[0]] = parse_value(extra[1])
+            elif extra:
+                netlist.ignored.append(f"{tokens[0]}: {' '.join(extra)} not used")
+        elif card[0] == "d":
+            netlist.elements.append(("d", tokens[0], [t.lower() for t in tokens[1:3]], tokens[3].lower()))
+            if tokens[4:]:
+                netlist.ignored.append(f"{tokens[0]}: {' '.join(tokens[4:])} not used")
+        elif card[0] == "v":
+            nodes = [t.lower() for t in tokens[1:3]]
+            params = [t.lower() for t in tokens[3:]]
+            if "sin" in params:
+                sine = [parse_value(t) for t in params[params.index("sin") + 1:]]
+                if any(sine[3:]):
+                    raise ValueError(f"{tokens[0]}: delay, damping and phase of SIN are not supported")
+                offset, amplitude, frequency = (sine + [0.0, 0.0, 0.0])[:3]
+            else:
+                params = params[1:] if params[:1] == ["dc"] else params
+                offset, amplitude, frequency = parse_value(params[0]) if params else 0.0, 0.0, 0.0
+                if params[1:]:
+                    netlist.ignored.append(f"{tokens[0]}: {' '.join(params[1:])} not used")
+            netlist.elements.append(("v", tokens[0], nodes, (offset, amplitude, frequency)))
+        else:
+            raise ValueError(f"unsupported element {tokens[0]}")
+    return netlist
+
+
+def read_netlist(filename):
+    """Parse the netlist in file filename, returns Netlist"""
+    with open(filename) as file:
+        return parse_netlist(file.read())
+
+
+def _markowitz(n, entries, pivtol, search=3):
+    """
+    Pivot order of the sparse matrix with values entries, Markowitz criterion with threshold pivtol
+    n: size of the matrix
+    entries: dict of (row, column) to value, the pattern of the matrix
+    pivtol: relative threshold of the pivots
+    search: number of further columns searched after the first column with a candidate pivot
+    returns list of tuples (pivot row, pivot column, rows below the pivot, columns right of the pivot)
+    """
+    rows = [{} for i in range(n)]
+    cols = [set() for j in range(n)]
+    for (i, j), value in entries.items():
+        rows[i][j] = value; cols[j].add(i)
+    active = set(range(n)) # columns not eliminated yet
+    order = []
+    for step in range(n):
+        best = None # (cost, -|value|, row, column)
+        searched = 0
+        for j in sorted(active, key=lambda j: len(cols[j])): # search the columns with the fewest entries first
+            if best is not None:
+                searched += 1
+                if best[0] == 0 or searched >= search:
+                    break
+            col_max = max((abs(rows[i][j]) for i in cols[j]), default=0.0)
+            for i in cols[j]:
+                value = abs(rows[i][j])
+                if value > 0 and value >= pivtol * col_max:
+                    candidate = ((len(rows[i]) - 1) * (len(cols[j]) - 1), -value, i, j)
+                    best = candidate if best is None or candidate < best else best
+        if best is None:
+            raise np.linalg.LinAlgError("singular matrix")
+        cost, value, i, j = best
+        lower = sorted(cols[j] - {i})
+        upper = sorted(c for c in rows[i] if c != j)
+        order.append((i, j, lower, upper))
+        pivot = rows[i][j]
+        for r in lower: # elimination, fill-in where rows[r] has no entry yet
+            factor = rows[r].pop(j) / pivot
+            for c in upper:
+                rows[r][c] = rows[r].get(c, 0.0) - factor * rows[i][c]
+                cols[c].add(r)
+        for c in rows[i]:
+            cols[c].discard(i)
+        active.discard(j)
+        rows[i] = {}
+    return order
+
+
+class SparseSystem:
+    """Linear system G.x = b of one Newton-Raphson iteration with sparse LU decomposition,
+    same methods as DenseSystem of rectifier_transient_simulation.py
+    stamps: _Stamps of the circuit
+    pivtol: relative threshold of the pivots"""
+    def __init__(self, stamps, pivtol=1e-3):
+        self.stamps = stamps
+        self.pivtol = pivtol
+        self.size = size = stamps.size
+        self.stats = {"factorizations": 0, "orderings": 0}
+        # pattern: linear elements, diagonal and the entries of capacitors and diodes, ground is dropped
+        rows, cols = np.nonzero(stamps.G_linear[:size, :size])
+        pattern = set(zip(rows.tolist(), cols.tolist())) | {(i, i) for i in range(size)}
+        for p, m in [(stamps.cap_p, stamps.cap_m), (stamps.diode_a, stamps.diode_k)]:
+            for a, b in zip(p.tolist(), m.tolist()):
+                pattern |= {(r, c) for r in (a, b) for c in (a, b) if r < size and c < size}
+        self.pattern = sorted(pattern)
+        self.position = {entry: k for k, entry in enumerate(self.pattern)}
+        self.trash = len(self.pattern) # position of all entries in the row or column of ground
+        rows, cols = np.array(self.pattern).T
+        self.G_linear = np.append(stamps.G_linear[rows, cols], 0.0)
+        self.cap_pos = self._positions(stamps.cap_p, stamps.cap_m)
+        self.diode_pos = self._positions(stamps.diode_a, stamps.diode_k)
+        self.key = (size, tuple(self.pattern))
+        self.order = None
+
+    def _positions(self, p, m):
+        """Positions in the flat array of the entries pp, mm, pm and mp of two-terminal elements"""
+        position = lambda r, c: self.position.get((r, c), self.trash)
+        return np.array([[position(a, a), position(b, b), position(a, b), position(b, a)]
+                         for a, b in zip(p.tolist(), m.tolist())], dtype=int).reshape(-1, 4)
+
+    def _order(self, values):
+        """Ordering with the values of G and the code of the numeric factorization and the solution"""
+        self.stats["orderings"] += 1
+        entries = {entry: values[k] for k, entry in enumerate(self.pattern)}
+        self.order = _lu_code(_markowitz(self.size, entries, self.pivtol), self.position, self.size, self.pivtol)
+        symbolic_orders[self.key] = self.order
+
+    def load_step(self, t, geq, ieq):
+        """Parts of G and b that are constant during the iterations of time point t"""
+        stamps = self.stamps
+        self.G_step = self.G_linear.copy()
+        self._stamp(self.G_step, self.cap_pos, geq)
+        self.b_step = np.zeros(self.size + 1)
+        _stamp_current(self.b_step, stamps.cap_p, stamps.cap_m, -ieq)
+        self.b_step[stamps.source_rows] = stamps.source_values(t)
+
+    def _stamp(self, values, positions, g):
+        np.add.at(values, positions[:, 0], g); np.add.at(values, positions[:, 1], g)
+        np.add.at(values, positions[:, 2], -g); np.add.at(values, positions[:, 3], -g)
+
+    def solve(self, g_d, i_eq):
+        """Solution x with the diodes replaced by conductances g_d in parallel with currents i_eq"""
+        stamps = self.stamps
+        G = self.G_step.copy()
+        self._stamp(G, self.diode_pos, g_d)
+        b = self.b_step.copy()
+        _stamp_current(b, stamps.diode_a, stamps.diode_k, i_eq)
+        if self.order is None:
+            self.order = symbolic_orders.get(self.key)
+            if self.order is None:
+                self._order(G)
+        self.stats["factorizations"] += 1
+        factor, substitute, n_fill = self.order
+        values = G.tolist() + [0.0] * n_fill
+        if not factor(values): # pivot too small, new order with these values
+            self._order(G)
+            factor, substitute, n_fill = self.order
+            values = G.tolist() + [0.0] * n_fill
+            if not factor(values):
+                raise np.linalg.LinAlgError("singular matrix")
+        return np.array(substitute(values, b.tolist()))
+
+
+def _lu_code(order, position, size, pivtol):
+    """
+    Python functions of the numeric LU decomposition and the solution for the order,
+    one statement per operation on the flat list of values, no loops or index arrays at run time
+    order: pivot order of _markowitz()
+    position: dict of (row, column) to position in the flat list, fill-in is appended
+    size: size of the matrix
+    pivtol: relative threshold of the pivots
+    returns factor(values) -> False if a pivot is too small, substitute(values, b) -> x, number of fill-in entries
+    """
+    position = dict(position)
+    n_pattern = len(position) + 1 # with the trash position
+    def pos(r, c):
+        if (r, c) not in position: # fill-in
+            position[(r, c)] = len(position) + 1
+        return position[(r, c)]
+    factor = ["def factor(v):"]
+    forward = ["def substitute(v, b):"]
+    back = []
+    for i, j, lower, upper in order:
+        d = pos(i, j)
+        if lower:
+            factor.append(f"    if not abs(v[{d}]) >= pivtol * max(0.0, {', '.join(f'abs(v[{pos(r, j)}])' for r in lower)}): return False")
+        else:
+            factor.append(f"    if v[{d}] == 0: return False")
+        for r in lower:
+            factor.append(f"    f = v[{pos(r, j)}] = v[{pos(r, j)}] / v[{d}]")
+            factor.extend(f"    v[{pos(r, c)}] -= f * v[{pos(i, c)}]" for c in upper)
+            forward.append(f"    b[{r}] -= v[{pos(r, j)}] * b[{i}]")
+        back.append(f"    x{j} = (b[{i}]{''.join(f' - v[{pos(i, c)}] * x{c}' for c in upper)}) / v[{d}]")
+    factor.append("    return True")
+    code = factor + forward + back[::-1] + [f"    return [{', '.join(f'x{j}' for j in range(size))}]"]
+    namespace = {"pivtol": pivtol}
+    exec(compile("\n".join(code), "<sparse LU>", "exec"), namespace)
+    return namespace["factor"], namespace["substitute"], len(position) + 1 - n_pattern
+
+
+def operating_point(circuit, t=0.0, reltol=1e-3, abstol=1e-12, vntol=1e-6, itl=100, gmin=1e-12, system=SparseSystem):
+    """
+    DC operating point with the sources at time t, capacitors open
+    returns dict of node voltages
+    """
+    stamps = _Stamps(circuit, gmin)
+    x0 = np.zeros(stamps.size)
+    no_caps = np.zeros(len(stamps.cap_c))
+    x, vd, iters, converged = _newton(system(stamps), stamps, t, x0, np.zeros(len(stamps.diode_is)), no_caps, no_caps,
+                                      abstol, reltol, vntol, itl)
+    if not converged:
+        raise RuntimeError(f"operating point does not converge in {itl} iterations")
+    return dict(zip(circuit.nodes, x.tolist()))
+
+
+def run_tran(netlist, overrides=None, system=SparseSystem, **options):
+    """
+    .tran analysis of the netlist
+    netlist: Netlist
+    overrides: optional dict of changed values, see Netlist.circuit()
+    system: SparseSystem or DenseSystem
+    options: further arguments of transient(), e.g. reltol
+    Without UIC the simulation starts from the operating point, output before tstart is dropped
+    returns TransientResult
+    """
+    if netlist.tran is None:
+        raise ValueError("netlist has no .tran card")
+    tran = netlist.tran
+    circuit = netlist.circuit(overrides)
+    ic = dict(netlist.ic) if tran["uic"] else {**operating_point(circuit, system=system), **netlist.ic}
+    result = transient(circuit, tran["t_stop"], tran["t_step"], tran["t_max"], ic=ic, system=system, **options)
+    keep = result.time >= tran["t_start"]
+    return TransientResult(result.time[keep], result.data[keep], result.names, result.stats, result.events)
+
+
+def _run_variant(task):
+    """run_tran() of one variant, task: tuple (netlist, overrides, system, options)"""
+    netlist, overrides, system, options = task
+    return run_tran(netlist, overrides, system, **options)
+
+
+def tran_batch(netlist, variants, workers=1, system=SparseSystem, **options):
+    """
+    .tran analysis of many variants of the netlist
+    netlist: Netlist
+    variants: list of dicts of changed values, see Netlist.circuit()
+    workers: number of processes, 1 runs the variants in this process
+    system: SparseSystem or DenseSystem
+    options: further arguments of transient()
+    returns list of TransientResult in the order of variants
+    """
+    tasks = [(netlist, overrides, system, options) for overrides in variants]
+    if workers == 1:
+        return [_run_variant(task) for task in tasks]
+    from concurrent.futures import ProcessPoolExecutor # imported only when used
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_variant, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+
+
+scale_factors = {"f": 1e-15, "p": 1e-12, "n": 1e-9, "u": 1e-6, "m": 1e-3, "k": 1e3, "g": 1e9, "t": 1e12}
+
+# orders of the sparse LU decomposition per pattern, shared by all simulations in this process
+symbolic_orders = {}
+
+
+def rc_ladder_netlist(sections, R=10.0, C=100e-9):
+    """Netlist text of the bridge rectifier of rectifier_capacitor_ripple.sp feeding an RC ladder,
+    a larger circuit with a sparse G"""
+    lines = ["* Bridge rectifier with RC ladder", "V1 mains1 1 SIN(0 325 50)", "Rs 1 mains2 1",
+             "D1 mains1 vp d1n4007", "D2 0 mains1 d1n4007", "D3 mains2 vp d1n4007", "D4 0 mains2 d1n4007",
+             "C1 vp 0 220uF", "R1 vp 0 5k"]
+    node = "vp"
+    for k in range(1, sections + 1):
+        lines += [f"RL{k} {node} n{k} {R}", f"CL{k} n{k} 0 {C}"]
+        node = f"n{k}"
+    lines += [f"RLoad {node} 0 10k", ".model d1n4007 d is=1.09774E-008 n=1.78309 rs=0.0414388", ".tran .1ms 40ms UIC", ".end"]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import time
+
+    netlist = read_netlist("rectifier_capacitor_ripple.sp")
+    tran = netlist.tran
+    print("SPICE netlist reader and sparse modified nodal analysis")
+    print("-------------------------------------------------------")
+    print(f"rectifier_capacitor_ripple.sp: {len(netlist.elements)} elements, models {list(netlist.models)}")
+    print(f".tran {tran['t_step']}s {tran['t_stop']}s{' UIC' if tran['uic'] else ''}")
+    for message in netlist.ignored:
+        print(f"    {message}")
+
+    print("\nSolver|time (s)|ripple last period|statistics")
+    for name, system in [("dense", DenseSystem), ("sparse", SparseSystem)]:
+        t_start = time.perf_counter()
+        result = run_tran(netlist, system=system)
+        run_time = time.perf_counter() - t_start
+        last_period = result.time >= tran["t_stop"] - 20e-3
+        print(f"{name:<6}|{run_time:>8.2f}|{np.ptp(result.v('vp')[last_period]):>14.3f}Vpp|{result.stats}")
+
+    variants = [{"C1": C, "R1": R} for C in (100e-6, 220e-6, 470e-6) for R in (1e3, 5e3)]
+    t_start = time.perf_counter()
+    results = tran_batch(netlist, variants, workers=3)
+    print(f"\n{len(variants)} variants on 3 processes in {time.perf_counter() - t_start:.2f}s")
+    for overrides, result in zip(variants, results):
+        last_period = result.time >= tran["t_stop"] - 20e-3
+        print(f"    C1 = {overrides['C1'] * 1e6:>5.0f}uF, R1 = {overrides['R1']:>6.0f}Ohm: "
+              f"ripple {np.ptp(result.v('vp')[last_period]):.3f}Vpp, {result.stats['orderings']} orderings")
+
+    sections = 200
+    ladder = parse_netlist(rc_ladder_netlist(sections))
+    print(f"\nRectifier with an RC ladder of {sections} sections, .tran 0.1ms 40ms UIC")
+    for name, system in [("dense", DenseSystem), ("sparse", SparseSystem)]:
+        t_start = time.perf_counter()
+        result = run_tran(ladder, system=system)
+        print(f"{name:<6}: {time.perf_counter() - t_start:.2f}s, v(n{sections}) = {result.v(f'n{sections}')[-1]:.6f}V at 40ms")
@@ -0,0 +1,114 @@
+# Event detection for time-stepping simulations
+# using Brent's method of root_finding_brents_method.py
+#
+# An event is the time t where an event function g(t, x) of the solution x changes sign,
+# for example the voltage over a diode crossing the level where the diode starts to conduct.
+#
+# After every accepted step from t(n) to t(n+1) the signs of g at both ends are compared.
+# The event time is located with Brent's method on the dense interpolant of the step,
+# the quadratic through the last three accepted points (t, x), so the model is not evaluated again:
+#
+#                 (t - t1)(t - t2)             (t - t0)(t - t2)             (t - t0)(t - t1)
+#   x(t) = x0 . ⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯ + x1 . ⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯ + x2 . ⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯
+#                (t0 - t1)(t0 - t2)           (t1 - t0)(t1 - t2)           (t2 - t0)(t2 - t1)
+#
+# direction: +1 only rising zero crossings, -1 only falling, 0 both
+# terminal: the integration stops at the event
+# restart: the integration restarts at the event, like after a breakpoint in SPICE
+# For terminal and restart events the integrator repeats the step so it ends exactly on the event time.
+
+from root_finding_brents_method import brents
+
+
+class Event:
+    """Event function with its settings
+    function: g(t, x), the event happens where g changes sign
+    name: name of the event, default name of the function
+    direction: +1 rising, -1 falling, 0 both
+    terminal: stop the integration at the event
+    restart: restart the integration at the event"""
+    def __init__(self, function, name=None, direction=0, terminal=False, restart=False):
+        self.function = function
+        self.name = function.__name__ if name is None else name
+        self.direction = direction
+        self.terminal = terminal
+        self.restart = restart
+
+    def __call__(self, t, x):
+        return self.function(t, x)
+
+
+def dense_interpolant(points):
+    """Quadratic through the last three points (t, x), linear for two points
+    points: list of tuples (t, x), x a number or numpy array
+    returns function of t"""
+    if len(points) == 2:
+        (t0, x0), (t1, x1) = points
+        return lambda t: x0 + (x1 - x0) * (t - t0) / (t1 - t0)
+    (t0, x0), (t1, x1), (t2, x2) = points[-3:]
+    return lambda t: (x0 * (t - t1) * (t - t2) / ((t0 - t1) * (t0 - t2))
+                      + x1 * (t - t0) * (t - t2) / ((t1 - t0) * (t1 - t2))
+                      + x2 * (t - t0) * (t - t1) / ((t2 - t0) * (t2 - t1)))
+
+
+def sign_change(g0, g1, direction):
+    """Direction +1 or -1 of the zero crossing of g between g0 and g1, 0 if none or not wanted"""
+    if g0 < 0 <= g1:
+        crossing = 1
+    elif g0 > 0 >= g1:
+        crossing = -1
+    else:
+        return 0
+    return crossing if direction in (0, crossing) else 0
+
+
+def locate_events(events, points):
+    """
+    Events in the last step, located on the dense interpolant
+    events: list of Event
+    points: last accepted points (t, x), at least the start and the end of the step
+    returns list of tuples (time, Event, direction) sorted on time
+    """
+    (t0, x0), (t1, x1) = points[-2:]
+    interpolant = None
+    found = []
+    for event in events:
+        crossing = sign_change(event(t0, x0), event(t1, x1), event.direction)
+        if crossing:
+            if interpolant is None:
+                interpolant = dense_interpolant(points)
+            t_event = brents(lambda t: event(t, interpolant(t)), (t0, t1), verbose=False)
+            found.append((min(max(t_event, t0), t1), event, crossing))
+    return sorted(found, key=lambda item: item[0])
+
+
+if __name__ == "__main__":
+    import time
+
+    from rectifier_transient_simulation import rectifier_circuit, transient, diode_event
+
+    t_stop = 30e-3 # s
+    t_step = 0.1e-3 # s
+    v_on = 0.6 # V, junction voltage where a diode starts to conduct
+    circuit = rectifier_circuit()
+    events = [diode_event(circuit, "D1", v_on, 1, event_name="D1 on"), diode_event(circuit, "D1", v_on, -1, event_name="D1 off")]
+    print("Event detection in the transient simulation of the bridge rectifier")
+    print("-------------------------------------------------------------------")
+    print(f"Events: junction voltage of D1 crossing {v_on}V, rising (on) and falling (off)\n")
+
+    runs = [("steps of t_step / 20", {"t_max": t_step / 20, "events": events}),
+            ("events on interpolant", {"events": events}),
+            ("restart at events", {"events": [Event(e.function, e.name, e.direction, restart=True) for e in events]})]
+    reference = None
+    for label, options in runs:
+        t_start = time.perf_counter()
+        result = transient(circuit, t_stop, t_step, **options)
+        run_time = time.perf_counter() - t_start
+        reference = result if reference is None else reference
+        print(f"{label}: {result.stats['accepted']} steps, {run_time:.2f}s")
+        for (name, t_event), (name_ref, t_ref) in zip(result.events, reference.events):
+            print(f"    {name:<7} t = {1e3 * t_event:.6f}ms, difference with t_step / 20: {1e6 * (t_event - t_ref):>8.3f}us")
+
+    stop = Event(lambda t, x: x[circuit.nodes.index("vp")] - 300.0, "vp reaches 300V", 1, terminal=True)
+    result = transient(circuit, t_stop, t_step, events=[stop])
+    print(f"\nTerminal event: {result.events[0][0]} at t = {1e3 * result.time[-1]:.6f}ms, v(vp) = {result.v('vp')[-1]:.6f}V")
@@ -0,0 +1,269 @@
+# Streaming waveform writer to memory-mapped binary files for long simulations
+# The samples (time and signal values) are collected in a chunk in memory and
+# appended to a memory-mapped file when the chunk is full. The file grows in steps,
+# only one chunk is in memory while the simulation runs.
+#
+# The data is stored as rows of one time point:
+#
+#   t0  s1(t0)  s2(t0)  ...  sn(t0)
+#   t1  s1(t1)  s2(t1)  ...  sn(t1)
+#   ...
+#
+# so the file is a 2-D numpy array after the header, readers get views of the columns without copying.
+#
+# File formats:
+#   wave: magic bytes WAVEFORM, header length (8 bytes), JSON header with the signal names,
+#         data type and number of points, padded to a multiple of 64 bytes
+#   raw:  binary raw file of ngspice, text header and float64 data, can be loaded in ngspice
+#         with "load file.raw" and plotted
+#
+# Preview of a long waveform: the time range is split in bins, per bin the minimum
+# and the maximum value are kept, so peaks are never lost as with taking every n-th sample.
+#
+# This code uses the numpy library
+
+import json
+import time
+
+import numpy as np
+
+
+class WaveformWriter:
+    """
+    Writer of waveforms to a memory-mapped file, sink of transient() in rectifier_transient_simulation.py
+    path: file to write
+    names: names of the signals without time, or None to set them later with begin()
+    format: "wave" or "raw" (binary raw file of ngspice, always float64)
+    dtype: data type of the values in a "wave" file
+    chunk_size: number of time points collected before they are written to the file
+    title, plotname: title and plot name in the header of a "raw" file
+    """
+    def __init__(self, path, names=None, format="wave", dtype="float64", chunk_size=65536,
+                 title="", plotname="Transient Analysis"):
+        if format not in formats:
+            raise ValueError(f"unknown format {format}, use one of {formats}")
+        self.path = path
+        self.format = format
+        self.dtype = np.dtype("<f8") if format == "raw" else np.dtype(dtype).newbyteorder("<")
+        self.chunk_size = chunk_size
+        self.title = title
+        self.plotname = plotname
+        self.names = None
+        self.file = None
+        if names is not None:
+            self.begin(names)
+
+    def begin(self, names):
+        """Create the file with the header for the signals names"""
+        if self.file is not None:
+            if list(names) != self.names:
+                raise ValueError("names differ from the names of the open file")
+            return
+        self.names = list(names)
+        self.width = len(self.names) + 1
+        self.file = open(self.path, "w+b")
+        header = self._header(0)
+        self.file.write(header)
+        self.offset = len(header)
+        self.buffer = np.empty((self.chunk_size, self.width), dtype=self.dtype)
+        self.buffered = 0
+        self.length = 0 # number of points in the file
+        self.capacity = 0
+        self.map = None
+
+    def _header(self, n_points):
+        """Header of the file, the number of points has a fixed width to be updated at close()"""
+        if self.format == "raw":
+            types = ["current" if name.startswith("i(") else "voltage" for name in self.names]
+            lines = [f"Title: {self.title}", f"Date: {time.asctime()}", f"Plotname: {self.plotname}", "Flags: real",
+                     f"No. Variables: {self.width}", f"No. Points: {n_points:<20d}", "Variables:", "\t0\ttime\ttime"]
+            lines += [f"\t{k}\t{name}\t{type_}" for k, (name, type_) in enumerate(zip(self.names, types), 1)]
+            return ("\n".join(lines) + "\nBinary:\n").encode()
+        text = json.dumps({"names": self.names, "dtype": self.dtype.str, "points": 0}).encode()
+        text = text.replace(b'"points": 0', f'"points": {n_points:<20d}'.encode())
+        length = -(-(16 + len(text)) // 64) * 64 # multiple of 64 bytes
+        return magic + np.uint64(length).tobytes() + text.ljust(length - 16)
+
+    def append(self, t, x):
+        """Append one time point t with signal values x"""
+        self.buffer[self.buffered, 0] = t
+        self.buffer[self.buffered, 1:] = x
+        self.buffered += 1
+        if self.buffered == self.chunk_size:
+            self.flush()
+
+    def append_chunk(self, time, data):
+        """Append many time points, time: array of n values, data: array of n rows of signal values"""
+        self.flush()
+        rows = np.empty((len(time), self.width), dtype=self.dtype)
+        rows[:, 0] = time
+        rows[:, 1:] = data
+        self._write(rows)
+
+    def flush(self):
+        """Write the collected time points to the file"""
+        if self.buffered:
+            self._write(self.buffer[:self.buffered])
+            self.buffered = 0
+
+    def _write(self, rows):
+        if self.length + len(rows) > self.capacity: # grow the file, map it again
+            self.capacity = max(2 * self.capacity, self.length + len(rows), self.chunk_size)
+            self.map = None
+            self.file.truncate(self.offset + self.capacity * self.width * self.dtype.itemsize)
+            self.map = np.memmap(self.file, dtype=self.dtype, mode="r+", offset=self.offset,
+                                 shape=(self.capacity, self.width))
+        self.map[self.length:self.length + len(rows)] = rows
+        self.length += len(rows)
+
+    def arrays(self):
+        """Views of the time points and the signal values in the file, no copies"""
+        self.flush()
+        if self.map is None:
+            return np.empty(0, dtype=self.dtype), np.empty((0, self.width - 1), dtype=self.dtype)
+        return self.map[:self.length, 0], self.map[:self.length, 1:]
+
+    def close(self):
+        """Write the remaining time points, cut the file to its length and update the header"""
+        if self.file is None or self.file.closed:
+            return
+        self.flush()
+        if self.map is not None:
+            self.map.flush()
+            self.map = None
+        self.file.truncate(self.offset + self.length * self.width * self.dtype.itemsize)
+        self.file.seek(0)
+        self.file.write(self._header(self.length))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class WaveformFile:
+    """Waveforms of a file of WaveformWriter or a binary raw file of ngspice, memory mapped read only
+    names: names of the signals
+    time: time points, view of the file
+    data: 2-D array of the signal values, one row per time point, view of the file"""
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            start = file.read(16)
+            if start[:8] == magic:
+                length = int(np.frombuffer(start[8:], dtype=np.uint64)[0])
+                header = json.loads(file.read(length - 16))
+                self.names = header["names"]
+                dtype, n_points, offset = np.dtype(header["dtype"]), header["points"], length
+            else:
+                file.seek(0)
+                self.names, dtype, n_points, offset = self._raw_header(file, path)
+        shape = (n_points, len(self.names) + 1)
+        table = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape) if n_points else np.empty(shape, dtype)
+        self.time = table[:, 0]
+        self.data = table[:, 1:]
+
+    def _raw_header(self, file, path):
+        """names, data type, number of points and data offset of a binary raw file"""
+        names = []; n_points = None; variables = False
+        for line in iter(file.readline, b""):
+            line = line.decode().rstrip("\n")
+            key = line.split(":")[0].strip().lower()
+            if key == "binary":
+                return names, np.dtype("<f8"), n_points, file.tell()
+            if key in ("values", "flags") and ("complex" in line or key == "values"):
+                raise ValueError(f"{path}: only real binary raw files are supported")
+            if key == "no. points":
+                n_points = int(line.split(":")[1])
+            elif key == "variables":
+                variables = True
+            elif variables:
+                index, name = line.split()[:2]
+                if int(index) > 0:
+                    names.append(name)
+        raise ValueError(f"{path}: no binary data found")
+
+    def signal(self, name):
+        """values of signal name, view of the file"""
+        return self.data[:, self.names.index(name)]
+
+    def v(self, node):
+        return self.signal(f"v({node})")
+
+    def i(self, source):
+        return self.signal(f"i({source})")
+
+
+def open_waveforms(path):
+    """Memory map a waveform file, read only, returns WaveformFile"""
+    return WaveformFile(path)
+
+
+def minmax_preview(time, y, n_bins=1000, chunk_size=2**20):
+    """
+    Downsampled preview of a long waveform, min. and max. value per time bin, streamed in chunks
+    time: time points in increasing order, numpy array or view of a memory-mapped file
+    y: values at the time points
+    n_bins: number of equal time bins between the first and the last time point
+    chunk_size: number of time points processed at once
+    returns arrays of the centres of the bins, minimum and maximum per bin, nan for bins without points
+    """
+    edges = np.linspace(time[0], time[-1], n_bins + 1)
+    y_min = np.full(n_bins, np.inf); y_max = np.full(n_bins, -np.inf)
+    for start in range(0, len(time), chunk_size):
+        stop = min(start + chunk_size, len(time))
+        t = np.asarray(time[start:stop], dtype=float); v = np.asarray(y[start:stop], dtype=float)
+        bins = np.clip(np.searchsorted(edges, t, side="right") - 1, 0, n_bins - 1)
+        starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]]) # bins are increasing
+        b = bins[starts]
+        y_min[b] = np.minimum(y_min[b], np.minimum.reduceat(v, starts))
+        y_max[b] = np.maximum(y_max[b], np.maximum.reduceat(v, starts))
+    empty = y_min > y_max
+    y_min[empty] = np.nan; y_max[empty] = np.nan
+    return (edges[:-1] + edges[1:]) / 2, y_min, y_max
+
+
+formats = ("wave", "raw")
+magic = b"WAVEFORM"
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    from rectifier_transient_simulation import rectifier_circuit, transient
+
+    t_stop = 1.0 # s, 50 periods of the mains
+    t_step = 0.1e-3 # s
+    circuit = rectifier_circuit()
+    print("Streaming waveform writer to memory-mapped files")
+    print("------------------------------------------------")
+    print(f"Transient simulation of the bridge rectifier for {t_stop}s\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        wave_path = os.path.join(tmp_dir, "rectifier.wave")
+        t_start = time.perf_counter()
+        with WaveformWriter(wave_path, chunk_size=4096) as sink:
+            transient(circuit, t_stop, t_step, sink=sink)
+        print(f"Written to wave file while simulating: {time.perf_counter() - t_start:.2f}s")
+
+        t_start = time.perf_counter()
+        memory = transient(circuit, t_stop, t_step)
+        print(f"Simulation in memory: {time.perf_counter() - t_start:.2f}s")
+        raw_path = os.path.join(tmp_dir, "rectifier.raw")
+        with WaveformWriter(raw_path, memory.names, format="raw", title=circuit.title) as writer:
+            writer.append_chunk(memory.time, memory.data)
+
+        for path in (wave_path, raw_path):
+            waves = open_waveforms(path)
+            print(f"\n{os.path.basename(path)}: {len(waves.time)} points, {os.path.getsize(path)} bytes, signals {waves.names}")
+            print(f"    max. difference of v(vp) with the simulation in memory: {np.max(np.abs(waves.v('vp') - memory.v('vp'))):.1e}V")
+
+        t_start = time.perf_counter()
+        t_bins, v_min, v_max = minmax_preview(waves.time, waves.v("vp"), n_bins=10, chunk_size=4096)
+        print(f"\nPreview of v(vp) in 10 bins from the raw file in {time.perf_counter() - t_start:.4f}s")
+        print("t (s)  |min (V)   |max (V)")
+        for t, low, high in zip(t_bins, v_min, v_max):
+            print(f"{t:>7.3f}|{low:>10.3f}|{high:>10.3f}")
+        del waves